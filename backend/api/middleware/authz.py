@@ -4,7 +4,7 @@ from typing import Callable
 
 from fastapi import Depends, HTTPException, Request
 
-from core.auth.verify import auth_context_from_claims, verify_access_token
+from core.auth.verify import authenticate
 
 
 def get_bearer_token(request: Request) -> str:
@@ -23,11 +23,10 @@ def get_bearer_token(request: Request) -> str:
 def require_scopes(required: list[str]) -> Callable:
     def _dep(token: str = Depends(get_bearer_token)) -> dict:
         try:
-            claims = verify_access_token(token)
+            ctx = authenticate(token)
         except Exception:
             raise HTTPException(status_code=401, detail="Invalid token")
 
-        ctx = auth_context_from_claims(claims)
         scopes = ctx["scopes"]
         missing = [s for s in required if s not in scopes]
         if missing:
@@ -1,30 +1,196 @@
 from __future__ import annotations
 
+import math
+import threading
 import time
-from collections import defaultdict, deque
+from collections import OrderedDict
+from typing import Optional
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
 
+from core.auth.verify import authenticate
 
-class SimpleRateLimitMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, max_requests: int, window_seconds: int = 60):
-        super().__init__(app)
+
+def parse_quotas(raw: str) -> dict[tuple[Optional[str], str], int]:
+    """Parse RATE_LIMIT_QUOTAS.
+
+    Comma-separated ``<route-prefix>=<requests/window>`` entries, optionally
+    scoped to one tenant as ``<tenant>@<route-prefix>=<n>``. ``*`` is the
+    catch-all prefix. Example::
+
+        /v1/credentials/verify=600,/v1/commerce=300,acme@/v1/commerce=3000,*=120
+    """
+    quotas: dict[tuple[Optional[str], str], int] = {}
+    for item in (raw or "").split(","):
+        item = item.strip()
+        if not item or "=" not in item:
+            continue
+        scope, _, limit = item.rpartition("=")
+        tenant: Optional[str] = None
+        if "@" in scope:
+            tenant, _, scope = scope.partition("@")
+            tenant = tenant.strip() or None
+        quotas[(tenant, scope.strip())] = int(limit)
+    return quotas
+
+
+class GCRALimiter:
+    """Generic cell rate algorithm (token bucket equivalent) with O(1) state per key.
+
+    Each key stores only its theoretical arrival time (TAT). A key whose TAT is
+    in the past has a full bucket and is indistinguishable from an absent key,
+    so idle keys are dropped. `max_keys` hard-bounds memory; evicting a busy
+    key only ever grants it a fresh bucket.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._tat: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict(self, now: float) -> None:
+        # Least-recently-updated first: drop idle keys, then enforce the cap.
+        while self._tat:
+            key, tat = next(iter(self._tat.items()))
+            if tat > now and len(self._tat) <= self.max_keys:
+                break
+            del self._tat[key]
+
+    def acquire(self, key: str, limit: int, window_seconds: float, now: Optional[float] = None) -> tuple[bool, int, float, float]:
+        """Take one token for `key`. Returns (allowed, remaining, reset_after, retry_after)."""
+        if now is None:
+            now = time.monotonic()
+        limit = max(1, int(limit))
+        interval = window_seconds / limit
+        burst = interval * limit
+
+        with self._lock:
+            tat = max(self._tat.get(key, now), now)
+            new_tat = tat + interval
+            allow_at = new_tat - burst
+            if now < allow_at:
+                remaining = 0
+                return False, remaining, tat - now, allow_at - now
+            self._tat[key] = new_tat
+            self._tat.move_to_end(key)
+            self._evict(now)
+
+        remaining = int((burst - (new_tat - now)) // interval)
+        return True, max(0, remaining), new_tat - now, 0.0
+
+    def close(self) -> None:
+        """Nothing to release; present so callers can close any limiter."""
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._tat)
+
+
+def build_limiter(backend: str, url: str = "", sync_interval_ms: int = 1000, max_keys: int = 100_000):
+    """Limiter for RATE_LIMIT_BACKEND: ``local`` (per process), ``sql`` or ``redis`` (shared)."""
+    if not backend or backend.lower() == "local":
+        return GCRALimiter(max_keys=max_keys)
+    from core.rate_limit_store import SharedWindowLimiter, build_counter_backend
+
+    return SharedWindowLimiter(build_counter_backend(backend, url), sync_interval_seconds=sync_interval_ms / 1000.0)
+
+
+class RateLimitMiddleware:
+    """ASGI middleware: per-tenant, per-route-group rate limiting for mutating /v1/ requests.
+
+    Requests with a valid bearer token are keyed by tenant; anonymous requests
+    and invalid tokens fall back to the client address. Tokens are verified in
+    the threadpool, since a verification may block on a JWKS refresh. Every limited response carries
+    ``RateLimit-Limit``/``RateLimit-Remaining``/``RateLimit-Reset`` headers and
+    a 429 also carries ``Retry-After``.
+    """
+
+    def __init__(
+        self,
+        app,
+        max_requests: int,
+        window_seconds: int = 60,
+        quotas: str = "",
+        max_keys: int = 100_000,
+        trust_forwarded: bool = False,
+        limiter=None,
+    ):
+        self.app = app
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.hits = defaultdict(deque)
+        self.quotas = parse_quotas(quotas)
+        self.trust_forwarded = trust_forwarded
+        # Per-process GCRA by default; a SharedWindowLimiter enforces quotas across workers.
+        self.limiter = limiter if limiter is not None else GCRALimiter(max_keys=max_keys)
+        # Longest prefix first so the most specific route group wins
+        self._prefixes = sorted({p for _, p in self.quotas if p != "*"}, key=len, reverse=True)
+
+    def _route_group(self, path: str) -> str:
+        for prefix in self._prefixes:
+            if path.startswith(prefix):
+                return prefix
+        return "*"
+
+    def _limit_for(self, tenant: Optional[str], group: str) -> int:
+        for k in ((tenant, group), (tenant, "*"), (None, group), (None, "*")):
+            if k in self.quotas:
+                return self.quotas[k]
+        return self.max_requests
+
+    async def _client_key(self, scope) -> tuple[Optional[str], str]:
+        headers = Headers(scope=scope)
+        auth = headers.get("authorization") or ""
+        parts = auth.split(" ", 1)
+        if len(parts) == 2 and parts[0].lower() == "bearer" and parts[1].strip():
+            try:
+                ctx = await run_in_threadpool(authenticate, parts[1].strip())
+                tenant = str(ctx["tenant_id"])
+                return tenant, f"tenant:{tenant}"
+            except Exception:
+                # Invalid tokens are rejected downstream. Count them against the
+                # client address: a per-token bucket would let fresh garbage
+                # tokens escape the limit and churn real tenants' buckets.
+                pass
+
+        client = scope.get("client")
+        host = client[0] if client else "unknown"
+        if self.trust_forwarded:
+            fwd = headers.get("x-forwarded-for")
+            if fwd:
+                host = fwd.split(",")[0].strip() or host
+        return None, f"ip:{host}"
+
+    async def __call__(self, scope, receive, send):
+        if scope.get("type") != "http":
+            return await self.app(scope, receive, send)
 
-    async def dispatch(self, request: Request, call_next):
         # Apply only to mutating endpoints
-        if request.method in {"POST", "PUT", "PATCH", "DELETE"} and request.url.path.startswith("/v1/"):
-            key = request.client.host if request.client else "unknown"
-            now = time.time()
-            q = self.hits[key]
-            while q and now - q[0] > self.window_seconds:
-                q.popleft()
-            if len(q) >= self.max_requests:
-                return Response(status_code=429)
-            q.append(now)
-
-        return await call_next(request)
+        path = scope.get("path") or ""
+        if scope.get("method") not in {"POST", "PUT", "PATCH", "DELETE"} or not path.startswith("/v1/"):
+            return await self.app(scope, receive, send)
+
+        tenant, client_key = await self._client_key(scope)
+        group = self._route_group(path)
+        limit = self._limit_for(tenant, group)
+        allowed, remaining, reset_after, retry_after = self.limiter.acquire(
+            f"{client_key}|{group}", limit, self.window_seconds
+        )
+
+        headers = {
+            "RateLimit-Limit": str(limit),
+            "RateLimit-Remaining": str(remaining),
+            "RateLimit-Reset": str(math.ceil(reset_after)),
+        }
+        if not allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+            response = JSONResponse(status_code=429, content={"error": "rate_limited"}, headers=headers)
+            return await response(scope, receive, send)
+
+        async def send_wrapped(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).update(headers)
+            await send(message)
+
+        return await self.app(scope, receive, send_wrapped)
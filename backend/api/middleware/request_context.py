@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+import uuid
+
+from starlette.datastructures import Headers, MutableHeaders
+
+
+def request_id_from_scope(scope) -> str:
+    """Return the request id for this request, reusing one set by an outer middleware."""
+    state = scope.get("state") or {}
+    rid = state.get("request_id")
+    if rid:
+        return rid
+    rid = Headers(scope=scope).get("x-request-id")
+    if isinstance(rid, str) and rid.strip():
+        return rid.strip()
+    return uuid.uuid4().hex[:12]
+
+
+class RequestIdMiddleware:
+    """ASGI middleware that assigns a request id and echoes it as ``x-request-id``.
+
+    The id is stored in ``scope["state"]`` so handlers read it as
+    ``request.state.request_id``.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope.get("type") != "http":
+            return await self.app(scope, receive, send)
+
+        rid = request_id_from_scope(scope)
+        scope.setdefault("state", {})["request_id"] = rid
+
+        async def send_wrapped(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["x-request-id"] = rid
+            await send(message)
+
+        return await self.app(scope, receive, send_wrapped)
+
+
+class ErrorEnvelopeMiddleware:
+    """ASGI middleware that turns unhandled exceptions into a JSON 500 envelope.
+
+    Always returns ``{"error": "internal_error", "request_id": ...}`` (no
+    tracebacks); in demo mode the exception type and a short message are
+    included for faster iteration. Exceptions raised after the response has
+    started are re-raised, since the status line is already on the wire.
+    """
+
+    def __init__(self, app, include_details: bool = False):
+        self.app = app
+        self.include_details = include_details
+
+    async def __call__(self, scope, receive, send):
+        if scope.get("type") != "http":
+            return await self.app(scope, receive, send)
+
+        started = False
+
+        async def send_wrapped(message):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapped)
+        except Exception as e:
+            if started:
+                raise
+            rid = request_id_from_scope(scope)
+            body = {"error": "internal_error", "request_id": rid}
+            if self.include_details:
+                body["type"] = e.__class__.__name__
+                msg = str(e)
+                body["message"] = msg[:300] if isinstance(msg, str) else "error"
+            raw = json.dumps(body).encode("utf-8")
+            await send({
+                "type": "http.response.start",
+                "status": 500,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(raw)).encode("ascii")),
+                    (b"x-request-id", rid.encode("latin-1")),
+                ],
+            })
+            await send({"type": "http.response.body", "body": raw})
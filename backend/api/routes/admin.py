@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+from typing import Any
+
 from fastapi import APIRouter, Depends
 
 from api.middleware.authz import require_scopes
+from core import did_failures
 from core.resolver import flush_cache
 
 router = APIRouter(prefix="/v1/admin", tags=["admin"])
@@ -16,3 +19,12 @@ def flush_did_cache() -> dict[str, bool]:
     """Clear all cached DID documents from the in-memory resolver cache."""
     flush_cache()
     return {"flushed": True}
+
+
+@router.get(
+    "/cache/did-hosts",
+    dependencies=[Depends(require_scopes(["credentials:revoke"]))],
+)
+def did_host_status() -> dict[str, Any]:
+    """DID resolution failure state: negative cache size and per-host circuit breakers."""
+    return did_failures.host_status()
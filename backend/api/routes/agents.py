@@ -7,6 +7,7 @@ from fastapi import APIRouter, Depends
 from pydantic import BaseModel, Field
 
 from core import did as did_core
+from core import invalidation_bus
 from core.crypto import encrypt_text
 from core.db import db_session
 from core.settings import settings
@@ -54,6 +55,7 @@ def create_agent(req: CreateAgentRequest, auth: dict = Depends(require_scopes(["
         db.add(key)
         db.commit()
         db.refresh(agent)
+    invalidation_bus.publish(invalidation_bus.AGENT_KEYS, did)
 
     doc = did_core.build_did_document(did=did, kid=kid, public_jwk=public_jwk)
     did_url = f"{settings.pramana_scheme}://{did_core.domain_decoded()}/agents/{agent_id}/did.json"
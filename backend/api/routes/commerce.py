@@ -14,6 +14,7 @@ from sqlalchemy.exc import IntegrityError
 
 from api.middleware.authz import require_scopes
 from core import did as did_core
+from core import invalidation_bus
 from core.audit import write_audit
 from core.crypto import encrypt_text
 from core.db import db_session
@@ -28,7 +29,7 @@ from core.status_list_vc import (
     verify_and_extract_encoded_list,
 )
 from core.tenancy import ensure_tenant
-from core.vc import issue_vc_jwt, verify_vc_jwt
+from core.vc import issue_vc_jwt, verify_vc_jwt_cached
 from models import Agent, Credential, Key, MandateSpend
 
 import httpx
@@ -60,6 +61,7 @@ def _create_agent(*, tenant_id: str, name: str) -> tuple[Agent, Key]:
         db.commit()
         db.refresh(agent)
         db.refresh(key)
+    invalidation_bus.publish(invalidation_bus.AGENT_KEYS, did)
     return agent, key
 
 
@@ -83,7 +85,7 @@ def _verify_with_status(token: str) -> dict[str, Any]:
         bit_i = index % 8
         return (raw_bits[byte_i] & (1 << bit_i)) != 0
 
-    result = verify_vc_jwt(token=token, resolve_did_document=resolve_did, status_check=status_check)
+    result = verify_vc_jwt_cached(token=token, resolve_did_document=resolve_did, status_check=status_check)
     if result["status"].get("present") and result["status"].get("revoked"):
         return {"verified": False, "reason": "revoked", **result}
     return {"verified": True, **result}
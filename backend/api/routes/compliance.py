@@ -250,9 +250,9 @@ def get_compliance_report(
     tenant_id = auth.get("tenant_id", "default")
 
     # Gather evidence metrics
-    from sqlalchemy import func, text as sqla_text
+    from sqlalchemy import func
     from core.status_list import is_revoked
-    from models import TrustEvent, MandateSpend
+    from models import DelegationRegistry, TrustEvent, MandateSpend
 
     with db_session() as db:
         agent_count = db.query(func.count(Agent.id)).filter(Agent.tenant_id == tenant_id).scalar() or 0
@@ -263,13 +263,7 @@ def get_compliance_report(
         trust_count = db.query(func.count(TrustEvent.id)).filter(TrustEvent.tenant_id == tenant_id).scalar() or 0
 
         # Delegation count
-        try:
-            del_count = db.execute(
-                sqla_text("SELECT COUNT(*) FROM delegation_registry WHERE tenant_id = :tid"),
-                {"tid": tenant_id},
-            ).scalar() or 0
-        except Exception:
-            del_count = 0
+        del_count = db.query(func.count(DelegationRegistry.jti)).filter(DelegationRegistry.tenant_id == tenant_id).scalar() or 0
 
         # EU AI Act specific
         euai_high = db.query(Credential).filter(
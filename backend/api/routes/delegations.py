@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 import base64
+import hashlib
 import json
 import uuid
 from datetime import datetime, timezone
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from pydantic import BaseModel
@@ -13,10 +14,14 @@ from sqlalchemy import select, update
 from api.middleware.authz import require_scopes
 from core.audit import write_audit
 from core.db import db_session
+from core import delegation_graph, delegation_link_cache
+from core.invalidation_bus import DELEGATION, DELEGATION_REGISTERED, publish, publish_many
 from core.resolver import resolve_did
-from core.status_list import set_revoked
-from core.vc import verify_vc_jwt
+from core.status_list import set_revoked, set_revoked_many
+from core.parsed_jwt import ParsedJWT
+from core.vc import _status_key, verify_vc_jwt
 from core.webhooks import dispatch_webhook_event
+from models import DelegationRegistry
 
 router = APIRouter(prefix="/v1/delegations", tags=["delegations"])
 
@@ -31,75 +36,108 @@ class RegisterDelegationRequest(BaseModel):
     parent_jti: Optional[str] = None
     status_list_id: Optional[str] = None
     status_list_index: Optional[int] = None
+    # The JWT itself; stored so children that reference it compactly can be verified
+    delegation_jwt: Optional[str] = None
 
 
 class RevokeRequest(BaseModel):
     jti: str
     cascade: bool = False
+    # Report what would be revoked (the blast radius) without changing anything
+    dry_run: bool = False
 
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
-def _get_delegation_registry_table():
-    """Lazy import to avoid circular deps at module load."""
-    from sqlalchemy import Table, MetaData, String, Integer, DateTime
-    from core.db import engine
-    meta = MetaData()
-    meta.reflect(bind=engine, only=["delegation_registry"])
-    return meta.tables.get("delegation_registry")
+def _revocation_targets(db, jti: str, tenant_id: str, cascade: bool) -> list[DelegationRegistry]:
+    """The delegation and, with `cascade`, every descendant, parents before children.
+
+    Descendants come from one recursive CTE. UNION (not UNION ALL) drops rows
+    already visited, so a parent_jti cycle in the registry terminates.
+    Returns an empty list if `jti` is not registered for the tenant.
+    """
+    root = (
+        select(DelegationRegistry.jti)
+        .where(DelegationRegistry.tenant_id == tenant_id)
+        .where(DelegationRegistry.jti == jti)
+    )
+    if cascade:
+        tree = root.cte("delegation_tree", recursive=True)
+        tree = tree.union(
+            select(DelegationRegistry.jti)
+            .join(tree, DelegationRegistry.parent_jti == tree.c.jti)
+            .where(DelegationRegistry.tenant_id == tenant_id)
+        )
+        root = select(tree.c.jti)
+    rows = db.execute(select(DelegationRegistry).where(DelegationRegistry.jti.in_(root))).scalars().all()
+    return _parents_first(rows, jti)
+
+
+def _parents_first(rows: list[DelegationRegistry], root_jti: str) -> list[DelegationRegistry]:
+    children: dict[Optional[str], list[DelegationRegistry]] = {}
+    by_jti = {}
+    for row in rows:
+        children.setdefault(row.parent_jti, []).append(row)
+        by_jti[row.jti] = row
+    if root_jti not in by_jti:
+        return []
+    ordered, frontier = [], [by_jti[root_jti]]
+    seen = {root_jti}
+    while frontier:
+        ordered.extend(frontier)
+        nxt = []
+        for row in frontier:
+            for child in sorted(children.get(row.jti, ()), key=lambda r: r.jti):
+                if child.jti not in seen:
+                    seen.add(child.jti)
+                    nxt.append(child)
+        frontier = nxt
+    return ordered
+
+
+def _blast_radius(targets: list[DelegationRegistry]) -> dict[str, Any]:
+    depth = {targets[0].jti: 0}
+    for row in targets[1:]:
+        depth[row.jti] = depth[row.parent_jti] + 1
+    return {
+        "max_depth": max(depth.values()),
+        "already_revoked": sum(1 for row in targets if row.revoked_at is not None),
+        "subjects": sorted({row.subject_did for row in targets}),
+        "status_list_bits": {sl_id: len(indices) for sl_id, indices in _status_bits(targets).items()},
+    }
 
 
-def _revoke_single(db, jti: str, tenant_id: str) -> bool:
-    """Revoke a single delegation by JTI. Returns True if found and revoked."""
-    tbl = _get_delegation_registry_table()
-    if tbl is None:
-        return False
+def _status_bits(targets: list[DelegationRegistry]) -> dict[str, list[int]]:
+    by_list: dict[str, list[int]] = {}
+    for row in targets:
+        if row.status_list_id and row.status_list_index is not None:
+            by_list.setdefault(row.status_list_id, []).append(row.status_list_index)
+    return by_list
 
-    row = db.execute(
-        tbl.select().where(tbl.c.jti == jti).where(tbl.c.tenant_id == tenant_id)
-    ).fetchone()
-    if row is None:
-        return False
 
-    # Mark revoked in registry
+def _revoke_targets(db, targets: list[DelegationRegistry]) -> None:
+    """Mark every target revoked with one UPDATE; the caller commits."""
     db.execute(
-        tbl.update()
-        .where(tbl.c.jti == jti)
+        update(DelegationRegistry)
+        .where(DelegationRegistry.jti.in_([row.jti for row in targets]))
+        .where(DelegationRegistry.revoked_at.is_(None))
         .values(revoked_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
     )
 
-    # Set status list bit if present
-    if row.status_list_id and row.status_list_index is not None:
+
+def _flip_status_bits(by_list: dict[str, list[int]]) -> None:
+    """Set status list bits, one write per list."""
+    for status_list_id, indices in by_list.items():
         try:
-            set_revoked(row.status_list_id, row.status_list_index)
+            set_revoked_many(status_list_id, indices)
         except Exception:
-            pass  # status list may have already been revoked
-
-    return True
-
-
-def _cascade_revoke(db, parent_jti: str, tenant_id: str, depth: int = 0) -> list[str]:
-    """Recursively revoke all children of parent_jti. Returns list of revoked JTIs."""
-    if depth > 15:
-        return []  # safety guard
-
-    tbl = _get_delegation_registry_table()
-    if tbl is None:
-        return []
-
-    children = db.execute(
-        tbl.select()
-        .where(tbl.c.parent_jti == parent_jti)
-        .where(tbl.c.tenant_id == tenant_id)
-    ).fetchall()
-
-    revoked = []
-    for child in children:
-        if _revoke_single(db, child.jti, tenant_id):
-            revoked.append(child.jti)
-        revoked.extend(_cascade_revoke(db, child.jti, tenant_id, depth + 1))
-
-    return revoked
+            # A bad entry must not block the rest of its list
+            for index in indices:
+                try:
+                    set_revoked(status_list_id, index)
+                except Exception:
+                    pass  # status list may be gone or the index out of range
 
 
 # ── Endpoints ─────────────────────────────────────────────────────────────────
@@ -112,58 +150,112 @@ def register_delegation(
     """Register a delegation in the registry to enable cascade revocation."""
     tenant_id = auth.get("tenant_id", "default")
 
-    tbl = _get_delegation_registry_table()
-    if tbl is None:
-        raise HTTPException(status_code=503, detail="Delegation registry not available (run migrations)")
+    if req.delegation_jwt is not None:
+        try:
+            token_jti = ParsedJWT.parse(req.delegation_jwt).payload.get("jti")
+        except Exception:
+            raise HTTPException(status_code=400, detail="delegation_jwt is not a valid JWT")
+        if token_jti != req.jti:
+            raise HTTPException(status_code=400, detail="delegation_jwt jti does not match jti")
 
     with db_session() as db:
-        existing = db.execute(tbl.select().where(tbl.c.jti == req.jti)).fetchone()
-        if existing:
+        if db.get(DelegationRegistry, req.jti) is not None:
             return {"registered": False, "reason": "JTI already registered"}
 
-        db.execute(
-            tbl.insert().values(
-                jti=req.jti,
-                tenant_id=tenant_id,
-                issuer_did=req.issuer_did,
-                subject_did=req.subject_did,
-                parent_jti=req.parent_jti,
-                status_list_id=req.status_list_id,
-                status_list_index=req.status_list_index,
-                created_at=datetime.now(timezone.utc),
-                revoked_at=None,
-            )
-        )
+        db.add(DelegationRegistry(
+            jti=req.jti,
+            tenant_id=tenant_id,
+            issuer_did=req.issuer_did,
+            subject_did=req.subject_did,
+            parent_jti=req.parent_jti,
+            status_list_id=req.status_list_id,
+            status_list_index=req.status_list_index,
+            created_at=datetime.now(timezone.utc),
+            revoked_at=None,
+            token=req.delegation_jwt,
+        ))
         db.commit()
 
+    delegation_graph.add(tenant_id, req.jti, req.parent_jti, req.issuer_did, req.subject_did)
+    publish(DELEGATION_REGISTERED, req.jti)
+
     return {"registered": True, "jti": req.jti}
 
 
+# ── Graph queries (served from core.delegation_graph) ─────────────────────────
+
+@router.get("/stats")
+def delegation_stats(auth: dict = Depends(require_scopes(["credentials:verify"]))):
+    """Delegation counts and depth distribution for the tenant."""
+    return delegation_graph.stats(auth.get("tenant_id", "default"))
+
+
+@router.get("/{jti}/subtree")
+def delegation_subtree(
+    jti: str,
+    include_revoked: bool = True,
+    auth: dict = Depends(require_scopes(["credentials:verify"])),
+):
+    """The delegation and every delegation descending from it, parents first."""
+    nodes = delegation_graph.subtree(auth.get("tenant_id", "default"), jti, include_revoked=include_revoked)
+    if nodes is None:
+        raise HTTPException(status_code=404, detail=f"Delegation JTI '{jti}' not found in registry")
+    return {"jti": jti, "count": len(nodes), "nodes": nodes}
+
+
+@router.get("/{jti}/ancestors")
+def delegation_ancestors(jti: str, auth: dict = Depends(require_scopes(["credentials:verify"]))):
+    """The registered chain from the root delegation down to this one."""
+    chain = delegation_graph.ancestors(auth.get("tenant_id", "default"), jti)
+    if chain is None:
+        raise HTTPException(status_code=404, detail=f"Delegation JTI '{jti}' not found in registry")
+    return {"jti": jti, "depth": len(chain) - 1, "chain": chain}
+
+
+@router.get("/{jti}/impact")
+def delegation_impact(jti: str, auth: dict = Depends(require_scopes(["credentials:verify"]))):
+    """What a cascade revocation of this delegation would take down."""
+    result = delegation_graph.impact(auth.get("tenant_id", "default"), jti)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"Delegation JTI '{jti}' not found in registry")
+    return result
+
+
 @router.post("/revoke")
 def revoke_delegation(
     req: RevokeRequest,
     background_tasks: BackgroundTasks,
     auth: dict = Depends(require_scopes(["credentials:revoke"])),
 ):
-    """Revoke a delegation by JTI. With cascade=true, also revokes all child delegations."""
-    tenant_id = auth.get("tenant_id", "default")
+    """Revoke a delegation by JTI. With cascade=true, also revokes all descendant delegations.
 
-    tbl = _get_delegation_registry_table()
-    if tbl is None:
-        raise HTTPException(status_code=503, detail="Delegation registry not available (run migrations)")
+    With dry_run=true nothing is changed; the response lists what would be
+    revoked and its blast radius.
+    """
+    tenant_id = auth.get("tenant_id", "default")
 
     with db_session() as db:
-        revoked_self = _revoke_single(db, req.jti, tenant_id)
-        if not revoked_self:
+        targets = _revocation_targets(db, req.jti, tenant_id, req.cascade)
+        if not targets:
             raise HTTPException(status_code=404, detail=f"Delegation JTI '{req.jti}' not found in registry")
-
-        cascaded = []
-        if req.cascade:
-            cascaded = _cascade_revoke(db, req.jti, tenant_id)
-
+        cascaded = [row.jti for row in targets[1:]]
+        all_revoked = [req.jti] + cascaded
+        if req.dry_run:
+            return {
+                "revoked": False,
+                "dry_run": True,
+                "jti": req.jti,
+                "cascade": req.cascade,
+                "cascaded_count": len(cascaded),
+                "all_revoked": all_revoked,
+                "impact": _blast_radius(targets),
+            }
+        status_bits = _status_bits(targets)
+        _revoke_targets(db, targets)
         db.commit()
 
-    all_revoked = [req.jti] + cascaded
+    _flip_status_bits(status_bits)
+    publish_many(DELEGATION, all_revoked)
 
     write_audit(
         tenant_id=tenant_id,
@@ -303,20 +395,101 @@ def _status_check_fn(status_list_cred_url: str, index: int) -> bool:
         return False
 
 
+def _delegation_digest(token: str) -> str:
+    digest = hashlib.sha256(token.encode("ascii")).digest()
+    return "sha-256:" + base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+
+
+def _registry_fetcher(tenant_id: str) -> Callable[[str], Optional[str]]:
+    """Look up a registered delegation JWT by JTI within one tenant."""
+    def fetch(jti: str) -> Optional[str]:
+        with db_session() as db:
+            return db.scalar(
+                select(DelegationRegistry.token)
+                .where(DelegationRegistry.tenant_id == tenant_id, DelegationRegistry.jti == jti)
+            )
+    return fetch
+
+
+def _resolve_parent_ref(
+    ref: Any,
+    parents: dict[str, str],
+    fetch_parent: Optional[Callable[[str], Optional[str]]],
+) -> tuple[Optional[str], Optional[str]]:
+    """The parent JWT a parentDelegationRef points at: (token, None) or (None, reason)."""
+    if not isinstance(ref, dict) or not isinstance(ref.get("digest"), str):
+        return None, "Malformed parentDelegationRef"
+    token = parents.get(ref["digest"])
+    if token is None and fetch_parent is not None and ref.get("jti"):
+        token = fetch_parent(str(ref["jti"]))
+        if token is not None and _delegation_digest(token) != ref["digest"]:
+            return None, f"Parent delegation {ref['jti']} does not match its digest"
+    if token is None:
+        return None, f"Parent delegation {ref.get('jti', '')} not provided"
+    return token, None
+
+
 def _verify_delegation_chain_backend(
     token: str,
     required_action: Optional[str] = None,
+    parent_delegations: Optional[list[str]] = None,
+    fetch_parent: Optional[Callable[[str], Optional[str]]] = None,
     _depth: int = 0,
     _max_depth: int = 10,
 ) -> dict[str, Any]:
-    """Recursively verify a delegation chain server-side. Returns result dict."""
+    """Verify a delegation chain server-side. Returns result dict.
+
+    Links already verified together with their ancestors come from
+    core.delegation_link_cache, so a warm chain costs one signature check.
+    A compact link names its parent by ``parentDelegationRef`` (jti and
+    SHA-256 digest) instead of embedding it; the parent is taken from
+    `parent_delegations` or `fetch_parent(jti)` and must match the digest.
+    """
+    parents = {_delegation_digest(t): t for t in parent_delegations or ()}
+    link = _verify_delegation_link(token, parents, fetch_parent, _depth, _max_depth)
+    if isinstance(link, dict):
+        return link
+    chain, effective_scope = link.chain, link.effective_scope
+
+    if required_action and required_action not in effective_scope.get("actions", []):
+        return {"verified": False, "chain": chain, "effective_scope": effective_scope,
+                "depth": len(chain),
+                "reason": f"Action '{required_action}' not in effective scope: {effective_scope.get('actions', [])}"}
+
+    return {"verified": True, "chain": chain, "effective_scope": effective_scope,
+            "depth": len(chain), "reason": None}
+
+
+def _verify_delegation_link(
+    token: str,
+    parents: dict[str, str],
+    fetch_parent: Optional[Callable[[str], Optional[str]]],
+    _depth: int,
+    _max_depth: int,
+) -> "delegation_link_cache.Link | dict[str, Any]":
+    """Verify `token` and its ancestors: the cached or newly verified link, or a failure result dict."""
     if _depth > _max_depth:
         return {"verified": False, "chain": [], "effective_scope": {}, "depth": _depth,
                 "reason": f"Recursion limit {_max_depth} exceeded"}
 
+    cached = delegation_link_cache.get(token)
+    if cached is not None:
+        if _depth + len(cached.chain) - 1 > _max_depth:
+            return {"verified": False, "chain": [], "effective_scope": {}, "depth": _depth,
+                    "reason": f"Recursion limit {_max_depth} exceeded"}
+        return cached
+
     try:
+        parsed = ParsedJWT.parse(token)
+        claimed = parsed.payload
+        # Snapshot before verifying so a revocation landing mid-verification is not cached as valid
+        deps = delegation_link_cache.snapshot([
+            f"jti:{claimed.get('jti', '')}",
+            f"did:{claimed.get('iss', '')}",
+            f"status:{_status_key(claimed)}",
+        ])
         result = verify_vc_jwt(
-            token=token,
+            token=parsed,
             resolve_did_document=resolve_did,
             status_check=_status_check_fn,
         )
@@ -339,39 +512,42 @@ def _verify_delegation_chain_backend(
         "depth": int(cs.get("delegationDepth", 0)),
         "jti": payload.get("jti", ""),
     }
+    exp = payload.get("exp")
+    expires_at = float(exp) if isinstance(exp, (int, float)) else float("inf")
 
     parent_jwt = cs.get("parentDelegation")
+    if not parent_jwt and cs.get("parentDelegationRef") is not None:
+        parent_jwt, ref_error = _resolve_parent_ref(cs["parentDelegationRef"], parents, fetch_parent)
+        if ref_error:
+            return {"verified": False, "chain": [], "effective_scope": {}, "depth": _depth,
+                    "reason": ref_error}
     if parent_jwt:
-        parent_result = _verify_delegation_chain_backend(
-            parent_jwt, _depth=_depth + 1, _max_depth=_max_depth
-        )
-        if not parent_result["verified"]:
-            return {"verified": False, "chain": parent_result["chain"], "effective_scope": {},
-                    "depth": _depth, "reason": f"Parent delegation invalid: {parent_result['reason']}"}
+        parent = _verify_delegation_link(parent_jwt, parents, fetch_parent, _depth + 1, _max_depth)
+        if isinstance(parent, dict):
+            return {"verified": False, "chain": parent["chain"], "effective_scope": {},
+                    "depth": _depth, "reason": f"Parent delegation invalid: {parent['reason']}"}
 
-        scope_err = _validate_scope_narrowing(parent_result["effective_scope"], this_scope)
+        scope_err = _validate_scope_narrowing(parent.effective_scope, this_scope)
         if scope_err:
-            return {"verified": False, "chain": parent_result["chain"] + [this_link],
+            return {"verified": False, "chain": parent.chain + [this_link],
                     "effective_scope": {}, "depth": _depth, "reason": scope_err}
 
-        effective_scope = _intersect_scopes(parent_result["effective_scope"], this_scope)
-        chain = parent_result["chain"] + [this_link]
+        effective_scope = _intersect_scopes(parent.effective_scope, this_scope)
+        chain = parent.chain + [this_link]
+        deps = parent.deps + deps
+        expires_at = min(expires_at, parent.expires_at)
     else:
         effective_scope = this_scope
         chain = [this_link]
 
-    if required_action and required_action not in effective_scope.get("actions", []):
-        return {"verified": False, "chain": chain, "effective_scope": effective_scope,
-                "depth": len(chain),
-                "reason": f"Action '{required_action}' not in effective scope: {effective_scope.get('actions', [])}"}
-
-    return {"verified": True, "chain": chain, "effective_scope": effective_scope,
-            "depth": len(chain), "reason": None}
+    return delegation_link_cache.put(token, chain, effective_scope, expires_at, deps)
 
 
 class VerifyDelegationRequest(BaseModel):
     delegation_jwt: str
     required_action: Optional[str] = None
+    # Ancestors of a compact chain, in any order; missing ones are fetched from the registry
+    parent_delegations: list[str] = []
 
 
 class DelegationChainLink(BaseModel):
@@ -399,6 +575,8 @@ def verify_delegation(
     result = _verify_delegation_chain_backend(
         req.delegation_jwt,
         required_action=req.required_action,
+        parent_delegations=req.parent_delegations,
+        fetch_parent=_registry_fetcher(auth.get("tenant_id", "default")),
     )
 
     write_audit(
@@ -4,7 +4,7 @@ import secrets
 
 from fastapi import APIRouter, Response, Depends, HTTPException
 from pydantic import BaseModel, Field
-from sqlalchemy import func, text
+from sqlalchemy import func
 
 from api.middleware.authz import require_scopes
 from core.auth.demo import issue_demo_token
@@ -56,7 +56,10 @@ def demo_reset(auth: dict = Depends(require_scopes(['tenant:admin']))):
     from models import Agent, AuditEvent, Credential, Key, StatusList
     from models.tenant import Tenant
 
+    from core import invalidation_bus
+
     with db_session() as db:
+        deleted_dids = [did for (did,) in db.query(Agent.did).filter(Agent.tenant_id == tenant_id).all()]
         # delete in FK-safe order
         db.query(Credential).filter(Credential.tenant_id == tenant_id).delete(synchronize_session=False)
         db.query(Key).filter(Key.tenant_id == tenant_id).delete(synchronize_session=False)
@@ -65,6 +68,8 @@ def demo_reset(auth: dict = Depends(require_scopes(['tenant:admin']))):
         db.query(AuditEvent).filter(AuditEvent.tenant_id == tenant_id).delete(synchronize_session=False)
         db.query(Tenant).filter(Tenant.id == tenant_id).delete(synchronize_session=False)
         db.commit()
+    for did in deleted_dids:
+        invalidation_bus.publish(invalidation_bus.AGENT_KEYS, did)
 
     return {"reset": True, "tenant_id": tenant_id}
 
@@ -128,7 +133,7 @@ def demo_summary(auth: dict = Depends(require_scopes(['tenant:admin']))):
     from core.audit import verify_chain
     from core.db import db_session
     from core.status_list import is_revoked
-    from models import Agent, AuditEvent, Credential, MandateSpend
+    from models import Agent, AuditEvent, Credential, DelegationRegistry, MandateSpend
     from models.trust_event import TrustEvent
 
     with db_session() as db:
@@ -139,13 +144,7 @@ def demo_summary(auth: dict = Depends(require_scopes(['tenant:admin']))):
         trust_count = db.query(func.count(TrustEvent.id)).filter(TrustEvent.tenant_id == tenant_id).scalar() or 0
         spends = db.query(MandateSpend).filter(MandateSpend.tenant_id == tenant_id).all()
         total_usd = sum(float(s.amount) for s in spends if s.currency == "USD") / 100.0
-        try:
-            del_count = db.execute(
-                text("SELECT COUNT(*) FROM delegation_registry WHERE tenant_id = :tid"),
-                {"tid": tenant_id},
-            ).scalar() or 0
-        except Exception:
-            del_count = 0
+        del_count = db.query(func.count(DelegationRegistry.jti)).filter(DelegationRegistry.tenant_id == tenant_id).scalar() or 0
 
     chain = verify_chain(tenant_id)
 
@@ -7,6 +7,7 @@ from fastapi import APIRouter, Depends, HTTPException
 
 from api.middleware.authz import require_scopes
 from core import did as did_core
+from core import invalidation_bus
 from core.crypto import encrypt_text
 from core.db import db_session
 from core.tenancy import ensure_tenant
@@ -51,5 +52,8 @@ def rotate_agent_key(agent_id: uuid.UUID, auth: dict = Depends(require_scopes(["
         db.add(new_key)
         db.commit()
         db.refresh(new_key)
+        agent_did = agent.did
+
+    invalidation_bus.publish(invalidation_bus.AGENT_KEYS, agent_did)
 
     return {"rotated": True, "agent_id": str(agent_id), "new_kid": kid}
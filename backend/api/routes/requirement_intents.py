@@ -11,6 +11,7 @@ from pydantic import BaseModel, Field
 
 from api.middleware.authz import require_scopes
 from core import did as did_core
+from core import invalidation_bus
 from core.audit import write_audit
 from core.crypto import encrypt_text
 from core.db import db_session
@@ -156,6 +157,7 @@ def _create_agent(*, tenant_id: str, name: str) -> tuple[Agent, Key]:
         db.commit()
         db.refresh(agent)
         db.refresh(key)
+    invalidation_bus.publish(invalidation_bus.AGENT_KEYS, did)
     return agent, key
 
 
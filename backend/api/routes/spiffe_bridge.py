@@ -22,16 +22,17 @@ import uuid
 from datetime import datetime
 from typing import Any, Optional
 
-import jwt as pyjwt
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.exc import IntegrityError
 from pydantic import BaseModel, Field
 
 from api.middleware.authz import require_scopes
 from core import did as did_core
+from core import invalidation_bus
 from core.audit import write_audit
 from core.crypto import encrypt_text
 from core.db import db_session
+from core.parsed_jwt import ParsedJWT
 from core.did import is_spiffe_id, parse_spiffe_id
 from core.settings import settings
 from core.status_list import allocate_index, get_or_create_default_list
@@ -89,26 +90,21 @@ class SpiffeBindingResponse(BaseModel):
 # Helpers
 # ---------------------------------------------------------------------------
 
-def _decode_svid_unverified(svid_jwt: str) -> dict[str, Any]:
-    """Decode SVID JWT without signature check to extract claims."""
+def _verify_svid(svid_jwt: str, trust_bundle_jwk: Optional[dict[str, Any]]) -> dict[str, Any]:
+    """Verify SVID JWT signature. In demo mode without a trust bundle, accept unverified."""
     try:
-        return pyjwt.decode(svid_jwt, options={"verify_signature": False})
+        parsed = ParsedJWT.parse(svid_jwt)
     except Exception as exc:
         raise ValueError(f"Malformed SVID JWT: {exc}") from exc
-
-
-def _verify_svid(svid_jwt: str, trust_bundle_jwk: Optional[dict[str, Any]]) -> dict[str, Any]:
-    """Verify SVID JWT signature. In demo mode without a trust bundle, accept unverified."""
-    claims = _decode_svid_unverified(svid_jwt)
+    claims = parsed.payload
 
     if trust_bundle_jwk:
         # Full verification against provided trust bundle key
         from core.vc import _public_key_from_jwk_multi
-        header = pyjwt.get_unverified_header(svid_jwt)
-        alg = header.get("alg", "RS256")
+        alg = parsed.header.get("alg", "RS256")
         try:
             pub = _public_key_from_jwk_multi(trust_bundle_jwk)
-            claims = pyjwt.decode(svid_jwt, key=pub, algorithms=[alg])
+            claims = parsed.verify(pub, algorithms=[alg])
         except Exception as exc:
             raise ValueError(f"SVID signature verification failed: {exc}") from exc
     elif not settings.demo_mode:
@@ -172,6 +168,7 @@ def _get_or_create_agent(
             db.add(new_key)
             db.commit()
             db.refresh(new_key)
+        invalidation_bus.publish(invalidation_bus.AGENT_KEYS, existing_did)
         with db_session() as db:
             agent = db.query(Agent).filter(Agent.id == existing_id).one()
             db.expunge(agent)
@@ -205,6 +202,7 @@ def _get_or_create_agent(
             db.commit()
             db.refresh(agent)
             db.refresh(key)
+        invalidation_bus.publish(invalidation_bus.AGENT_KEYS, new_did)
         return agent, key, True
     except IntegrityError:
         # Lost race to another concurrent request — fetch the winner
@@ -4,7 +4,6 @@ import time
 from typing import Any, Optional
 from urllib.parse import unquote
 
-import jwt as pyjwt
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from pydantic import BaseModel, Field
 from sqlalchemy import func
@@ -12,6 +11,7 @@ from sqlalchemy import func
 from api.middleware.authz import require_scopes
 from core.audit import write_audit
 from core.db import db_session
+from core.parsed_jwt import ParsedJWT
 from core.trust_score import (
     TrustScore,
     compute_trust_score,
@@ -54,17 +54,20 @@ def score_credential(
     """Compute a composite trust score (0-100) for a VC-JWT."""
     tenant_id = auth.get("tenant_id", "default")
 
-    score = compute_trust_score(req.jwt, tenant_id)
+    # Parse once; scoring and the event record share the decoded token.
+    try:
+        token: str | ParsedJWT = ParsedJWT.parse(req.jwt)
+    except Exception:
+        token = req.jwt
+
+    score = compute_trust_score(token, tenant_id)
 
     # Extract subject DID and jti for the event record.
     subject_did = ""
     credential_jti = None
-    try:
-        payload = pyjwt.decode(req.jwt, options={"verify_signature": False})
-        subject_did = payload.get("sub", "")
-        credential_jti = payload.get("jti")
-    except Exception:
-        pass
+    if isinstance(token, ParsedJWT):
+        subject_did = token.payload.get("sub", "")
+        credential_jti = token.payload.get("jti")
 
     event_type = (
         "verification_success"
@@ -1,19 +1,22 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 
-from core.audit import write_audit
-from core.resolver import resolve_did
+from core.audit import write_audit, write_audit_many
+from core.resolver import resolve_did_async
+from core.settings import settings
 from core.status_list_vc import (
+    fetch_status_list_bits_async,
+    fetch_status_list_jwt_async,
     is_local_status_list_url,
     issue_status_list_vc_jwt,
+    status_bit,
     status_list_id_from_url,
-    verify_and_extract_encoded_list,
+    verify_and_extract_encoded_list_async,
 )
-from core.vc import verify_vc_jwt
-
-import httpx
+from core.vc import verify_vc_jwt_batch_async, verify_vc_jwt_cached_async
 
 router = APIRouter(prefix="/v1/credentials", tags=["credentials"])
 
@@ -23,34 +26,27 @@ class VerifyRequest(BaseModel):
 
 
 @router.post("/verify")
-def verify(req: VerifyRequest):
+async def verify(req: VerifyRequest):
     try:
-        def status_check(status_list_cred_url: str, index: int) -> bool:
+        async def status_check(status_list_cred_url: str, index: int) -> bool:
             if is_local_status_list_url(status_list_cred_url):
                 sl_id = status_list_id_from_url(status_list_cred_url)
-                status_jwt, _ = issue_status_list_vc_jwt(sl_id)
+                status_jwt, _ = await run_in_threadpool(issue_status_list_vc_jwt, sl_id)
             else:
-                r = httpx.get(status_list_cred_url, timeout=10.0)
-                r.raise_for_status()
-                data = r.json()
-                status_jwt = data.get('jwt')
-                if not isinstance(status_jwt, str):
-                    raise ValueError('status list response missing jwt')
-
-            raw_bits, _ = verify_and_extract_encoded_list(status_jwt)
+                status_jwt = await fetch_status_list_jwt_async(status_list_cred_url)
 
-            if index < 0 or index >= (len(raw_bits) * 8):
-                return False
-            byte_i = index // 8
-            bit_i = index % 8
-            return (raw_bits[byte_i] & (1 << bit_i)) != 0
+            raw_bits, _ = await verify_and_extract_encoded_list_async(status_jwt)
+            return status_bit(raw_bits, index)
 
-        result = verify_vc_jwt(token=req.jwt, resolve_did_document=resolve_did, status_check=status_check)
+        result = await verify_vc_jwt_cached_async(
+            token=req.jwt, resolve_did_document=resolve_did_async, status_check=status_check
+        )
 
         jti = str(result["payload"].get("jti", ""))
         exp = result["payload"].get("exp")
 
-        write_audit(
+        await run_in_threadpool(
+            write_audit,
             tenant_id="public",
             event_type="credential.verified",
             actor="verifier",
@@ -68,3 +64,61 @@ def verify(req: VerifyRequest):
         raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+
+class BatchVerifyRequest(BaseModel):
+    jwts: list[str] = Field(min_length=1)
+
+
+@router.post("/verify:batch")
+async def verify_batch(req: BatchVerifyRequest):
+    """Verify up to VERIFY_BATCH_MAX_ITEMS credentials in one call.
+
+    Results come back in request order. Identical tokens are verified once,
+    issuers and status lists are looked up once per batch, and the audit
+    entries are written in a single transaction.
+    """
+    if len(req.jwts) > settings.verify_batch_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(req.jwts)} items (max {settings.verify_batch_max_items})",
+        )
+
+    outcomes = await verify_vc_jwt_batch_async(
+        req.jwts,
+        resolve_did_document=resolve_did_async,
+        fetch_status_bits=fetch_status_list_bits_async,
+        max_concurrency=settings.verify_batch_max_workers,
+    )
+
+    results = []
+    audit_events = []
+    audited: set[str] = set()
+    for i, (token, outcome) in enumerate(zip(req.jwts, outcomes)):
+        if not outcome["ok"]:
+            results.append({"index": i, "verified": False, "reason": outcome["error"]})
+            continue
+
+        result = outcome["result"]
+        if token not in audited:
+            audited.add(token)
+            audit_events.append({
+                "event_type": "credential.verified",
+                "actor": "verifier",
+                "resource_type": "credential",
+                "resource_id": str(result["payload"].get("jti", "")),
+                "payload": {"iss": result["payload"].get("iss"), "sub": result["payload"].get("sub"), "status": result["status"]},
+            })
+
+        if result["status"].get("present") and result["status"].get("revoked"):
+            results.append({"index": i, "verified": False, "reason": "revoked", **result})
+        else:
+            results.append({"index": i, "verified": True, **result})
+
+    await run_in_threadpool(write_audit_many, tenant_id="public", events=audit_events)
+
+    return {
+        "count": len(results),
+        "verified": sum(1 for r in results if r["verified"]),
+        "results": results,
+    }
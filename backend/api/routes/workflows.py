@@ -10,6 +10,7 @@ from pydantic import BaseModel, Field
 
 from api.middleware.authz import require_scopes
 from core import did as did_core
+from core import invalidation_bus
 from core.audit import write_audit
 from core.crypto import encrypt_text
 from core.db import db_session
@@ -70,6 +71,7 @@ def _create_agent(*, tenant_id: str, name: str) -> tuple[Agent, Key, dict]:
         db.add(key)
         db.commit()
         db.refresh(agent)
+    invalidation_bus.publish(invalidation_bus.AGENT_KEYS, did)
 
     doc = did_core.build_did_document(did=did, kid=kid, public_jwk=public_jwk)
     return agent, key, doc
@@ -3,6 +3,7 @@ from __future__ import annotations
 import hashlib
 import json
 import logging
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
 from sqlalchemy import desc, select
@@ -30,6 +31,10 @@ def _normalize_timestamp(dt) -> str:
     return dt.isoformat()
 
 
+def _as_utc(dt: datetime) -> datetime:
+    return dt if dt.tzinfo is not None else dt.replace(tzinfo=timezone.utc)
+
+
 def _compute_event_hash(evt: AuditEvent, prev_hash: str) -> str:
     """SHA-256 over deterministic event fields + prev_hash."""
     payload_str = json.dumps(evt.payload_json, sort_keys=True, separators=(",", ":"))
@@ -86,6 +91,56 @@ def write_audit(
         return evt
 
 
+def write_audit_many(*, tenant_id: str, events: list[dict[str, Any]]) -> int:
+    """Append several events to a tenant's chain in one transaction.
+
+    Each item carries the `write_audit` keyword fields (event_type, actor,
+    resource_type, resource_id, payload). ``created_at`` comes from the model
+    default at flush, as in `write_audit`. If the clock has not advanced since
+    the previous event, the timestamp is nudged forward by a microsecond.
+    `verify_chain` walks events by ``created_at``, so ties would make the
+    chain order ambiguous.
+    """
+    if not events:
+        return 0
+    if not tenant_id:
+        tenant_id = "default"
+
+    with db_session() as db:
+        last = (
+            db.execute(
+                select(AuditEvent)
+                .where(AuditEvent.tenant_id == tenant_id)
+                .order_by(desc(AuditEvent.created_at))
+                .limit(1)
+            )
+            .scalars()
+            .first()
+        )
+        prev_hash = last.event_hash if (last and last.event_hash) else GENESIS_HASH
+
+        prev_created = last.created_at if last else None
+        for e in events:
+            evt = AuditEvent(
+                tenant_id=tenant_id,
+                event_type=e["event_type"],
+                actor=e["actor"],
+                resource_type=e["resource_type"],
+                resource_id=e["resource_id"],
+                payload_json=e["payload"],
+                prev_hash=prev_hash,
+            )
+            db.add(evt)
+            db.flush()
+            if prev_created is not None and _as_utc(evt.created_at) <= _as_utc(prev_created):
+                evt.created_at = _as_utc(prev_created) + timedelta(microseconds=1)
+            prev_created = evt.created_at
+            evt.event_hash = _compute_event_hash(evt, prev_hash)
+            prev_hash = evt.event_hash
+        db.commit()
+    return len(events)
+
+
 def verify_chain(tenant_id: str) -> dict[str, Any]:
     """Walk the full audit chain for a tenant and verify hash integrity.
 
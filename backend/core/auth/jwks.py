@@ -0,0 +1,136 @@
+"""JWKS key manager for OIDC token verification.
+
+Keys are parsed once into key objects indexed by ``kid``. A daemon thread
+re-fetches the JWKS every `refresh_interval_seconds`; an unknown ``kid``
+(e.g. right after the IdP rotates keys) triggers one on-demand fetch that all
+concurrent callers wait on, and such fetches are spaced at least
+`min_fetch_interval_seconds` apart so a flood of tokens with a bogus kid
+cannot hammer the IdP. When a fetch fails the previous keys keep being served.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional
+
+import jwt
+
+from core.demo_metrics import inc
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSManager:
+    def __init__(
+        self,
+        fetch: Callable[[], dict[str, Any]],
+        *,
+        refresh_interval_seconds: float = 300.0,
+        min_fetch_interval_seconds: float = 10.0,
+        fetch_timeout_seconds: float = 10.0,
+    ):
+        self._fetch = fetch
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.min_fetch_interval_seconds = min_fetch_interval_seconds
+        self.fetch_timeout_seconds = fetch_timeout_seconds
+        self._keys: dict[str, Any] = {}
+        self._lock = threading.Lock()
+        # Set while a fetch is running; other callers wait on it instead of fetching.
+        self._inflight: Optional[threading.Event] = None
+        self._last_attempt = float("-inf")
+        self.last_success: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @staticmethod
+    def _parse(jwks: dict[str, Any]) -> dict[str, Any]:
+        keys: dict[str, Any] = {}
+        for jwk in jwks.get("keys", []):
+            kid = jwk.get("kid") if isinstance(jwk, dict) else None
+            if not kid:
+                continue
+            try:
+                keys[kid] = jwt.PyJWK(jwk).key
+            except Exception:
+                # Unsupported key types (e.g. encryption keys) are simply not usable for verification
+                logger.debug("Skipping unusable JWK kid=%s", kid)
+        return keys
+
+    def refresh(self, *, min_interval: float = 0.0) -> None:
+        """Fetch the JWKS, coalescing concurrent callers into a single request.
+
+        Skipped if the previous attempt started less than `min_interval` seconds
+        ago. On failure the current keys are kept.
+        """
+        with self._lock:
+            event = self._inflight
+            if event is None:
+                if time.monotonic() - self._last_attempt < min_interval:
+                    return
+                event = self._inflight = threading.Event()
+                self._last_attempt = time.monotonic()
+                leader = True
+            else:
+                leader = False
+
+        if not leader:
+            event.wait(self.fetch_timeout_seconds)
+            return
+
+        try:
+            inc("oidc_jwks_fetch_total")
+            keys = self._parse(self._fetch())
+            if not keys:
+                raise ValueError("JWKS contains no usable keys")
+            with self._lock:
+                self._keys = keys
+                self.last_success = time.time()
+                self.last_error = None
+        except Exception as e:
+            inc("oidc_jwks_fetch_error_total")
+            with self._lock:
+                self.last_error = str(e)[:200]
+                stale = len(self._keys)
+            logger.warning("JWKS fetch failed; serving %d cached keys", stale, exc_info=True)
+        finally:
+            with self._lock:
+                self._inflight = None
+            event.set()
+
+    def get_key(self, kid: str) -> Any:
+        """Return the verification key for `kid`, fetching once on a miss."""
+        with self._lock:
+            key = self._keys.get(kid)
+        if key is not None:
+            return key
+
+        self.refresh(min_interval=self.min_fetch_interval_seconds)
+        with self._lock:
+            key = self._keys.get(kid)
+        if key is None:
+            raise ValueError("kid not found")
+        return key
+
+    def start(self) -> None:
+        """Start background refresh (idempotent)."""
+        if self.refresh_interval_seconds <= 0:
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="oidc-jwks-refresh", daemon=True)
+        self._thread.start()
+
+    def _loop(self) -> None:
+        # Prime the cache right away; early requests coalesce onto this fetch.
+        self.refresh()
+        while not self._stop.wait(self.refresh_interval_seconds):
+            self.refresh()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
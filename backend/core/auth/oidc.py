@@ -1,57 +1,72 @@
 from __future__ import annotations
 
 import json
-from functools import lru_cache
+import threading
 from typing import Any, Optional
 
+import httpx
 import jwt
 
+from core.auth.jwks import JWKSManager
 from core.settings import settings
 
 
+_manager: Optional[JWKSManager] = None
+_manager_source: Optional[tuple[str, str]] = None
+_manager_lock = threading.Lock()
+
+
+def _fetch_jwks_url(url: str) -> dict[str, Any]:
+    resp = httpx.get(url, timeout=10, follow_redirects=True)
+    resp.raise_for_status()
+    return resp.json()
+
+
 def _load_jwks() -> dict[str, Any]:
     if settings.oidc_jwks_json:
         return json.loads(settings.oidc_jwks_json)
     raise ValueError("OIDC_JWKS_JSON not configured (use OIDC_JWKS_URL in production)")
 
 
-@lru_cache(maxsize=1)
-def _jwks_client() -> Optional[jwt.PyJWKClient]:
-    if settings.oidc_jwks_url:
-        return jwt.PyJWKClient(settings.oidc_jwks_url)
-    return None
+def _jwks_manager() -> JWKSManager:
+    """Return the JWKS manager for the configured key source, rebuilding it if that changed."""
+    global _manager, _manager_source
+    source = (settings.oidc_jwks_url, settings.oidc_jwks_json)
+    with _manager_lock:
+        if _manager is not None and _manager_source == source:
+            return _manager
+        if _manager is not None:
+            _manager.stop(timeout=0)
+
+        if settings.oidc_jwks_url:
+            url = settings.oidc_jwks_url
+            manager = JWKSManager(
+                lambda: _fetch_jwks_url(url),
+                refresh_interval_seconds=settings.oidc_jwks_refresh_seconds,
+                min_fetch_interval_seconds=settings.oidc_jwks_min_fetch_interval_seconds,
+            )
+            manager.start()
+        else:
+            # Test/dev fallback: static JWKS JSON, parsed once
+            manager = JWKSManager(_load_jwks, refresh_interval_seconds=0, min_fetch_interval_seconds=0)
+        _manager, _manager_source = manager, source
+        return manager
+
+
+def stop_jwks_refresh() -> None:
+    """Stop the background JWKS refresh thread. Call on shutdown."""
+    with _manager_lock:
+        if _manager is not None:
+            _manager.stop()
 
 
 def verify_oidc_token(token: str) -> dict[str, Any]:
-    # Prefer URL-based JWKS client in real deployments
-    client = _jwks_client()
-    if client is not None:
-        signing_key = client.get_signing_key_from_jwt(token).key
-        return jwt.decode(
-            token,
-            signing_key,
-            algorithms=["RS256"],
-            issuer=settings.oidc_issuer,
-            audience=settings.oidc_audience,
-            options={"require": ["iss", "sub", "iat", "exp"]},
-        )
-
-    # Test/dev fallback: JWKS JSON
-    jwks = _load_jwks()
     header = jwt.get_unverified_header(token)
     kid = header.get("kid")
     if not kid:
         raise ValueError("missing kid")
 
-    key = None
-    for k in jwks.get("keys", []):
-        if k.get("kid") == kid:
-            key = k
-            break
-    if not key:
-        raise ValueError("kid not found")
-
-    public_key = jwt.algorithms.RSAAlgorithm.from_jwk(json.dumps(key))
+    public_key = _jwks_manager().get_key(kid)
     return jwt.decode(
         token,
         public_key,
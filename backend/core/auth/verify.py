@@ -1,13 +1,25 @@
 from __future__ import annotations
 
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from typing import Any
 
 from core.auth.demo import verify_demo_token
 from core.auth.jwt_auth import extract_scopes as extract_scopes_hs256
 from core.auth.jwt_auth import verify_token as verify_hs256
 from core.auth.oidc import extract_scopes_from_keycloak, extract_tenant_from_groups, verify_oidc_token
+from core import invalidation_bus
+from core.demo_metrics import inc
 from core.settings import settings
 
+# LRU of verified tokens: sha256(token) -> (auth context, exp, settings fingerprint).
+# Agents resend the same bearer token many times a minute; signature checks
+# (RS256 for OIDC in particular) only need to run once per token.
+_token_cache: OrderedDict[str, tuple[dict[str, Any], float, tuple]] = OrderedDict()
+_token_cache_lock = threading.Lock()
+
 
 def verify_access_token(token: str) -> dict[str, Any]:
     # Spaces demo mode: accept demo token regardless of AUTH_MODE
@@ -39,3 +51,75 @@ def auth_context_from_claims(claims: dict[str, Any]) -> dict[str, Any]:
     scopes = extract_scopes(claims)
     tenant_id = extract_tenant_id(claims)
     return {"claims": claims, "scopes": scopes, "tenant_id": tenant_id}
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _settings_fingerprint() -> tuple:
+    # A cached verdict is only valid under the configuration that produced it.
+    return (
+        settings.auth_mode.lower(),
+        settings.demo_mode,
+        settings.auth_jwt_secret,
+        settings.auth_jwt_issuer,
+        settings.demo_jwt_secret,
+        settings.oidc_issuer,
+        settings.oidc_audience,
+        settings.oidc_client_id,
+    )
+
+
+def authenticate(token: str) -> dict[str, Any]:
+    """Verify `token` and return its auth context, served from cache until the token's exp.
+
+    Raises whatever `verify_access_token` raises for invalid tokens; failures
+    are never cached.
+    """
+    max_entries = settings.auth_token_cache_max_entries
+    if max_entries <= 0:
+        return auth_context_from_claims(verify_access_token(token))
+
+    key = _token_key(token)
+    fingerprint = _settings_fingerprint()
+    now = time.time()
+    with _token_cache_lock:
+        entry = _token_cache.get(key)
+        if entry is not None:
+            ctx, exp, fp = entry
+            if exp > now and fp == fingerprint:
+                _token_cache.move_to_end(key)
+                inc("auth_token_cache_hit_total")
+                return ctx
+            del _token_cache[key]
+
+    inc("auth_token_cache_miss_total")
+    ctx = auth_context_from_claims(verify_access_token(token))
+    exp = ctx["claims"].get("exp")
+    if not isinstance(exp, (int, float)):
+        return ctx
+
+    with _token_cache_lock:
+        _token_cache[key] = (ctx, float(exp), fingerprint)
+        _token_cache.move_to_end(key)
+        while len(_token_cache) > max_entries:
+            _token_cache.popitem(last=False)
+    return ctx
+
+
+def _drop_cached_token(key: str) -> None:
+    with _token_cache_lock:
+        if key == "*":
+            _token_cache.clear()
+        else:
+            _token_cache.pop(key, None)
+
+
+invalidation_bus.subscribe(invalidation_bus.AUTH_TOKEN, _drop_cached_token)
+
+
+def invalidate_token_cache(token: str | None = None) -> None:
+    """Drop one token (or, with no argument, every token) from the verification cache on every worker."""
+    # Only the hash goes on the bus; raw bearer tokens never reach the database
+    invalidation_bus.publish(invalidation_bus.AUTH_TOKEN, "*" if token is None else _token_key(token))
@@ -0,0 +1,85 @@
+"""Bloom filters used as cheap "definitely not seen" front ends.
+
+`BloomFilter` is a fixed-size bit array with k hash positions derived from a
+single BLAKE2b digest (Kirsch–Mitzenmacher double hashing).
+
+`RotatingBloomFilter` splits a time horizon into partitions by insertion time.
+Items are added to the newest partition and looked up across all live ones;
+partitions older than the horizon are dropped, so memory stays bounded while
+every item remains visible for at least `horizon_seconds` after it was added.
+
+Neither class is thread-safe; callers serialise access with their own lock.
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+import time
+from typing import Optional
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(1, int(capacity))
+        error_rate = min(max(float(error_rate), 1e-9), 0.5)
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        for pos in self._positions(item):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+
+class RotatingBloomFilter:
+    def __init__(
+        self,
+        *,
+        horizon_seconds: float,
+        partitions: int = 4,
+        capacity_per_partition: int = 100_000,
+        error_rate: float = 0.01,
+    ):
+        self.horizon_seconds = float(horizon_seconds)
+        self.partitions = max(1, int(partitions))
+        self.slice_seconds = self.horizon_seconds / self.partitions
+        self.capacity_per_partition = capacity_per_partition
+        self.error_rate = error_rate
+        # Oldest first: [(partition_start_ts, filter), ...]
+        self._filters: list[tuple[float, BloomFilter]] = []
+
+    def _rotate(self, now: float) -> None:
+        if not self._filters or now - self._filters[-1][0] >= self.slice_seconds:
+            self._filters.append((now, BloomFilter(self.capacity_per_partition, self.error_rate)))
+        # A partition may be dropped once its *newest* possible item is older than
+        # the horizon, i.e. when the next partition started more than horizon ago.
+        cutoff = now - self.horizon_seconds
+        while len(self._filters) > 1 and self._filters[1][0] <= cutoff:
+            self._filters.pop(0)
+
+    def add(self, item: str, now: Optional[float] = None) -> None:
+        self._rotate(time.time() if now is None else now)
+        self._filters[-1][1].add(item)
+
+    def might_contain(self, item: str, now: Optional[float] = None) -> bool:
+        self._rotate(time.time() if now is None else now)
+        return any(item in f for _, f in self._filters)
+
+    def clear(self) -> None:
+        self._filters.clear()
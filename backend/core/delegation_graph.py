@@ -0,0 +1,255 @@
+"""In-memory adjacency index of `delegation_registry`, per tenant.
+
+Incident questions — what descends from X, what is the chain above Y, what
+would revoking X take down — are graph walks. Recursive SQL or unpacking
+nested delegation JWTs makes them slow; this index answers them from memory.
+
+A tenant's graph is loaded from the table on first use (one query) and then
+kept current incrementally: registration adds a node and revocation marks
+nodes revoked. Other workers' changes arrive over the invalidation bus
+(`DELEGATION_REGISTERED`, `DELEGATION`). The table stays authoritative;
+revocation itself still runs against it.
+"""
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+from core import invalidation_bus
+from core.demo_metrics import inc
+
+
+@dataclass
+class Node:
+    jti: str
+    parent_jti: Optional[str]
+    issuer_did: str
+    subject_did: str
+    revoked: bool = False
+
+    def as_dict(self, depth: int) -> dict[str, Any]:
+        return {
+            "jti": self.jti,
+            "parent_jti": self.parent_jti,
+            "issuer_did": self.issuer_did,
+            "subject_did": self.subject_did,
+            "revoked": self.revoked,
+            "depth": depth,
+        }
+
+
+class TenantGraph:
+    """jti -> node, and jti -> child jtis. Not thread-safe; guarded by the module lock."""
+
+    def __init__(self) -> None:
+        self.nodes: dict[str, Node] = {}
+        self.children: dict[str, list[str]] = {}
+
+    def add(self, node: Node) -> None:
+        if node.jti in self.nodes:
+            return
+        self.nodes[node.jti] = node
+        if node.parent_jti is not None:
+            self.children.setdefault(node.parent_jti, []).append(node.jti)
+
+    def descendants(self, jti: str) -> list[tuple[Node, int]]:
+        """`jti` and everything below it with depth relative to `jti`, parents first."""
+        out: list[tuple[Node, int]] = []
+        seen = {jti}
+        frontier = [jti]
+        depth = 0
+        while frontier:
+            nxt = []
+            for current in frontier:
+                out.append((self.nodes[current], depth))
+                for child in self.children.get(current, ()):
+                    if child not in seen and child in self.nodes:
+                        seen.add(child)
+                        nxt.append(child)
+            frontier = nxt
+            depth += 1
+        return out
+
+    def ancestors(self, jti: str) -> list[Node]:
+        """The chain from the root down to `jti` (inclusive)."""
+        chain: list[Node] = []
+        seen: set[str] = set()
+        current: Optional[str] = jti
+        while current is not None and current in self.nodes and current not in seen:
+            seen.add(current)
+            node = self.nodes[current]
+            chain.append(node)
+            current = node.parent_jti
+        chain.reverse()
+        return chain
+
+    def depths(self) -> dict[str, int]:
+        """Absolute depth of every node (roots are 0)."""
+        depth: dict[str, int] = {}
+        for jti in self.nodes:
+            if jti in depth:
+                continue
+            path = []
+            current: Optional[str] = jti
+            while current is not None and current in self.nodes and current not in depth:
+                if current in path:  # parent_jti cycle: treat its entry point as a root
+                    break
+                path.append(current)
+                current = self.nodes[current].parent_jti
+            base = depth.get(current, -1) if current is not None else -1
+            for i, node_jti in enumerate(reversed(path)):
+                depth[node_jti] = base + 1 + i
+        return depth
+
+
+# One lock for loads and updates: an update arriving while a tenant loads
+# waits and is applied on top of the loaded graph, never lost.
+_lock = threading.RLock()
+_graphs: dict[str, TenantGraph] = {}
+_tenant_of: dict[str, str] = {}
+
+
+def _load(tenant_id: str) -> TenantGraph:
+    from core.db import db_session
+    from models import DelegationRegistry
+
+    g = TenantGraph()
+    with db_session() as db:
+        rows = db.query(
+            DelegationRegistry.jti,
+            DelegationRegistry.parent_jti,
+            DelegationRegistry.issuer_did,
+            DelegationRegistry.subject_did,
+            DelegationRegistry.revoked_at,
+        ).filter(DelegationRegistry.tenant_id == tenant_id).all()
+    for jti, parent_jti, issuer_did, subject_did, revoked_at in rows:
+        g.add(Node(jti, parent_jti, issuer_did, subject_did, revoked_at is not None))
+    inc("delegation_graph_load_total")
+    return g
+
+
+def _graph(tenant_id: str) -> TenantGraph:
+    g = _graphs.get(tenant_id)
+    if g is None:
+        g = _load(tenant_id)
+        _graphs[tenant_id] = g
+        for jti in g.nodes:
+            _tenant_of[jti] = tenant_id
+    return g
+
+
+def add(
+    tenant_id: str,
+    jti: str,
+    parent_jti: Optional[str],
+    issuer_did: str,
+    subject_did: str,
+    revoked: bool = False,
+) -> None:
+    """Record a newly registered delegation (a no-op until the tenant is loaded)."""
+    with _lock:
+        g = _graphs.get(tenant_id)
+        if g is None:
+            return
+        g.add(Node(jti, parent_jti, issuer_did, subject_did, revoked))
+        _tenant_of[jti] = tenant_id
+
+
+def mark_revoked(jtis: Iterable[str]) -> None:
+    with _lock:
+        for jti in jtis:
+            tenant_id = _tenant_of.get(jti)
+            g = _graphs.get(tenant_id) if tenant_id is not None else None
+            if g is not None and jti in g.nodes:
+                g.nodes[jti].revoked = True
+
+
+def forget(tenant_id: Optional[str] = None) -> None:
+    """Drop one tenant's graph (or all); it is reloaded on next use."""
+    with _lock:
+        tenants = list(_graphs) if tenant_id is None else [tenant_id]
+        for t in tenants:
+            g = _graphs.pop(t, None)
+            if g is not None:
+                for jti in g.nodes:
+                    _tenant_of.pop(jti, None)
+
+
+def _on_registered(jti: str) -> None:
+    with _lock:
+        if jti in _tenant_of or not _graphs:
+            return
+        from core.db import db_session
+        from models import DelegationRegistry
+
+        with db_session() as db:
+            row = db.get(DelegationRegistry, jti)
+            if row is None:
+                return
+            add(row.tenant_id, row.jti, row.parent_jti, row.issuer_did, row.subject_did, row.revoked_at is not None)
+
+
+def _on_revoked(jti: str) -> None:
+    mark_revoked([jti])
+
+
+invalidation_bus.subscribe(invalidation_bus.DELEGATION_REGISTERED, _on_registered)
+invalidation_bus.subscribe(invalidation_bus.DELEGATION, _on_revoked)
+
+
+# ── Queries ───────────────────────────────────────────────────────────────────
+# Each returns None when `jti` is not registered for the tenant.
+
+def subtree(tenant_id: str, jti: str, include_revoked: bool = True) -> Optional[list[dict[str, Any]]]:
+    with _lock:
+        g = _graph(tenant_id)
+        if jti not in g.nodes:
+            return None
+        return [
+            node.as_dict(depth)
+            for node, depth in g.descendants(jti)
+            if include_revoked or not node.revoked
+        ]
+
+
+def ancestors(tenant_id: str, jti: str) -> Optional[list[dict[str, Any]]]:
+    with _lock:
+        g = _graph(tenant_id)
+        if jti not in g.nodes:
+            return None
+        return [node.as_dict(depth) for depth, node in enumerate(g.ancestors(jti))]
+
+
+def impact(tenant_id: str, jti: str) -> Optional[dict[str, Any]]:
+    """What a cascade revocation of `jti` would take down."""
+    with _lock:
+        g = _graph(tenant_id)
+        if jti not in g.nodes:
+            return None
+        below = g.descendants(jti)
+        active = [node for node, _ in below if not node.revoked]
+        return {
+            "jti": jti,
+            "descendants": len(below) - 1,
+            "active_affected": len(active),
+            "max_depth_below": max(depth for _, depth in below),
+            "subjects_affected": sorted({node.subject_did for node in active}),
+        }
+
+
+def stats(tenant_id: str) -> dict[str, Any]:
+    with _lock:
+        g = _graph(tenant_id)
+        depths = g.depths()
+        histogram = Counter(depths.values())
+        revoked = sum(1 for node in g.nodes.values() if node.revoked)
+        return {
+            "delegations": len(g.nodes),
+            "revoked": revoked,
+            "active": len(g.nodes) - revoked,
+            "roots": histogram.get(0, 0),
+            "max_depth": max(depths.values(), default=0),
+            "depth_histogram": {str(d): histogram[d] for d in sorted(histogram)},
+        }
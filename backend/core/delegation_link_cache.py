@@ -0,0 +1,121 @@
+"""Cache of verified delegation chain links, keyed by link token hash.
+
+Leaf delegations issued under the same root share every ancestor link, yet
+each presentation used to re-verify the whole chain: signature, DID
+resolution and status check per ancestor. An entry here records a link that
+verified together with everything above it — the chain down to it and its
+effective scope — so a warm chain costs one signature check for the new leaf.
+
+An entry lives until the earliest ``exp`` in its chain or
+`DELEGATION_LINK_CACHE_TTL_SECONDS`, whichever is sooner, and depends on
+version counters captured before verification for every link in the chain:
+
+- ``jti:<jti>``, bumped when that delegation is revoked (`DELEGATION`);
+- ``status:<key>``, bumped when its local status list changes (`STATUS_LIST`);
+- ``did:<did>``, bumped when the issuer's keys change (`AGENT_KEYS`).
+
+Revoking any ancestor therefore invalidates every descendant link at once.
+Remote status lists cannot notify us; for those the TTL bounds staleness.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+from core import invalidation_bus
+from core.demo_metrics import inc
+from core.settings import settings
+
+Deps = tuple[tuple[str, int], ...]
+
+
+@dataclass(frozen=True)
+class Link:
+    chain: list[dict[str, Any]]
+    effective_scope: dict[str, Any]
+    expires_at: float
+    deps: Deps
+
+
+_lock = threading.Lock()
+_entries: OrderedDict[str, Link] = OrderedDict()
+_versions: dict[str, int] = {}
+
+
+def _key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def snapshot(keys: Iterable[str]) -> Deps:
+    """Capture the current versions of `keys`. Take it *before* verifying, so an
+    invalidation that lands mid-verification invalidates the link being stored."""
+    with _lock:
+        return tuple((k, _versions.get(k, 0)) for k in keys)
+
+
+def get(token: str) -> Optional[Link]:
+    if settings.delegation_link_cache_max_entries <= 0:
+        return None
+    key = _key(token)
+    now = time.time()
+    with _lock:
+        link = _entries.get(key)
+        if link is not None:
+            if link.expires_at > now and all(_versions.get(k, 0) == v for k, v in link.deps):
+                _entries.move_to_end(key)
+                inc("delegation_link_cache_hit_total")
+                return link
+            del _entries[key]
+    inc("delegation_link_cache_miss_total")
+    return None
+
+
+def put(token: str, chain: list[dict[str, Any]], effective_scope: dict[str, Any], expires_at: float, deps: Deps) -> Link:
+    """Record a verified link; returns it with `expires_at` capped by the TTL."""
+    link = Link(chain, effective_scope, min(expires_at, time.time() + settings.delegation_link_cache_ttl_seconds), deps)
+    max_entries = settings.delegation_link_cache_max_entries
+    if max_entries <= 0 or link.expires_at <= time.time():
+        return link
+    key = _key(token)
+    with _lock:
+        _entries[key] = link
+        _entries.move_to_end(key)
+        while len(_entries) > max_entries:
+            _entries.popitem(last=False)
+    return link
+
+
+def invalidate(dep: str) -> None:
+    with _lock:
+        _versions[dep] = _versions.get(dep, 0) + 1
+
+
+def _on_delegation_revoked(jti: str) -> None:
+    invalidate(f"jti:{jti}")
+
+
+def _on_status_list_changed(status_list_id: str) -> None:
+    invalidate(f"status:{status_list_id}")
+
+
+def _on_agent_keys_changed(did: str) -> None:
+    invalidate(f"did:{did}")
+
+
+invalidation_bus.subscribe(invalidation_bus.DELEGATION, _on_delegation_revoked)
+invalidation_bus.subscribe(invalidation_bus.STATUS_LIST, _on_status_list_changed)
+invalidation_bus.subscribe(invalidation_bus.AGENT_KEYS, _on_agent_keys_changed)
+
+
+def clear() -> None:
+    with _lock:
+        _entries.clear()
+
+
+def size() -> int:
+    with _lock:
+        return len(_entries)
@@ -8,6 +8,7 @@ from urllib.parse import unquote
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
 
+from core.key_cache import public_key_cache
 from core.settings import settings
 
 DID_CONTEXT = "https://www.w3.org/ns/did/v1"
@@ -103,6 +104,12 @@ def build_did_document_multi(*, did: str, keys: list[dict[str, Any]]) -> dict[st
 def public_key_from_jwk(jwk: dict[str, Any]) -> Ed25519PublicKey:
     if jwk.get("kty") != "OKP" or jwk.get("crv") != "Ed25519":
         raise ValueError("Unsupported JWK")
+    if not isinstance(jwk.get("x"), str):
+        raise ValueError("Invalid JWK")
+    return public_key_cache.get_or_load(jwk, _load_ed25519_public_key)
+
+
+def _load_ed25519_public_key(jwk: dict[str, Any]) -> Ed25519PublicKey:
     x = jwk.get("x")
     if not isinstance(x, str):
         raise ValueError("Invalid JWK")
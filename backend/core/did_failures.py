@@ -0,0 +1,174 @@
+"""Failure handling for did:web resolution: negative cache, per-host backoff
+and circuit breaker.
+
+- A failed resolution is remembered per DID for `DID_NEGATIVE_CACHE_TTL_SECONDS`;
+  repeats fail immediately instead of waiting on the host again.
+- Host-level failures (timeouts, connection errors, 5xx/429) back the
+  negative TTL off exponentially per host, up to `DID_BACKOFF_MAX_SECONDS`.
+- After `DID_BREAKER_FAILURE_THRESHOLD` consecutive host-level failures the
+  host's breaker opens for `DID_BREAKER_OPEN_SECONDS` and every fetch to it
+  fails fast. Then one trial request is let through (half-open): success
+  closes the breaker, failure opens it again.
+
+A 404 or an unparseable document is a failure of that DID, not of the host:
+it is negative-cached with the base TTL and closes a half-open breaker.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
+
+import httpx
+
+from core.demo_metrics import inc
+from core.settings import settings
+
+
+class DIDResolutionError(ValueError):
+    """Resolution failed recently; served from the negative cache."""
+
+
+class HostUnavailableError(DIDResolutionError):
+    """The DID host's circuit breaker is open."""
+
+
+@dataclass
+class _HostState:
+    consecutive_failures: int = 0
+    open_until: Optional[float] = None
+    trial_in_flight: bool = False
+
+
+_lock = threading.Lock()
+# did -> (error message, expires_at monotonic)
+_negative: OrderedDict[str, tuple[str, float]] = OrderedDict()
+_hosts: dict[str, _HostState] = {}
+
+
+def is_host_failure(exc: BaseException) -> bool:
+    if isinstance(exc, httpx.TransportError):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        code = exc.response.status_code
+        return code >= 500 or code == 429
+    return False
+
+
+def check(did: str, host: str) -> None:
+    """Raise if `did` failed recently or `host`'s breaker is open; otherwise
+    the caller may fetch (and must report the outcome via `record_*`)."""
+    now = time.monotonic()
+    with _lock:
+        entry = _negative.get(did)
+        if entry is not None:
+            message, expires_at = entry
+            if expires_at > now:
+                inc("did_negative_cache_hit_total")
+                raise DIDResolutionError(f"{message} (cached failure, retry in {expires_at - now:.0f}s)")
+            del _negative[did]
+
+        state = _hosts.get(host)
+        if state is None or state.open_until is None:
+            return
+        if now < state.open_until or state.trial_in_flight:
+            inc("did_breaker_fast_fail_total")
+            raise HostUnavailableError(f"DID host {host} unavailable (circuit open)")
+        # Half-open: this caller is the trial
+        state.trial_in_flight = True
+
+
+def record_success(host: str) -> None:
+    with _lock:
+        state = _hosts.pop(host, None)
+    if state is not None and state.open_until is not None:
+        inc("did_breaker_closed_total")
+
+
+def record_failure(did: str, host: str, exc: BaseException) -> None:
+    now = time.monotonic()
+    base_ttl = settings.did_negative_cache_ttl_seconds
+    host_failure = is_host_failure(exc)
+    with _lock:
+        state = _hosts.setdefault(host, _HostState())
+        if host_failure:
+            state.consecutive_failures += 1
+            ttl = min(settings.did_backoff_max_seconds, base_ttl * 2 ** (state.consecutive_failures - 1))
+            if state.trial_in_flight or (
+                state.open_until is None and state.consecutive_failures >= settings.did_breaker_failure_threshold
+            ):
+                state.open_until = now + settings.did_breaker_open_seconds
+                inc("did_breaker_opened_total")
+            state.trial_in_flight = False
+        else:
+            ttl = base_ttl
+            # The host answered: it is up, whatever it said about this DID
+            if state.open_until is not None:
+                inc("did_breaker_closed_total")
+            del _hosts[host]
+
+        if ttl > 0:
+            _negative[did] = (str(exc) or type(exc).__name__, now + ttl)
+            _negative.move_to_end(did)
+            while len(_negative) > settings.did_cache_max_size:
+                _negative.popitem(last=False)
+    inc("did_resolve_failure_total")
+    if host_failure:
+        inc("did_resolve_host_failure_total")
+
+
+def abandon(host: str) -> None:
+    """The caller gave up without an outcome (e.g. cancelled): free the half-open trial."""
+    with _lock:
+        state = _hosts.get(host)
+        if state is not None:
+            state.trial_in_flight = False
+
+
+@contextmanager
+def guard(did: str, host: str) -> Iterator[None]:
+    """`check`, then record the outcome of the resolution attempt in the block."""
+    check(did, host)
+    try:
+        yield
+    except Exception as exc:
+        record_failure(did, host, exc)
+        raise
+    except BaseException:
+        abandon(host)
+        raise
+    record_success(host)
+
+
+def forget(did: str) -> None:
+    with _lock:
+        _negative.pop(did, None)
+
+
+def clear_negative_cache() -> None:
+    with _lock:
+        _negative.clear()
+
+
+def reset() -> None:
+    """Clear the negative cache and all breaker state."""
+    with _lock:
+        _negative.clear()
+        _hosts.clear()
+
+
+def host_status() -> dict[str, Any]:
+    now = time.monotonic()
+    with _lock:
+        hosts = {
+            host: {
+                "consecutive_failures": s.consecutive_failures,
+                "state": "closed" if s.open_until is None else ("open" if now < s.open_until else "half_open"),
+                "open_for_seconds": max(0.0, s.open_until - now) if s.open_until is not None else 0.0,
+            }
+            for host, s in _hosts.items()
+        }
+        return {"negative_cache_size": len(_negative), "hosts": hosts}
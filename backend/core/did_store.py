@@ -0,0 +1,149 @@
+"""Persistent second-tier cache of did:web documents (`did_document_cache`).
+
+The resolver's in-memory LRU is empty after every restart, so each new worker
+would re-fetch every partner DID document right after a deploy. With
+`DID_CACHE_PERSISTENT` enabled, an L1 miss consults this table:
+
+- a row younger than `DID_CACHE_TTL_SECONDS` is served without any fetch;
+- an older row supplies its ``ETag`` / ``Last-Modified`` validators so the
+  refetch is a conditional GET, and a ``304`` reuses the stored document.
+
+Writes never block resolution: they are queued and upserted by a background
+thread (`start_did_store_writer`), coalesced per DID.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from core.demo_metrics import inc
+
+logger = logging.getLogger(__name__)
+
+_FLUSH_INTERVAL_SECONDS = 0.5
+
+
+@dataclass(frozen=True)
+class StoredDocument:
+    document: dict[str, Any]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float  # epoch seconds
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+_pending: dict[str, StoredDocument] = {}
+_pending_lock = threading.Lock()
+_worker: Optional[threading.Thread] = None
+_worker_stop = threading.Event()
+_worker_lock = threading.Lock()
+
+
+def load(did: str) -> Optional[StoredDocument]:
+    with _pending_lock:
+        queued = _pending.get(did)
+    if queued is not None:
+        return queued
+    try:
+        from core.db import db_session
+        from models import DIDDocumentCache
+
+        with db_session() as db:
+            row = db.get(DIDDocumentCache, did)
+            if row is None:
+                return None
+            fetched_at = row.fetched_at
+            if fetched_at.tzinfo is None:
+                fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+            return StoredDocument(
+                document=row.document,
+                etag=row.etag,
+                last_modified=row.last_modified,
+                fetched_at=fetched_at.timestamp(),
+            )
+    except Exception:
+        # If the table doesn't exist yet (pre-migration), behave as a miss.
+        logger.debug("did_document_cache lookup failed", exc_info=True)
+        return None
+
+
+def save(did: str, stored: StoredDocument) -> None:
+    """Queue a row for the background writer."""
+    with _pending_lock:
+        _pending[did] = stored
+    start_did_store_writer()
+
+
+def flush() -> int:
+    """Upsert queued rows. Returns the number written."""
+    with _pending_lock:
+        if not _pending:
+            return 0
+        batch = list(_pending.items())
+        _pending.clear()
+    try:
+        from core.db import db_session
+        from models import DIDDocumentCache
+
+        with db_session() as db:
+            for did, stored in batch:
+                db.merge(DIDDocumentCache(
+                    did=did,
+                    document=stored.document,
+                    etag=stored.etag,
+                    last_modified=stored.last_modified,
+                    fetched_at=datetime.fromtimestamp(stored.fetched_at, tz=timezone.utc),
+                ))
+            db.commit()
+        inc("did_cache_l2_written_total", len(batch))
+    except Exception:
+        logger.debug("did_document_cache write failed — %d documents not persisted", len(batch), exc_info=True)
+    return len(batch)
+
+
+def clear() -> None:
+    with _pending_lock:
+        _pending.clear()
+    try:
+        from core.db import db_session
+        from models import DIDDocumentCache
+
+        with db_session() as db:
+            db.query(DIDDocumentCache).delete(synchronize_session=False)
+            db.commit()
+    except Exception:
+        logger.debug("did_document_cache clear failed", exc_info=True)
+
+
+def _worker_loop() -> None:
+    while not _worker_stop.wait(_FLUSH_INTERVAL_SECONDS):
+        flush()
+    flush()
+
+
+def start_did_store_writer() -> None:
+    global _worker
+    with _worker_lock:
+        if _worker is not None and _worker.is_alive():
+            return
+        _worker_stop.clear()
+        _worker = threading.Thread(target=_worker_loop, name="did-store-writer", daemon=True)
+        _worker.start()
+
+
+def stop_did_store_writer(timeout: float = 5.0) -> None:
+    """Stop the writer after a final flush."""
+    global _worker
+    with _worker_lock:
+        worker, _worker = _worker, None
+    if worker is None:
+        return
+    _worker_stop.set()
+    worker.join(timeout)
@@ -0,0 +1,64 @@
+"""Shared outbound HTTP client for the async verification path.
+
+A client per call throws the connection pool away, so every DID document or
+status list fetch pays a fresh TCP + TLS handshake. `get_async_client` hands
+out one pooled `httpx.AsyncClient` (keep-alive, optionally HTTP/2) and
+`aclose_async_client` closes it on shutdown.
+
+An AsyncClient's connections belong to the event loop that opened them, so
+there is one client per running loop. Under uvicorn that is exactly one;
+TestClient and anyio portals may run several.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import weakref
+
+import httpx
+
+from core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def _http2_enabled() -> bool:
+    if not settings.outbound_http2:
+        return False
+    try:
+        import h2  # type: ignore  # noqa: F401
+    except ImportError:  # pragma: no cover - optional dependency
+        logger.warning("OUTBOUND_HTTP2=true but the 'h2' package is not installed; using HTTP/1.1")
+        return False
+    return True
+
+
+def build_async_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(settings.outbound_http_timeout_seconds),
+        limits=httpx.Limits(
+            max_connections=settings.outbound_http_max_connections,
+            max_keepalive_connections=settings.outbound_http_max_keepalive,
+            keepalive_expiry=settings.outbound_http_keepalive_expiry_seconds,
+        ),
+        http2=_http2_enabled(),
+    )
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Return the shared client for the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = build_async_client()
+        _clients[loop] = client
+    return client
+
+
+async def aclose_async_client() -> None:
+    """Close the running loop's shared client (called from app shutdown)."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -0,0 +1,206 @@
+"""Cross-worker cache invalidation bus.
+
+In-process caches (verification results, local DID documents, auth tokens)
+are only safe under revocation if every worker hears about it. Writers call
+`publish(topic, key)` after committing; that invalidates this process
+immediately and appends a row to the `cache_epochs` table. Every worker runs
+a listener thread (`start_invalidation_listener`) that polls the table every
+`CACHE_INVALIDATION_POLL_MS` and hands other workers' events to the
+subscribers registered with `subscribe(topic, handler)`, so propagation is
+bounded by the poll interval. The observed delay is recorded as the
+``cache_invalidation_propagation_ms`` latency metric.
+
+The table works the same on SQLite and Postgres. Each poll re-reads a short
+window below the last epoch seen, because concurrent inserts can commit out
+of epoch order; handlers must be idempotent.
+
+Topics and keys:
+
+- `AGENT_KEYS`: an agent DID whose keys changed, or whose agent was created
+  or deleted.
+- `STATUS_LIST`: a local status list id whose bits changed.
+- `DELEGATION`: a revoked delegation JTI.
+- `DELEGATION_REGISTERED`: a newly registered delegation JTI.
+- `AUTH_TOKEN`: the sha256 of a bearer token, or ``"*"`` for all tokens.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, Optional
+
+from core.demo_metrics import inc, observe_ms
+from core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+AGENT_KEYS = "agent_keys"
+STATUS_LIST = "status_list"
+DELEGATION = "delegation"
+DELEGATION_REGISTERED = "delegation_registered"
+AUTH_TOKEN = "auth_token"
+
+# Epochs re-read below the high-water mark on each poll (out-of-order commits)
+_REREAD_WINDOW = 100
+_POLL_BATCH = 1000
+_PRUNE_INTERVAL_SECONDS = 60.0
+
+_ORIGIN = uuid.uuid4().hex
+
+_subscribers: dict[str, list[Callable[[str], None]]] = defaultdict(list)
+_subscribers_lock = threading.Lock()
+
+_state_lock = threading.Lock()
+_last_epoch: Optional[int] = None
+_floor_epoch = 0  # high-water mark at the first poll; nothing at or below it is applied
+_applied: deque[int] = deque(maxlen=4 * _REREAD_WINDOW)
+
+_worker: Optional[threading.Thread] = None
+_worker_stop = threading.Event()
+
+
+def subscribe(topic: str, handler: Callable[[str], None]) -> None:
+    """Call `handler(key)` for every invalidation on `topic`, local or remote."""
+    with _subscribers_lock:
+        if handler not in _subscribers[topic]:
+            _subscribers[topic].append(handler)
+
+
+def _deliver(topic: str, key: str) -> None:
+    with _subscribers_lock:
+        handlers = list(_subscribers.get(topic, ()))
+    for handler in handlers:
+        try:
+            handler(key)
+        except Exception:
+            logger.exception("Cache invalidation handler failed for %s %r", topic, key)
+
+
+def publish(topic: str, key: str) -> None:
+    """Invalidate `key` in this process now and in every other worker within one poll interval.
+
+    Call after the change has been committed.
+    """
+    publish_many(topic, [key])
+
+
+def publish_many(topic: str, keys: Iterable[str]) -> None:
+    """`publish` several keys on one topic with a single insert transaction."""
+    keys = [str(k) for k in keys]
+    if not keys:
+        return
+    for key in keys:
+        _deliver(topic, key)
+    inc("cache_invalidation_published_total", len(keys))
+    if not settings.cache_invalidation_bus_enabled:
+        return
+    try:
+        from core.db import db_session
+        from models import CacheEpoch
+
+        now = datetime.now(timezone.utc)
+        with db_session() as db:
+            db.add_all([CacheEpoch(topic=topic, key=key[:500], origin=_ORIGIN, created_at=now) for key in keys])
+            db.commit()
+    except Exception:
+        # If the table doesn't exist yet (pre-migration), other workers fall back to cache TTLs.
+        logger.warning("Could not publish %d cache invalidation(s) on %s to other workers", len(keys), topic, exc_info=True)
+
+
+def _to_ts(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def poll_once() -> int:
+    """Apply other workers' invalidations since the last poll. Returns how many were applied."""
+    global _last_epoch, _floor_epoch
+    from sqlalchemy import func
+
+    from core.db import db_session
+    from models import CacheEpoch
+
+    with db_session() as db:
+        if _last_epoch is None:
+            # First poll: start from now; older events predate this process's caches
+            with _state_lock:
+                _last_epoch = _floor_epoch = db.query(func.max(CacheEpoch.epoch)).scalar() or 0
+            return 0
+        rows = (
+            db.query(CacheEpoch.epoch, CacheEpoch.topic, CacheEpoch.key, CacheEpoch.origin, CacheEpoch.created_at)
+            .filter(CacheEpoch.epoch > max(_floor_epoch, _last_epoch - _REREAD_WINDOW))
+            .order_by(CacheEpoch.epoch.asc())
+            .limit(_POLL_BATCH)
+            .all()
+        )
+
+    applied = 0
+    now = time.time()
+    for epoch, topic, key, origin, created_at in rows:
+        with _state_lock:
+            if epoch in _applied:
+                continue
+            _applied.append(epoch)
+            _last_epoch = max(_last_epoch, epoch)
+        if origin == _ORIGIN:
+            continue
+        _deliver(topic, key)
+        applied += 1
+        inc("cache_invalidation_received_total")
+        observe_ms("cache_invalidation_propagation_ms", max(0.0, now - _to_ts(created_at)) * 1000.0)
+    return applied
+
+
+def prune() -> int:
+    """Delete events older than `CACHE_INVALIDATION_RETENTION_SECONDS`."""
+    from core.db import db_session
+    from models import CacheEpoch
+
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.cache_invalidation_retention_seconds)
+    with db_session() as db:
+        n = db.query(CacheEpoch).filter(CacheEpoch.created_at < cutoff).delete(synchronize_session=False)
+        db.commit()
+    return n or 0
+
+
+def _worker_loop() -> None:
+    interval = max(settings.cache_invalidation_poll_ms, 10) / 1000.0
+    last_prune = time.monotonic()
+    while not _worker_stop.wait(interval):
+        try:
+            poll_once()
+            if time.monotonic() - last_prune >= _PRUNE_INTERVAL_SECONDS:
+                last_prune = time.monotonic()
+                prune()
+        except Exception:
+            inc("cache_invalidation_poll_error_total")
+            logger.debug("cache_epochs poll failed", exc_info=True)
+
+
+def start_invalidation_listener() -> None:
+    global _worker
+    if not settings.cache_invalidation_bus_enabled:
+        return
+    if _worker is not None and _worker.is_alive():
+        return
+    try:
+        poll_once()  # establish the starting epoch
+    except Exception:
+        logger.debug("cache_epochs not available yet", exc_info=True)
+    _worker_stop.clear()
+    _worker = threading.Thread(target=_worker_loop, name="cache-invalidation-bus", daemon=True)
+    _worker.start()
+
+
+def stop_invalidation_listener(timeout: float = 5.0) -> None:
+    global _worker
+    worker, _worker = _worker, None
+    if worker is None:
+        return
+    _worker_stop.set()
+    worker.join(timeout)
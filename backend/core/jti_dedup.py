@@ -1,10 +1,36 @@
 """JTI deduplication — prevents JWT replay attacks.
 
-Uses an in-memory dict as a fast hot-path (evicted by TTL on access), with a
-DB write-through to the `seen_jtis` table for persistence across restarts.
-
-On startup, `warm_jti_cache()` loads non-expired JTIs from the DB so replay
-protection is active immediately without any warm-up window.
+Uses an in-memory dict as a fast hot-path, persisted to the `seen_jtis` table
+so replay protection survives restarts. Expiry is tracked in a min-heap ordered
+by `expires_at`, so each check only pops the entries that have actually expired
+(amortised O(log n)) instead of scanning the whole store.
+
+Every in-memory miss is claimed in `seen_jtis` with one atomic
+``INSERT ... ON CONFLICT`` (an expired row is taken over), so a JTI already
+recorded by any worker process is rejected as a replay.
+
+Single-process deployments can set `JTI_PERSIST_WRITE_BEHIND` to skip that
+round trip. A rotating Bloom filter then sits in front of the DB: a JTI
+missing from both the store and the filter is definitely new to this process
+and costs no DB round trip; only "maybe seen" JTIs (evicted entries, filter
+false positives, JTIs outlasting the filter horizon) are looked up in
+`seen_jtis`. New rows are buffered and written in batches by the background
+worker. The filter only knows this process's JTIs, so with several workers a
+replay sent to a different worker would be accepted — never enable it there.
+
+The background worker also deletes expired `seen_jtis` rows in chunks.
+
+The store is bounded by `JTI_DEDUP_MAX_ENTRIES`. When full, the
+`JTI_DEDUP_OVERFLOW_POLICY` decides what happens to a new JTI:
+
+- ``evict`` (default): drop the entries closest to expiry to make room. Replay
+  protection for evicted JTIs continues through the `seen_jtis` table.
+- ``reject``: fail closed and refuse the new JTI until entries expire.
+
+On startup, `warm_jti_cache()` streams non-expired JTIs from the DB in chunks,
+normally on a background thread (`start_jti_cache_warmup()`). While it runs,
+every in-memory miss is checked against `seen_jtis`, so replay protection is
+active immediately; progress is reported by `jti_warm_status()` on `/ready`.
 
 Usage:
     from core.jti_dedup import check_and_record_jti
@@ -15,106 +41,374 @@ Usage:
 """
 from __future__ import annotations
 
+import heapq
 import logging
 import threading
 import time
 from datetime import datetime, timezone
 from typing import Optional
 
+from core.bloom import RotatingBloomFilter
+from core.demo_metrics import inc
 from core.settings import settings
 
 logger = logging.getLogger(__name__)
 
+OVERFLOW_EVICT = "evict"
+OVERFLOW_REJECT = "reject"
+
 # Thread-safe in-memory dedup store: jti -> (endpoint, first_seen_ts, expires_ts)
 _store: dict[str, tuple[str, float, float]] = {}
+# Min-heap of (expires_ts, jti). Entries whose jti is gone from _store, or whose
+# expiry no longer matches, are stale and skipped when popped.
+_expiry_heap: list[tuple[float, str]] = []
 _lock = threading.Lock()
-
-
-def _evict_expired() -> None:
-    """Remove expired JTI entries. Called on every check to bound memory usage."""
+# Per-process "maybe seen" front end; created lazily from settings.
+_bloom: Optional[RotatingBloomFilter] = None
+
+# Rows waiting for the next batched INSERT: jti -> (endpoint, first_seen_ts, expires_ts)
+_pending: dict[str, tuple[str, float, float]] = {}
+_pending_lock = threading.Lock()
+
+_worker: Optional[threading.Thread] = None
+_worker_stop = threading.Event()
+
+# Warm-up progress. Until _warm_done is set, memory misses consult seen_jtis.
+_warm_done = threading.Event()
+_warm_done.set()
+_warm_lock = threading.Lock()
+_warm_status: dict = {"state": "not_started", "loaded": 0, "chunks": 0, "started_at": None, "finished_at": None}
+
+
+def _get_bloom() -> RotatingBloomFilter:
+    """Return the Bloom filter, creating it on first use. Caller holds _lock."""
+    global _bloom
+    if _bloom is None:
+        _bloom = RotatingBloomFilter(
+            horizon_seconds=settings.jti_dedup_window_seconds,
+            partitions=settings.jti_bloom_partitions,
+            capacity_per_partition=settings.jti_bloom_capacity,
+            error_rate=settings.jti_bloom_error_rate,
+        )
+    return _bloom
+
+
+def _put(jti: str, endpoint: str, first_seen: float, expires_at: float) -> None:
+    """Record a JTI in the store and the expiry heap. Caller holds _lock."""
+    _store[jti] = (endpoint, first_seen, expires_at)
+    heapq.heappush(_expiry_heap, (expires_at, jti))
+
+
+def _pop_soonest() -> Optional[str]:
+    """Remove the live entry closest to expiry. Caller holds _lock."""
+    while _expiry_heap:
+        exp, jti = heapq.heappop(_expiry_heap)
+        entry = _store.get(jti)
+        if entry is not None and entry[2] == exp:
+            del _store[jti]
+            return jti
+    return None
+
+
+def _evict_expired(now: Optional[float] = None) -> None:
+    """Remove expired JTI entries. Only touches entries that have expired."""
+    if now is None:
+        now = time.time()
+    while _expiry_heap and _expiry_heap[0][0] < now:
+        exp, jti = heapq.heappop(_expiry_heap)
+        entry = _store.get(jti)
+        if entry is not None and entry[2] == exp:
+            del _store[jti]
+
+
+def _make_room() -> bool:
+    """Apply the overflow policy when the store is at capacity. Caller holds _lock.
+
+    Returns False if the new JTI must be rejected.
+    """
+    max_entries = settings.jti_dedup_max_entries
+    if max_entries <= 0 or len(_store) < max_entries:
+        return True
+    if settings.jti_dedup_overflow_policy == OVERFLOW_REJECT:
+        return False
+    while len(_store) >= max_entries:
+        evicted = _pop_soonest()
+        if evicted is None:
+            break
+        logger.debug("JTI dedup store full — evicted soonest-expiring entry %s", evicted)
+    return True
+
+
+def _db_seen_jti(jti: str) -> bool:
+    """Return True if the JTI is persisted (or queued for persistence) and unexpired."""
     now = time.time()
-    expired = [k for k, (_, _, exp) in _store.items() if exp < now]
-    for k in expired:
-        del _store[k]
+    with _pending_lock:
+        pending = _pending.get(jti)
+    if pending is not None and pending[2] >= now:
+        return True
+    try:
+        from sqlalchemy import text
+        from core.db import db_session
+
+        with db_session() as db:
+            row = db.execute(
+                text("SELECT 1 FROM seen_jtis WHERE jti = :jti AND expires_at >= :now"),
+                {"jti": jti, "now": datetime.fromtimestamp(now, tz=timezone.utc)},
+            ).fetchone()
+        return row is not None
+    except Exception:
+        # If the DB table doesn't exist yet (pre-migration), fall back silently.
+        logger.debug("seen_jtis DB lookup failed — falling back to in-memory only", exc_info=True)
+        return False  # Optimistic: let in-memory store handle it
 
 
-def _db_record_jti(jti: str, endpoint: str, expires_at: float) -> bool:
-    """Insert JTI into DB. Returns True if inserted (new), False if already present."""
+def _db_claim_jti(jti: str, endpoint: str, first_seen: float, expires_at: float) -> bool:
+    """Atomically record a JTI in `seen_jtis`. Returns False if an unexpired row already holds it."""
     try:
         from sqlalchemy import text
         from core.db import db_session
 
-        first_seen = datetime.now(timezone.utc)
-        exp_dt = datetime.fromtimestamp(expires_at, tz=timezone.utc)
-
         with db_session() as db:
-            # Try INSERT; if the JTI already exists, the unique constraint fires and
-            # we catch IntegrityError to distinguish new vs replay without a pre-select.
-            db.execute(
+            row = db.execute(
                 text(
                     "INSERT INTO seen_jtis (jti, endpoint, first_seen_at, expires_at)"
                     " VALUES (:jti, :endpoint, :first_seen_at, :expires_at)"
-                    " ON CONFLICT (jti) DO NOTHING"
+                    " ON CONFLICT (jti) DO UPDATE SET endpoint = excluded.endpoint,"
+                    " first_seen_at = excluded.first_seen_at, expires_at = excluded.expires_at"
+                    " WHERE seen_jtis.expires_at < excluded.first_seen_at"
+                    " RETURNING jti"
                 ),
                 {
                     "jti": jti,
                     "endpoint": endpoint[:100],
-                    "first_seen_at": first_seen,
-                    "expires_at": exp_dt,
+                    "first_seen_at": datetime.fromtimestamp(first_seen, tz=timezone.utc),
+                    "expires_at": datetime.fromtimestamp(expires_at, tz=timezone.utc),
                 },
-            )
-            # Check if our insert actually landed (rowcount may not be reliable across
-            # all drivers for ON CONFLICT DO NOTHING, so we verify with a select).
-            row = db.execute(
-                text("SELECT endpoint, first_seen_at FROM seen_jtis WHERE jti = :jti"),
-                {"jti": jti},
             ).fetchone()
             db.commit()
-
-        if row and row[0] != endpoint:
-            # Row existed before our insert — this is a replay
-            return False
-        return True
+        return row is not None
     except Exception:
         # If the DB table doesn't exist yet (pre-migration), fall back silently.
-        logger.debug("seen_jtis DB write failed — falling back to in-memory only", exc_info=True)
+        logger.debug("seen_jtis claim failed — falling back to in-memory only", exc_info=True)
         return True  # Optimistic: let in-memory store handle it
 
 
+def _enqueue_persist(jti: str, endpoint: str, first_seen: float, expires_at: float) -> None:
+    """Buffer a new JTI row; flush inline once the batch is full."""
+    with _pending_lock:
+        _pending[jti] = (endpoint, first_seen, expires_at)
+        full = len(_pending) >= settings.jti_persist_batch_size
+    if full:
+        flush_pending_jtis()
+
+
+def flush_pending_jtis() -> int:
+    """Write buffered JTI rows to `seen_jtis` in one batch. Returns rows attempted."""
+    with _pending_lock:
+        if not _pending:
+            return 0
+        batch = list(_pending.items())
+        _pending.clear()
+
+    try:
+        from sqlalchemy import text
+        from core.db import db_session
+
+        rows = [
+            {
+                "jti": jti,
+                "endpoint": endpoint[:100],
+                "first_seen_at": datetime.fromtimestamp(first_seen, tz=timezone.utc),
+                "expires_at": datetime.fromtimestamp(expires_at, tz=timezone.utc),
+            }
+            for jti, (endpoint, first_seen, expires_at) in batch
+        ]
+        with db_session() as db:
+            db.execute(
+                text(
+                    "INSERT INTO seen_jtis (jti, endpoint, first_seen_at, expires_at)"
+                    " VALUES (:jti, :endpoint, :first_seen_at, :expires_at)"
+                    " ON CONFLICT (jti) DO NOTHING"
+                ),
+                rows,
+            )
+            db.commit()
+        inc("jti_dedup_persisted_total", len(rows))
+    except Exception:
+        # If the DB table doesn't exist yet (pre-migration), fall back silently.
+        logger.debug("seen_jtis batch write failed — %d JTIs kept in memory only", len(batch), exc_info=True)
+    return len(batch)
+
+
+def sweep_expired_jtis() -> int:
+    """Delete expired `seen_jtis` rows in chunks. Returns the number deleted."""
+    chunk = max(1, settings.jti_sweep_chunk_size)
+    deleted = 0
+    try:
+        from sqlalchemy import text
+        from core.db import db_session
+
+        now = datetime.now(timezone.utc)
+        while True:
+            with db_session() as db:
+                result = db.execute(
+                    text(
+                        "DELETE FROM seen_jtis WHERE jti IN"
+                        " (SELECT jti FROM seen_jtis WHERE expires_at < :now LIMIT :chunk)"
+                    ),
+                    {"now": now, "chunk": chunk},
+                )
+                db.commit()
+            n = result.rowcount or 0
+            deleted += n
+            if n < chunk:
+                break
+    except Exception:
+        logger.debug("seen_jtis sweep failed", exc_info=True)
+    if deleted:
+        logger.info("Swept %d expired JTIs from seen_jtis", deleted)
+    return deleted
+
+
+def _worker_loop() -> None:
+    interval = max(settings.jti_persist_flush_interval_ms, 10) / 1000.0
+    last_sweep = time.monotonic()
+    while not _worker_stop.wait(interval):
+        flush_pending_jtis()
+        if time.monotonic() - last_sweep >= settings.jti_sweep_interval_seconds:
+            sweep_expired_jtis()
+            last_sweep = time.monotonic()
+    flush_pending_jtis()
+
+
+def start_jti_persistence_worker() -> None:
+    """Start the background flush/sweep thread (idempotent). Call on startup."""
+    global _worker
+    if not settings.jti_dedup_enabled:
+        return
+    if _worker is not None and _worker.is_alive():
+        return
+    _worker_stop.clear()
+    _worker = threading.Thread(target=_worker_loop, name="jti-dedup-persist", daemon=True)
+    _worker.start()
+
+
+def stop_jti_persistence_worker(timeout: float = 5.0) -> None:
+    """Stop the background thread and flush any buffered rows. Call on shutdown."""
+    global _worker
+    _worker_stop.set()
+    if _worker is not None:
+        _worker.join(timeout)
+        _worker = None
+    flush_pending_jtis()
+
+
+def _to_ts(value) -> float:
+    """Convert a DB datetime (or SQLite ISO string) to a Unix timestamp."""
+    if hasattr(value, "timestamp"):
+        return value.timestamp()
+    if isinstance(value, str):
+        dt = datetime.fromisoformat(value)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.timestamp()
+    return float(value)
+
+
+def _set_warm_status(**fields) -> None:
+    with _warm_lock:
+        _warm_status.update(fields)
+
+
+def jti_warm_status() -> dict:
+    """Progress of the JTI cache warm-up, for `/ready`."""
+    with _warm_lock:
+        return dict(_warm_status)
+
+
+def _warm_complete() -> bool:
+    return _warm_done.is_set()
+
+
 def warm_jti_cache() -> int:
-    """Load non-expired JTIs from DB into in-memory cache. Call on startup."""
+    """Load non-expired JTIs from DB into in-memory cache. Call on startup.
+
+    Rows are streamed in keyset-paginated chunks of `JTI_WARM_CHUNK_SIZE`,
+    latest expiry first, so memory stays flat and the lock is only held per
+    chunk. Until warm-up completes, in-memory misses fall back to `seen_jtis`.
+    """
     if not settings.jti_dedup_enabled:
+        _set_warm_status(state="disabled")
+        _warm_done.set()
         return 0
+
+    _warm_done.clear()
+    _set_warm_status(state="running", loaded=0, chunks=0, started_at=time.time(), finished_at=None)
+    loaded = 0
     try:
         from sqlalchemy import text
         from core.db import db_session
 
         now = datetime.now(timezone.utc)
-        with db_session() as db:
-            rows = db.execute(
-                text(
-                    "SELECT jti, endpoint, first_seen_at, expires_at"
-                    " FROM seen_jtis WHERE expires_at > :now"
-                ),
-                {"now": now},
-            ).fetchall()
-
-        loaded = 0
-        with _lock:
-            for row in rows:
-                jti = row[0]
-                endpoint = row[1]
-                first_seen_ts = row[2].timestamp() if hasattr(row[2], "timestamp") else float(row[2])
-                expires_ts = row[3].timestamp() if hasattr(row[3], "timestamp") else float(row[3])
-                if jti not in _store:
-                    _store[jti] = (endpoint, first_seen_ts, expires_ts)
-                    loaded += 1
-
-        logger.info("Warmed JTI dedup cache from DB: %d entries loaded", loaded)
+        chunk_size = max(1, settings.jti_warm_chunk_size)
+        max_entries = settings.jti_dedup_max_entries
+        cursor = None  # (expires_at, jti) of the last row seen
+        chunks = 0
+
+        # Rows arrive latest-expiry first so that, if the cap is hit, the entries
+        # kept in memory are the ones that stay relevant the longest.
+        while True:
+            params: dict = {"now": now, "limit": chunk_size}
+            sql = "SELECT jti, endpoint, first_seen_at, expires_at FROM seen_jtis WHERE expires_at > :now"
+            if cursor is not None:
+                sql += " AND (expires_at < :last_exp OR (expires_at = :last_exp AND jti > :last_jti))"
+                params["last_exp"], params["last_jti"] = cursor
+            sql += " ORDER BY expires_at DESC, jti ASC LIMIT :limit"
+
+            with db_session() as db:
+                rows = db.execute(text(sql), params).fetchall()
+            if not rows:
+                break
+
+            full = False
+            with _lock:
+                bloom = _get_bloom()
+                for row in rows:
+                    if max_entries > 0 and len(_store) >= max_entries:
+                        full = True
+                        break
+                    jti = row[0]
+                    if jti not in _store:
+                        _put(jti, row[1], _to_ts(row[2]), _to_ts(row[3]))
+                        bloom.add(jti)
+                        loaded += 1
+
+            chunks += 1
+            _set_warm_status(loaded=loaded, chunks=chunks)
+            if full or len(rows) < chunk_size:
+                break
+            cursor = (rows[-1][3], rows[-1][0])
+
+        _set_warm_status(state="done", finished_at=time.time())
+        logger.info("Warmed JTI dedup cache from DB: %d entries loaded in %d chunks", loaded, chunks)
         return loaded
     except Exception:
+        _set_warm_status(state="failed", finished_at=time.time())
         logger.debug("JTI cache warm from DB failed — starting cold", exc_info=True)
-        return 0
+        return loaded
+    finally:
+        _warm_done.set()
+
+
+def start_jti_cache_warmup() -> None:
+    """Warm the JTI cache on a background thread so startup is not blocked."""
+    if not settings.jti_dedup_enabled:
+        warm_jti_cache()
+        return
+    # Mark not-yet-warm before returning so checks fall back to the DB at once.
+    _warm_done.clear()
+    _set_warm_status(state="pending")
+    threading.Thread(target=warm_jti_cache, name="jti-dedup-warm", daemon=True).start()
 
 
 def check_and_record_jti(
@@ -125,9 +419,12 @@ def check_and_record_jti(
     """Check if a JTI has been seen before. If not, record it and return None.
     If yes, return a reason string describing the replay attempt.
 
-    First checks the in-memory store (fast path). If not found in memory,
-    attempts a DB insert to persist across restarts. The in-memory entry is
-    written regardless so subsequent in-process checks are fast.
+    First checks the in-memory store (fast path). If not found in memory, the
+    JTI is reserved in memory under the lock and then claimed in `seen_jtis`
+    outside the lock, which catches JTIs recorded by other workers. With
+    `JTI_PERSIST_WRITE_BEHIND`, only JTIs the Bloom filter may have seen are
+    looked up; the rest are definitely new to this process and are queued for
+    batched persistence.
 
     Args:
         jti: The JWT ID claim to check.
@@ -137,7 +434,8 @@ def check_and_record_jti(
 
     Returns:
         None if JTI is fresh (not seen before).
-        A reason string if JTI is a duplicate.
+        A reason string if JTI is a duplicate, or if the store is full and the
+        overflow policy is ``reject``.
     """
     if not settings.jti_dedup_enabled:
         return None
@@ -149,7 +447,7 @@ def check_and_record_jti(
     expires_at = float(exp) if exp else (now + settings.jti_dedup_window_seconds)
 
     with _lock:
-        _evict_expired()
+        _evict_expired(now)
 
         if jti in _store:
             seen_endpoint, first_seen, _ = _store[jti]
@@ -158,22 +456,65 @@ def check_and_record_jti(
                 f"'{seen_endpoint}' at {time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(first_seen))}"
             )
 
-        # Not in memory: try DB write-through (returns False if already in DB)
-        is_new = _db_record_jti(jti, endpoint, expires_at)
-        if not is_new:
-            # Already in DB — add to memory cache and report replay
-            _store[jti] = (endpoint, now, expires_at)
+        if not _make_room():
+            logger.warning("JTI dedup store full (%d entries) — rejecting new JTI", len(_store))
+            return "JTI dedup store is at capacity; retry later"
+
+        # Reserve the JTI in memory before touching the DB. Any concurrent check
+        # for the same JTI now sees it as a replay, so the DB lookup can run
+        # outside the lock without letting a duplicate slip through.
+        _put(jti, endpoint, now, expires_at)
+
+        # JTIs that outlive the filter horizon may have rotated out of it, so
+        # only trust a negative answer for JTIs inside the horizon, and only
+        # once the warm-up has loaded persisted JTIs into the filter.
+        bloom = _get_bloom()
+        maybe_seen = (
+            bloom.might_contain(jti, now)
+            or expires_at > now + bloom.horizon_seconds
+            or not _warm_complete()
+        )
+        bloom.add(jti, now)
+
+    if not settings.jti_persist_write_behind:
+        inc("jti_dedup_db_claim_total")
+        if not _db_claim_jti(jti, endpoint, now, expires_at):
+            # Recorded by this or another worker — the reservation stays as the cached replay marker
+            return (
+                f"JWT replay detected: JTI '{jti}' was previously recorded "
+                f"(persisted across restart or by another worker)"
+            )
+        return None
+
+    if maybe_seen:
+        # Possibly seen before: check `seen_jtis`. Runs unlocked so concurrent
+        # checks for different JTIs overlap their round trips.
+        inc("jti_dedup_db_lookup_total")
+        if _db_seen_jti(jti):
+            # Already persisted — the reservation stays as the cached replay marker
             return (
                 f"JWT replay detected: JTI '{jti}' was previously recorded "
                 f"(persisted across restart)"
             )
+    else:
+        inc("jti_dedup_bloom_skip_total")
 
-        # Fresh — record in memory
-        _store[jti] = (endpoint, now, expires_at)
-        return None
+    _enqueue_persist(jti, endpoint, now, expires_at)
+    return None
+
+
+def dedup_store_size() -> int:
+    """Number of JTIs currently held in memory."""
+    with _lock:
+        return len(_store)
 
 
 def clear_dedup_store() -> None:
     """Clear the in-memory dedup store. Useful for testing."""
     with _lock:
         _store.clear()
+        _expiry_heap.clear()
+        if _bloom is not None:
+            _bloom.clear()
+    with _pending_lock:
+        _pending.clear()
@@ -0,0 +1,79 @@
+"""Bounded cache of parsed public keys, keyed by RFC 7638 JWK thumbprint.
+
+Building a cryptography key object from JWK fields is not free (RSA and EC
+keys go through number-to-key construction and validation), yet verifiers see
+the same few issuer keys over and over. The thumbprint covers exactly the
+key-defining members, so two JWKs with the same thumbprint are the same key
+regardless of ``kid``, ``use`` or other metadata.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+from core.settings import settings
+
+# RFC 7638 §3.2: required members per key type
+_THUMBPRINT_MEMBERS = {
+    "EC": ("crv", "kty", "x", "y"),
+    "RSA": ("e", "kty", "n"),
+    "OKP": ("crv", "kty", "x"),
+}
+
+
+def jwk_thumbprint(jwk: dict[str, Any]) -> str:
+    """Return the base64url SHA-256 JWK thumbprint (RFC 7638)."""
+    members = _THUMBPRINT_MEMBERS.get(jwk.get("kty"))
+    if members is None:
+        raise ValueError(f"Unsupported JWK kty: {jwk.get('kty')!r}")
+    try:
+        canonical = {m: jwk[m] for m in members}
+    except KeyError as e:
+        raise ValueError(f"JWK missing member: {e.args[0]}") from e
+    data = json.dumps(canonical, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(hashlib.sha256(data).digest()).rstrip(b"=").decode("ascii")
+
+
+class PublicKeyCache:
+    """Thread-safe LRU of thumbprint -> loaded public key."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._keys: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_load(self, jwk: dict[str, Any], loader: Callable[[dict[str, Any]], Any]) -> Any:
+        """Return the cached key for `jwk`, calling `loader(jwk)` on a miss.
+
+        Loader errors propagate and are not cached.
+        """
+        if self.max_size <= 0:
+            return loader(jwk)
+        tp = jwk_thumbprint(jwk)
+        with self._lock:
+            key = self._keys.get(tp)
+            if key is not None:
+                self._keys.move_to_end(tp)
+                return key
+        key = loader(jwk)
+        with self._lock:
+            self._keys[tp] = key
+            self._keys.move_to_end(tp)
+            while len(self._keys) > self.max_size:
+                self._keys.popitem(last=False)
+        return key
+
+    def clear(self) -> None:
+        with self._lock:
+            self._keys.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._keys)
+
+
+public_key_cache = PublicKeyCache(settings.public_key_cache_max_size)
@@ -0,0 +1,132 @@
+"""Parse-once JWT representation.
+
+`jwt.get_unverified_header` + `jwt.decode(verify_signature=False)` +
+`jwt.decode(key=...)` base64-decodes and JSON-parses the same token three
+times; with nested parent delegation/mandate JWTs embedded in the claims the
+JSON parsing dominates verification. `ParsedJWT.parse` splits and decodes a
+compact JWS once; `verify` checks the signature over the original signing
+input and validates registered claims with the same semantics as
+`jwt.decode` (exp/nbf/iat, required claims, aud, iss).
+"""
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+import jwt
+from jwt.algorithms import get_default_algorithms
+from jwt.utils import base64url_decode
+
+_ALGORITHMS = get_default_algorithms()
+
+
+@dataclass(frozen=True)
+class ParsedJWT:
+    token: str
+    header: dict[str, Any]
+    payload: dict[str, Any]
+    signing_input: bytes
+    signature: bytes
+
+    @classmethod
+    def parse(cls, token: "str | ParsedJWT") -> "ParsedJWT":
+        if isinstance(token, ParsedJWT):
+            return token
+        if not isinstance(token, str):
+            raise jwt.DecodeError("Invalid token type")
+        try:
+            signing_input, crypto_segment = token.encode("ascii").rsplit(b".", 1)
+            header_segment, payload_segment = signing_input.split(b".", 1)
+        except (ValueError, UnicodeEncodeError) as e:
+            raise jwt.DecodeError("Not enough segments") from e
+
+        try:
+            header = json.loads(base64url_decode(header_segment))
+            payload = json.loads(base64url_decode(payload_segment))
+            signature = base64url_decode(crypto_segment)
+        except (TypeError, ValueError) as e:
+            raise jwt.DecodeError(f"Invalid token encoding: {e}") from e
+        if not isinstance(header, dict):
+            raise jwt.DecodeError("Invalid header string: must be a json object")
+        if not isinstance(payload, dict):
+            raise jwt.DecodeError("Invalid payload string: must be a json object")
+        return cls(token=token, header=header, payload=payload, signing_input=signing_input, signature=signature)
+
+    @property
+    def alg(self) -> Optional[str]:
+        return self.header.get("alg")
+
+    @property
+    def kid(self) -> Optional[str]:
+        return self.header.get("kid")
+
+    def verify(
+        self,
+        key: Any,
+        *,
+        algorithms: Iterable[str],
+        require: Iterable[str] = (),
+        audience: Optional[str] = None,
+        issuer: Optional[str] = None,
+        leeway: float = 0,
+    ) -> dict[str, Any]:
+        """Verify signature and registered claims; return the payload.
+
+        Raises the same `jwt` exceptions `jwt.decode` would.
+        """
+        alg = self.alg
+        if alg not in set(algorithms) or alg not in _ALGORITHMS:
+            raise jwt.InvalidAlgorithmError("The specified alg value is not allowed")
+        algo = _ALGORITHMS[alg]
+        if not algo.verify(self.signing_input, algo.prepare_key(key), self.signature):
+            raise jwt.InvalidSignatureError("Signature verification failed")
+        self._validate_claims(require=require, audience=audience, issuer=issuer, leeway=leeway)
+        return self.payload
+
+    def _validate_claims(self, *, require: Iterable[str], audience: Optional[str], issuer: Optional[str], leeway: float) -> None:
+        payload = self.payload
+        for claim in require:
+            if payload.get(claim) is None:
+                raise jwt.MissingRequiredClaimError(claim)
+
+        now = time.time()
+        if "iat" in payload:
+            try:
+                iat = int(payload["iat"])
+            except (TypeError, ValueError):
+                raise jwt.InvalidIssuedAtError("Issued At claim (iat) must be an integer.")
+            if iat > now + leeway:
+                raise jwt.ImmatureSignatureError("The token is not yet valid (iat)")
+        if "nbf" in payload:
+            try:
+                nbf = int(payload["nbf"])
+            except (TypeError, ValueError):
+                raise jwt.DecodeError("Not Before claim (nbf) must be an integer.")
+            if nbf > now + leeway:
+                raise jwt.ImmatureSignatureError("The token is not yet valid (nbf)")
+        if "exp" in payload:
+            try:
+                exp = int(payload["exp"])
+            except (TypeError, ValueError):
+                raise jwt.DecodeError("Expiration Time claim (exp) must be an integer.")
+            if exp <= now - leeway:
+                raise jwt.ExpiredSignatureError("Signature has expired")
+
+        aud = payload.get("aud")
+        if audience is None:
+            if aud:
+                raise jwt.InvalidAudienceError("Invalid audience")
+        else:
+            if aud is None:
+                raise jwt.MissingRequiredClaimError("aud")
+            auds = [aud] if isinstance(aud, str) else aud
+            if not isinstance(auds, list) or audience not in auds:
+                raise jwt.InvalidAudienceError("Audience doesn't match")
+
+        if issuer is not None:
+            if "iss" not in payload:
+                raise jwt.MissingRequiredClaimError("iss")
+            if payload["iss"] != issuer:
+                raise jwt.InvalidIssuerError("Invalid issuer")
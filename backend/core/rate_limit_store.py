@@ -0,0 +1,257 @@
+"""Shared rate-limit state for multi-worker deployments.
+
+Each uvicorn worker otherwise counts only its own traffic, multiplying the
+effective limit by the number of workers. `SharedWindowLimiter` enforces a
+fixed-window quota against counters held in a shared backend:
+
+- ``sql``: the `rate_limit_counters` table, in the main database or in a
+  separate database given by `RATE_LIMIT_BACKEND_URL`. Pointing that at a
+  SQLite file on tmpfs (e.g. ``sqlite:////dev/shm/pramana-ratelimit.db``)
+  shares state between the workers of one host without a network hop.
+- ``redis``: any client speaking the Redis INCRBY/EXPIREAT commands. A
+  ``local://`` URL selects `LocalRedis`, an in-process stand-in used in dev
+  and tests; other URLs need the optional `redis` package.
+
+Requests are admitted against a locally cached view of the global counters
+plus this worker's unsynced usage; a background thread flushes the local
+deltas in one batch every `RATE_LIMIT_SYNC_INTERVAL_MS` and refreshes the
+cached totals from the reply. No request waits on a backend round trip. The
+trade-off is a bounded overshoot of at most (workers - 1) x requests admitted
+per sync interval.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Optional, Protocol
+
+logger = logging.getLogger(__name__)
+
+
+class CounterBackend(Protocol):
+    def incr_many(self, items: dict[str, tuple[int, float]]) -> dict[str, int]:
+        """Add each delta to its counter (expiring at the given Unix time) and
+        return the resulting totals."""
+        ...
+
+
+class LocalRedis:
+    """Minimal thread-safe, in-process stand-in for the Redis commands we use."""
+
+    def __init__(self) -> None:
+        self._data: dict[str, int] = {}
+        self._expiry: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _expire_if_needed(self, key: str) -> None:
+        exp = self._expiry.get(key)
+        if exp is not None and exp <= time.time():
+            self._data.pop(key, None)
+            self._expiry.pop(key, None)
+
+    def incrby(self, key: str, amount: int) -> int:
+        with self._lock:
+            self._expire_if_needed(key)
+            self._data[key] = self._data.get(key, 0) + int(amount)
+            return self._data[key]
+
+    def expireat(self, key: str, when: int) -> bool:
+        with self._lock:
+            if key not in self._data:
+                return False
+            self._expiry[key] = float(when)
+            return True
+
+    def get(self, key: str) -> Optional[int]:
+        with self._lock:
+            self._expire_if_needed(key)
+            return self._data.get(key)
+
+    def pipeline(self) -> "_LocalPipeline":
+        return _LocalPipeline(self)
+
+
+class _LocalPipeline:
+    def __init__(self, client: LocalRedis) -> None:
+        self._client = client
+        self._ops: list[tuple[str, tuple[Any, ...]]] = []
+
+    def incrby(self, key: str, amount: int) -> "_LocalPipeline":
+        self._ops.append(("incrby", (key, amount)))
+        return self
+
+    def expireat(self, key: str, when: int) -> "_LocalPipeline":
+        self._ops.append(("expireat", (key, when)))
+        return self
+
+    def execute(self) -> list[Any]:
+        ops, self._ops = self._ops, []
+        return [getattr(self._client, name)(*args) for name, args in ops]
+
+
+class RedisCounterBackend:
+    def __init__(self, client: Any) -> None:
+        self.client = client
+
+    def incr_many(self, items: dict[str, tuple[int, float]]) -> dict[str, int]:
+        if not items:
+            return {}
+        pipe = self.client.pipeline()
+        keys = list(items)
+        for key in keys:
+            delta, expires_at = items[key]
+            pipe.incrby(key, delta)
+            pipe.expireat(key, int(expires_at) + 1)
+        replies = pipe.execute()
+        return {key: int(replies[i * 2]) for i, key in enumerate(keys)}
+
+
+class SQLCounterBackend:
+    def __init__(self, url: str = "") -> None:
+        if url:
+            from sqlalchemy import create_engine
+
+            from models import RateLimitCounter
+
+            connect_args = {"check_same_thread": False} if url.startswith("sqlite:") else {}
+            self.engine = create_engine(url, connect_args=connect_args)
+            # A dedicated limiter DB is not managed by Alembic; create the table here.
+            RateLimitCounter.__table__.create(bind=self.engine, checkfirst=True)
+        else:
+            from core.db import engine
+
+            self.engine = engine
+        self._syncs = 0
+
+    def incr_many(self, items: dict[str, tuple[int, float]]) -> dict[str, int]:
+        from sqlalchemy import text
+
+        totals: dict[str, int] = {}
+        with self.engine.begin() as conn:
+            for key, (delta, expires_at) in items.items():
+                row = conn.execute(
+                    text(
+                        "INSERT INTO rate_limit_counters (bucket_key, count, expires_at)"
+                        " VALUES (:key, :delta, :exp)"
+                        " ON CONFLICT (bucket_key) DO UPDATE"
+                        " SET count = rate_limit_counters.count + excluded.count"
+                        " RETURNING count"
+                    ),
+                    {"key": key, "delta": delta, "exp": datetime.fromtimestamp(expires_at, tz=timezone.utc)},
+                ).fetchone()
+                totals[key] = int(row[0])
+
+            # Prune expired windows now and then so the table stays small.
+            self._syncs += 1
+            if self._syncs % 60 == 0:
+                conn.execute(
+                    text("DELETE FROM rate_limit_counters WHERE expires_at < :now"),
+                    {"now": datetime.now(timezone.utc)},
+                )
+        return totals
+
+
+def build_counter_backend(kind: str, url: str = "") -> CounterBackend:
+    kind = (kind or "").lower()
+    if kind == "sql":
+        return SQLCounterBackend(url)
+    if kind == "redis":
+        if not url or url.startswith("local://"):
+            return RedisCounterBackend(LocalRedis())
+        try:
+            import redis  # type: ignore
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the 'redis' package") from exc
+        return RedisCounterBackend(redis.Redis.from_url(url))
+    raise ValueError(f"Unknown rate limit backend: {kind!r}")
+
+
+class SharedWindowLimiter:
+    """Fixed-window limiter whose counts are shared through a `CounterBackend`.
+
+    Exposes the same `acquire()` contract as `GCRALimiter`.
+    """
+
+    def __init__(self, backend: CounterBackend, sync_interval_seconds: float = 1.0, autostart: bool = True):
+        self.backend = backend
+        self.sync_interval_seconds = sync_interval_seconds
+        self.autostart = autostart
+        self._lock = threading.Lock()
+        # windowed key -> unsynced local hits / last known global total / window end
+        self._pending: dict[str, int] = {}
+        self._known: dict[str, int] = {}
+        self._window_end: dict[str, float] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def acquire(self, key: str, limit: int, window_seconds: float, now: Optional[float] = None) -> tuple[bool, int, float, float]:
+        """Take one request for `key`. Returns (allowed, remaining, reset_after, retry_after)."""
+        if now is None:
+            now = time.time()
+        limit = max(1, int(limit))
+        window = int(now // window_seconds)
+        window_end = (window + 1) * window_seconds
+        wkey = f"rl:{key}:{window}"
+        reset_after = window_end - now
+
+        with self._lock:
+            used = self._known.get(wkey, 0) + self._pending.get(wkey, 0)
+            if used >= limit:
+                return False, 0, reset_after, reset_after
+            self._pending[wkey] = self._pending.get(wkey, 0) + 1
+            self._window_end[wkey] = window_end
+            if self.autostart and self._thread is None:
+                self._start()
+
+        return True, limit - used - 1, reset_after, 0.0
+
+    def sync(self, now: Optional[float] = None) -> None:
+        """Flush local hits and refresh global totals for active windows."""
+        if now is None:
+            now = time.time()
+        with self._lock:
+            for k in [k for k, end in self._window_end.items() if end <= now]:
+                self._window_end.pop(k, None)
+                self._known.pop(k, None)
+                self._pending.pop(k, None)
+            # Zero deltas still refresh the totals other workers contributed.
+            items = {k: (self._pending.get(k, 0), end) for k, end in self._window_end.items()}
+            self._pending.clear()
+        if not items:
+            return
+
+        try:
+            totals = self.backend.incr_many(items)
+        except Exception:
+            logger.warning("Rate limit backend sync failed — enforcing local counts only", exc_info=True)
+            with self._lock:
+                for k, (delta, _) in items.items():
+                    if delta and k in self._window_end:
+                        self._pending[k] = self._pending.get(k, 0) + delta
+            return
+
+        with self._lock:
+            for k, total in totals.items():
+                if k in self._window_end:
+                    self._known[k] = total
+
+    def _start(self) -> None:
+        self._thread = threading.Thread(target=self._loop, name="rate-limit-sync", daemon=True)
+        self._thread.start()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.sync_interval_seconds):
+            self.sync()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+        self.sync()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._window_end)
@@ -1,58 +1,80 @@
 from __future__ import annotations
 
+import asyncio
 import base64
 import logging
 import threading
 import time
 from collections import OrderedDict
 from typing import Any
-from urllib.parse import unquote
+from urllib.parse import unquote, urlparse
 
+import anyio
 import httpx
-from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
 
+from core import did_failures, did_store, invalidation_bus
 from core.db import db_session
-from core.did import build_did_document_multi
+from core.demo_metrics import inc
+from core.did import build_did_document_multi, public_key_from_jwk
+from core.did_store import StoredDocument
+from core.http_client import get_async_client
 from core.settings import settings
 from models import Agent, Key
 
 logger = logging.getLogger(__name__)
 
-# Thread-safe LRU cache for DID documents.
-# Entry format: {did: (document_dict, cached_at_timestamp)}
-_cache: OrderedDict[str, tuple[dict[str, Any], float]] = OrderedDict()
+# Thread-safe LRU cache for DID documents (L1; `core.did_store` is the optional L2).
+# Entry format: {did: (stored_document, cached_at_monotonic)}
+_cache: OrderedDict[str, tuple[StoredDocument, float]] = OrderedDict()
 _cache_lock = threading.Lock()
 
 
 def flush_cache() -> None:
-    """Clear all cached DID documents."""
+    """Clear all cached DID documents, and remembered resolution failures."""
     with _cache_lock:
         _cache.clear()
+    with _local_lock:
+        _local_cache.clear()
+    with _did_key_lock:
+        _did_key_cache.clear()
+    did_failures.clear_negative_cache()
+    if settings.did_cache_persistent:
+        did_store.clear()
     logger.debug("DID resolution cache flushed")
 
 
-def _cache_get(did: str) -> dict[str, Any] | None:
+def _cache_lookup(did: str) -> tuple[dict[str, Any] | None, float]:
+    """Return ``(document, age)`` for a cached DID, or ``(None, 0.0)``.
+
+    Entries are kept past the TTL, up to the stale bound, so callers can serve
+    them while revalidating (or when the host is failing); anything older is
+    evicted here.
+    """
     with _cache_lock:
         if did not in _cache:
             logger.debug("DID cache miss: %s", did)
-            return None
-        doc, cached_at = _cache[did]
+            return None, 0.0
+        stored, cached_at = _cache[did]
         age = time.monotonic() - cached_at
-        if age > settings.did_cache_ttl_seconds:
+        if age > _hard_stale_bound():
             del _cache[did]
             logger.debug("DID cache expired (age=%.1fs): %s", age, did)
-            return None
+            return None, 0.0
         # Move to end (most-recently-used)
         _cache.move_to_end(did)
-        logger.debug("DID cache hit (age=%.1fs): %s", age, did)
-        return doc
+        return stored.document, age
 
 
-def _cache_set(did: str, doc: dict[str, Any]) -> None:
+def _hard_stale_bound() -> float:
+    ttl = settings.did_cache_ttl_seconds
+    return ttl + max(settings.did_cache_stale_grace_seconds, settings.did_cache_max_stale_seconds, 0)
+
+
+def _cache_set(did: str, stored: StoredDocument) -> None:
     with _cache_lock:
         if did in _cache:
             _cache.move_to_end(did)
-        _cache[did] = (doc, time.monotonic())
+        _cache[did] = (stored, time.monotonic() - max(0.0, stored.age))
         # Evict oldest entries when over max size
         while len(_cache) > settings.did_cache_max_size:
             evicted = next(iter(_cache))
@@ -60,29 +82,60 @@ def _cache_set(did: str, doc: dict[str, Any]) -> None:
             logger.debug("DID cache evicted (LRU): %s", evicted)
 
 
+_B58_ALPHABET = b"123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+# Reverse lookup: byte value -> digit, -1 for bytes outside the alphabet
+_B58_INDEX = [-1] * 256
+for _digit, _char in enumerate(_B58_ALPHABET):
+    _B58_INDEX[_char] = _digit
+# Digits folded per big-int step; 58**10 < 2**64 keeps the inner loop on small ints
+_B58_CHUNK = 10
+_B58_CHUNK_POW = [58 ** i for i in range(_B58_CHUNK + 1)]
+
+
 def _b58_decode(s: str) -> bytes:
     """Decode a base58btc-encoded string to bytes."""
-    ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+    raw = s.encode("ascii", "replace")
+    index = _B58_INDEX
     n = 0
-    for char in s:
-        if char not in ALPHABET:
-            raise ValueError(f"Invalid base58 character: '{char}'")
-        n = n * 58 + ALPHABET.index(char)
-    result = []
-    while n > 0:
-        result.append(n & 0xFF)
-        n >>= 8
+    for start in range(0, len(raw), _B58_CHUNK):
+        chunk = raw[start:start + _B58_CHUNK]
+        v = 0
+        for c in chunk:
+            d = index[c]
+            if d < 0:
+                raise ValueError(f"Invalid base58 character: '{s[start + chunk.index(c)]}'")
+            v = v * 58 + d
+        n = n * _B58_CHUNK_POW[len(chunk)] + v
     # Leading '1' chars = leading zero bytes
-    for char in s:
-        if char == "1":
-            result.append(0)
-        else:
-            break
-    return bytes(reversed(result))
+    leading_zeros = len(raw) - len(raw.lstrip(b"1"))
+    body = n.to_bytes((n.bit_length() + 7) // 8, "big") if n else b""
+    return b"\x00" * leading_zeros + body
+
+
+# did:key documents are a pure function of the DID, so they never go stale.
+_did_key_cache: OrderedDict[str, dict[str, Any]] = OrderedDict()
+_did_key_lock = threading.Lock()
 
 
 def _resolve_did_key(did: str) -> dict[str, Any]:
-    """Resolve a did:key locally — pure computation, no network call."""
+    """Resolve a did:key locally — pure computation, no network call, memoised."""
+    with _did_key_lock:
+        doc = _did_key_cache.get(did)
+        if doc is not None:
+            _did_key_cache.move_to_end(did)
+            return doc
+    doc = _build_did_key_document(did)
+    max_size = settings.did_key_cache_max_size
+    if max_size > 0:
+        with _did_key_lock:
+            _did_key_cache[did] = doc
+            _did_key_cache.move_to_end(did)
+            while len(_did_key_cache) > max_size:
+                _did_key_cache.popitem(last=False)
+    return doc
+
+
+def _build_did_key_document(did: str) -> dict[str, Any]:
     if not did.startswith("did:key:z"):
         raise ValueError(f"Invalid did:key format: must start with 'did:key:z', got '{did[:25]}'")
 
@@ -103,13 +156,11 @@ def _resolve_did_key(did: str) -> dict[str, Any]:
     if len(pub_bytes) != 32:
         raise ValueError(f"Invalid public key length: expected 32 bytes, got {len(pub_bytes)}")
 
-    pub = Ed25519PublicKey.from_public_bytes(pub_bytes)
-    b64u = lambda b: base64.urlsafe_b64encode(b).rstrip(b"=").decode("ascii")
-    pub_raw = pub.public_bytes_raw()
+    jwk = {"kty": "OKP", "crv": "Ed25519", "x": base64.urlsafe_b64encode(pub_bytes).rstrip(b"=").decode("ascii")}
+    # Parses the key once and leaves it in the thumbprint cache for verification
+    public_key_from_jwk(jwk)
 
     vm_id = f"{did}#{multibase_value}"
-    jwk = {"kty": "OKP", "crv": "Ed25519", "x": b64u(pub_raw)}
-
     return {
         "@context": ["https://www.w3.org/ns/did/v1"],
         "id": did,
@@ -146,19 +197,77 @@ def did_web_to_url(did: str) -> str:
     return f"{settings.pramana_scheme}://{domain}/{path}/did.json"
 
 
+def _is_local_web_did(did: str) -> bool:
+    if not did.startswith("did:web:"):
+        return False
+    parts = did.split(":")
+    return len(parts) >= 3 and parts[2] == settings.pramana_domain
+
+
+# Same-domain DID documents built from the DB. They only change when an
+# agent's keys do, so instead of a TTL every key write publishes the DID on
+# the invalidation bus (-> `invalidate_local_did`); the version counter stops a load that raced an
+# invalidation from caching the old keys.
+_local_cache: OrderedDict[str, dict[str, Any]] = OrderedDict()
+_local_versions: dict[str, int] = {}
+_local_lock = threading.Lock()
+
+
+def invalidate_local_did(did: str) -> None:
+    """Drop the cached document (and any remembered failure) for one of this
+    service's DIDs. Writers publish `invalidation_bus.AGENT_KEYS` instead of
+    calling this directly, so every worker drops it."""
+    with _local_lock:
+        _local_cache.pop(did, None)
+        _local_versions[did] = _local_versions.get(did, 0) + 1
+    did_failures.forget(did)
+
+
+invalidation_bus.subscribe(invalidation_bus.AGENT_KEYS, invalidate_local_did)
+
+
+def _local_cache_get(did: str) -> dict[str, Any] | None:
+    with _local_lock:
+        doc = _local_cache.get(did)
+        if doc is None:
+            return None
+        _local_cache.move_to_end(did)
+    inc("did_local_cache_hit_total")
+    return doc
+
+
 def _resolve_local_did(did: str) -> dict[str, Any] | None:
     # If the DID domain matches this service, resolve from DB rather than HTTP.
-    if not did.startswith("did:web:"):
+    if not _is_local_web_did(did):
         return None
 
-    parts = did.split(":")
-    if len(parts) < 3:
-        return None
+    doc = _local_cache_get(did)
+    if doc is not None:
+        return doc
+    with _local_lock:
+        version = _local_versions.get(did, 0)
+    inc("did_local_cache_miss_total")
 
-    did_domain = parts[2]
-    if did_domain != settings.pramana_domain:
+    doc = _load_local_did(did)
+    if doc is None:
         return None
+    # Parse the keys now so verification finds them in the key cache
+    for vm in doc.get("verificationMethod") or []:
+        try:
+            public_key_from_jwk(vm["publicKeyJwk"])
+        except Exception:
+            pass
+
+    with _local_lock:
+        if _local_versions.get(did, 0) == version:
+            _local_cache[did] = doc
+            _local_cache.move_to_end(did)
+            while len(_local_cache) > settings.did_cache_max_size:
+                _local_cache.popitem(last=False)
+    return doc
+
 
+def _load_local_did(did: str) -> dict[str, Any] | None:
     with db_session() as db:
         agent = db.query(Agent).filter(Agent.did == did).one_or_none()
         if agent is None:
@@ -220,7 +329,88 @@ def _resolve_spiffe_id(spiffe_id: str) -> dict[str, Any] | None:
         return None
 
 
-def resolve_did(did: str) -> dict[str, Any]:
+_DID_FETCH_HEADERS = {"accept": "application/json"}
+
+
+class _Flight:
+    """One in-progress fetch of a DID document that other callers wait on.
+
+    Sync callers block on `done`; async callers await a future that the
+    finishing thread or task resolves on their own loop.
+    """
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.doc: dict[str, Any] | None = None
+        self.error: BaseException | None = None
+        self._lock = threading.Lock()
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    def finish(self, doc: dict[str, Any] | None, error: BaseException | None) -> None:
+        self.doc, self.error = doc, error
+        with self._lock:
+            self.done.set()
+            waiters, self._waiters = self._waiters, []
+        for loop, fut in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, fut)
+            except RuntimeError:  # waiter's loop already closed
+                pass
+
+    def result(self) -> dict[str, Any]:
+        if self.error is not None:
+            raise self.error
+        assert self.doc is not None
+        return self.doc
+
+    def wait(self) -> dict[str, Any]:
+        self.done.wait()
+        return self.result()
+
+    async def wait_async(self) -> dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        with self._lock:
+            if self.done.is_set():
+                fut.set_result(None)
+            else:
+                self._waiters.append((loop, fut))
+        await fut
+        return self.result()
+
+
+def _wake(fut: asyncio.Future) -> None:
+    if not fut.done():
+        fut.set_result(None)
+
+
+# did -> fetch in progress, shared by sync and async callers
+_inflight: dict[str, _Flight] = {}
+_inflight_lock = threading.Lock()
+# Strong refs to background refresh tasks so they are not garbage collected mid-flight
+_refresh_tasks: set[asyncio.Task] = set()
+
+
+def _begin_flight(did: str) -> tuple[_Flight, bool]:
+    """Return the DID's in-progress fetch and whether the caller leads it."""
+    with _inflight_lock:
+        flight = _inflight.get(did)
+        if flight is not None:
+            inc("did_resolve_coalesced_total")
+            return flight, False
+        flight = _inflight[did] = _Flight()
+        return flight, True
+
+
+def _end_flight(did: str, flight: _Flight, doc: dict[str, Any] | None, error: BaseException | None) -> None:
+    with _inflight_lock:
+        if _inflight.get(did) is flight:
+            del _inflight[did]
+    flight.finish(doc, error)
+
+
+def _resolve_without_network(did: str) -> dict[str, Any] | None:
+    """Resolve SPIFFE IDs, did:key and this service's own DIDs; None for anything remote."""
     # SPIFFE URI: resolve via bridge-mode DB lookup
     if did.startswith("spiffe://"):
         doc = _resolve_spiffe_id(did)
@@ -228,22 +418,226 @@ def resolve_did(did: str) -> dict[str, Any]:
             return doc
         raise ValueError(f"SPIFFE ID not found in Pramana registry: {did!r}")
 
-    # did:key is pure computation — no cache needed, always consistent
+    # did:key is pure computation — memoised, always consistent
     if did.startswith("did:key:"):
         return _resolve_did_key(did)
 
-    # Local DIDs (same domain, resolved from DB) are not cached — always fresh.
-    local = _resolve_local_did(did)
-    if local is not None:
-        return local
+    # Local DIDs (same domain) come from the DB, cached until their keys change.
+    # The DB is authoritative for them: an unknown one fails without a fetch.
+    if _is_local_web_did(did):
+        with did_failures.guard(did, settings.pramana_domain):
+            doc = _resolve_local_did(did)
+            if doc is None:
+                raise ValueError(f"DID not found: {did}")
+        return doc
+    return None
 
-    cached = _cache_get(did)
-    if cached is not None:
-        return cached
 
-    url = did_web_to_url(did)
-    r = httpx.get(url, timeout=10.0, headers={"accept": "application/json"})
-    r.raise_for_status()
-    doc = r.json()
-    _cache_set(did, doc)
+def _previous_version(did: str) -> StoredDocument | None:
+    """What we last fetched for `did`, from L1 (any age) or L2, for reuse or revalidation."""
+    with _cache_lock:
+        entry = _cache.get(did)
+    if entry is not None:
+        return entry[0]
+    if settings.did_cache_persistent:
+        stored = did_store.load(did)
+        inc("did_cache_l2_hit_total" if stored is not None else "did_cache_l2_miss_total")
+        return stored
+    return None
+
+
+def _adopt_if_fresh(did: str, previous: StoredDocument | None) -> dict[str, Any] | None:
+    # A fresh L2 row (another worker's fetch, or ours before a restart) needs no request
+    if previous is None or previous.age > settings.did_cache_ttl_seconds:
+        return None
+    _cache_set(did, previous)
+    return previous.document
+
+
+def _conditional_headers(previous: StoredDocument | None) -> dict[str, str]:
+    headers = dict(_DID_FETCH_HEADERS)
+    if previous is not None:
+        if previous.etag:
+            headers["if-none-match"] = previous.etag
+        if previous.last_modified:
+            headers["if-modified-since"] = previous.last_modified
+    return headers
+
+
+def _header(r: httpx.Response, name: str) -> str | None:
+    value = r.headers.get(name)
+    return value if isinstance(value, str) else None
+
+
+def _store_fetched(did: str, r: httpx.Response, previous: StoredDocument | None = None) -> dict[str, Any]:
+    if r.status_code == 304 and previous is not None:
+        inc("did_cache_revalidated_total")
+        doc = previous.document
+    else:
+        r.raise_for_status()
+        doc = r.json()
+    stored = StoredDocument(
+        document=doc,
+        etag=_header(r, "etag") or (previous.etag if r.status_code == 304 and previous else None),
+        last_modified=_header(r, "last-modified") or (previous.last_modified if r.status_code == 304 and previous else None),
+        fetched_at=time.time(),
+    )
+    _cache_set(did, stored)
+    if settings.did_cache_persistent:
+        did_store.save(did, stored)
     return doc
+
+
+def _fetch_did_document(did: str) -> dict[str, Any]:
+    """Fetch and cache a did:web document; concurrent callers share one request."""
+    flight, leader = _begin_flight(did)
+    if not leader:
+        return flight.wait()
+    doc, error = None, None
+    try:
+        previous = _previous_version(did)
+        doc = _adopt_if_fresh(did, previous)
+        if doc is not None:
+            return doc
+        url = did_web_to_url(did)
+        with did_failures.guard(did, urlparse(url).netloc):
+            r = httpx.get(url, timeout=10.0, headers=_conditional_headers(previous))
+            doc = _store_fetched(did, r, previous)
+        return doc
+    except BaseException as exc:
+        error = exc
+        raise
+    finally:
+        _end_flight(did, flight, doc, error)
+
+
+async def _fetch_did_document_async(did: str) -> dict[str, Any]:
+    flight, leader = _begin_flight(did)
+    if not leader:
+        return await flight.wait_async()
+    doc, error = None, None
+    try:
+        if settings.did_cache_persistent:
+            previous = await anyio.to_thread.run_sync(_previous_version, did)
+        else:
+            previous = _previous_version(did)
+        doc = _adopt_if_fresh(did, previous)
+        if doc is not None:
+            return doc
+        url = did_web_to_url(did)
+        with did_failures.guard(did, urlparse(url).netloc):
+            r = await get_async_client().get(url, headers=_conditional_headers(previous))
+            doc = _store_fetched(did, r, previous)
+        return doc
+    except BaseException as exc:
+        error = exc
+        raise
+    finally:
+        _end_flight(did, flight, doc, error)
+
+
+def _refresh_failed(did: str, exc: BaseException) -> None:
+    inc("did_cache_refresh_error_total")
+    logger.warning("Background refresh of DID document failed for %s: %s", did, exc)
+
+
+def _refresh_in_background(did: str) -> None:
+    with _inflight_lock:
+        if did in _inflight:
+            return
+
+    def _run() -> None:
+        try:
+            _fetch_did_document(did)
+        except Exception as exc:
+            _refresh_failed(did, exc)
+
+    threading.Thread(target=_run, name="did-cache-refresh", daemon=True).start()
+
+
+def _refresh_in_background_async(did: str) -> None:
+    with _inflight_lock:
+        if did in _inflight:
+            return
+
+    async def _run() -> None:
+        try:
+            await _fetch_did_document_async(did)
+        except Exception as exc:
+            _refresh_failed(did, exc)
+
+    task = asyncio.get_running_loop().create_task(_run())
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+
+
+def _cached_document(did: str, *, refresh: Any) -> tuple[dict[str, Any] | None, dict[str, Any] | None]:
+    """Consult the cache: ``(doc_to_return, stale_fallback)``.
+
+    Fresh entries are returned as-is. Within `DID_CACHE_STALE_GRACE_SECONDS`
+    past the TTL the stale entry is returned and `refresh(did)` starts a
+    background revalidation. Older entries (up to
+    `DID_CACHE_MAX_STALE_SECONDS`) are only a fallback if the fetch fails.
+    """
+    doc, age = _cache_lookup(did)
+    if doc is None:
+        inc("did_cache_miss_total")
+        return None, None
+    ttl = settings.did_cache_ttl_seconds
+    if age <= ttl:
+        inc("did_cache_hit_total")
+        logger.debug("DID cache hit (age=%.1fs): %s", age, did)
+        return doc, None
+    if age <= ttl + settings.did_cache_stale_grace_seconds:
+        inc("did_cache_stale_served_total")
+        logger.debug("DID cache stale (age=%.1fs), revalidating: %s", age, did)
+        refresh(did)
+        return doc, None
+    inc("did_cache_miss_total")
+    return None, doc if age <= ttl + settings.did_cache_max_stale_seconds else None
+
+
+def _stale_if_error(did: str, stale: dict[str, Any] | None, exc: Exception) -> dict[str, Any]:
+    if stale is None:
+        raise exc
+    inc("did_cache_stale_if_error_total")
+    logger.warning("DID fetch failed for %s, serving stale document: %s", did, exc)
+    return stale
+
+
+def resolve_did(did: str) -> dict[str, Any]:
+    doc = _resolve_without_network(did)
+    if doc is not None:
+        return doc
+
+    doc, stale = _cached_document(did, refresh=_refresh_in_background)
+    if doc is not None:
+        return doc
+    try:
+        return _fetch_did_document(did)
+    except Exception as exc:
+        return _stale_if_error(did, stale, exc)
+
+
+async def resolve_did_async(did: str) -> dict[str, Any]:
+    """`resolve_did` for async callers.
+
+    did:web documents are fetched through the shared pooled client
+    (core.http_client), so a slow DID host holds a connection, not a worker
+    thread. DB-backed lookups (SPIFFE IDs, uncached local DIDs) run in the
+    threadpool.
+    """
+    if did.startswith("spiffe://") or _is_local_web_did(did):
+        doc = _local_cache_get(did) or await anyio.to_thread.run_sync(_resolve_without_network, did)
+    else:
+        doc = _resolve_without_network(did)
+    if doc is not None:
+        return doc
+
+    doc, stale = _cached_document(did, refresh=_refresh_in_background_async)
+    if doc is not None:
+        return doc
+    try:
+        return await _fetch_did_document_async(did)
+    except Exception as exc:
+        return _stale_if_error(did, stale, exc)
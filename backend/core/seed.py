@@ -9,9 +9,10 @@ from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 from typing import Optional
 
-from sqlalchemy import func, select, text
+from sqlalchemy import func, select
 
 from core import did as did_core
+from core import invalidation_bus
 from core.audit import write_audit
 from core.crypto import encrypt_text
 from core.db import db_session
@@ -19,7 +20,7 @@ from core.settings import settings
 from core.status_list import get_or_create_default_list, allocate_index, set_revoked
 from core.tenancy import ensure_tenant
 from core.vc import issue_vc_jwt
-from models import Agent, AuditEvent, Credential, Key, MandateSpend, TrustEvent
+from models import Agent, AuditEvent, Credential, DelegationRegistry, Key, MandateSpend, TrustEvent
 
 logger = logging.getLogger(__name__)
 
@@ -247,6 +248,7 @@ def _create_agent(tenant_id: str, name: str, spiffe_id: Optional[str] = None) ->
         db.commit()
         db.refresh(agent)
         db.refresh(key)
+    invalidation_bus.publish(invalidation_bus.AGENT_KEYS, did)
     return agent, key
 
 
@@ -325,16 +327,11 @@ def _seed_delegation_registry(
     with db_session() as db:
         for row in rows:
             jti, tid, iss, sub, parent, cat = row
-            db.execute(
-                text(
-                    "INSERT INTO delegation_registry "
-                    "(jti, tenant_id, issuer_did, subject_did, parent_jti, "
-                    "status_list_id, status_list_index, created_at, revoked_at) "
-                    "VALUES (:jti, :tid, :iss, :sub, :parent, NULL, NULL, :cat, NULL)"
-                ),
-                {"jti": jti, "tid": tid, "iss": iss, "sub": sub, "parent": parent, "cat": cat},
-            )
+            db.add(DelegationRegistry(
+                jti=jti, tenant_id=tid, issuer_did=iss, subject_did=sub, parent_jti=parent, created_at=cat,
+            ))
         db.commit()
+    invalidation_bus.publish_many(invalidation_bus.DELEGATION_REGISTERED, [row[0] for row in rows])
 
     for row in rows:
         jti, tid, iss, sub, parent, _ = row
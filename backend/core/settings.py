@@ -56,8 +56,13 @@ class Settings(BaseSettings):
     oidc_jwks_url: str = Field(default="", validation_alias="OIDC_JWKS_URL")
     oidc_jwks_json: str = Field(default="", validation_alias="OIDC_JWKS_JSON")
     oidc_client_id: str = Field(default="", validation_alias="OIDC_CLIENT_ID")
+    # JWKS background refresh; unknown-kid fetches are spaced at least min_fetch_interval apart
+    oidc_jwks_refresh_seconds: int = Field(default=300, validation_alias="OIDC_JWKS_REFRESH_SECONDS")
+    oidc_jwks_min_fetch_interval_seconds: int = Field(default=10, validation_alias="OIDC_JWKS_MIN_FETCH_INTERVAL_SECONDS")
     auth_jwt_secret: str = Field(default="dev-secret-change", validation_alias="AUTH_JWT_SECRET")
     auth_jwt_issuer: str = Field(default="pramana", validation_alias="AUTH_JWT_ISSUER")
+    # Verified-token LRU (entries live until the token's exp; 0 disables)
+    auth_token_cache_max_entries: int = Field(default=10_000, validation_alias="AUTH_TOKEN_CACHE_MAX_ENTRIES")
     pramana_dev_mode: bool = Field(default=False, validation_alias="PRAMANA_DEV_MODE")
 
     # Spaces demo mode (per-session demo tokens -> isolated tenants)
@@ -70,6 +75,14 @@ class Settings(BaseSettings):
     max_body_bytes: int = Field(default=1_000_000, validation_alias="MAX_BODY_BYTES")
     rate_limit_enabled: bool = Field(default=False, validation_alias="RATE_LIMIT_ENABLED")
     rate_limit_per_minute: int = Field(default=120, validation_alias="RATE_LIMIT_PER_MINUTE")
+    # Per-route-group (and optionally per-tenant) quotas, see api.middleware.rate_limit.parse_quotas
+    rate_limit_quotas: str = Field(default="", validation_alias="RATE_LIMIT_QUOTAS")
+    rate_limit_max_keys: int = Field(default=100_000, validation_alias="RATE_LIMIT_MAX_KEYS")
+    rate_limit_trust_forwarded: bool = Field(default=False, validation_alias="RATE_LIMIT_TRUST_FORWARDED")
+    # Shared limiter state across workers: "local" (per process), "sql" or "redis"
+    rate_limit_backend: str = Field(default="local", validation_alias="RATE_LIMIT_BACKEND")
+    rate_limit_backend_url: str = Field(default="", validation_alias="RATE_LIMIT_BACKEND_URL")
+    rate_limit_sync_interval_ms: int = Field(default=1000, validation_alias="RATE_LIMIT_SYNC_INTERVAL_MS")
 
     # Connection pool settings (PostgreSQL only)
     db_pool_size: int = Field(default=10, validation_alias="DB_POOL_SIZE")
@@ -80,10 +93,63 @@ class Settings(BaseSettings):
     # DID resolver cache settings
     did_cache_ttl_seconds: int = Field(default=300, validation_alias="DID_CACHE_TTL_SECONDS")
     did_cache_max_size: int = Field(default=10000, validation_alias="DID_CACHE_MAX_SIZE")
+    # Past the TTL: serve stale while one background refresh runs (grace), and
+    # fall back to stale when the host fails (max stale); never older than that
+    did_cache_stale_grace_seconds: int = Field(default=60, validation_alias="DID_CACHE_STALE_GRACE_SECONDS")
+    did_cache_max_stale_seconds: int = Field(default=600, validation_alias="DID_CACHE_MAX_STALE_SECONDS")
+    # Second-tier cache in the did_document_cache table (survives restarts, shared by workers)
+    did_cache_persistent: bool = Field(default=False, validation_alias="DID_CACHE_PERSISTENT")
+    # Memoised did:key documents (pure functions of the DID; 0 disables)
+    did_key_cache_max_size: int = Field(default=4096, validation_alias="DID_KEY_CACHE_MAX_SIZE")
+    # Failed resolutions (core.did_failures): negative cache, per-host backoff, circuit breaker
+    did_negative_cache_ttl_seconds: int = Field(default=30, validation_alias="DID_NEGATIVE_CACHE_TTL_SECONDS")
+    did_backoff_max_seconds: int = Field(default=600, validation_alias="DID_BACKOFF_MAX_SECONDS")
+    did_breaker_failure_threshold: int = Field(default=5, validation_alias="DID_BREAKER_FAILURE_THRESHOLD")
+    did_breaker_open_seconds: int = Field(default=30, validation_alias="DID_BREAKER_OPEN_SECONDS")
+    # Shared async HTTP client for DID documents and status lists (core.http_client)
+    outbound_http_timeout_seconds: float = Field(default=10.0, validation_alias="OUTBOUND_HTTP_TIMEOUT_SECONDS")
+    outbound_http_max_connections: int = Field(default=100, validation_alias="OUTBOUND_HTTP_MAX_CONNECTIONS")
+    outbound_http_max_keepalive: int = Field(default=20, validation_alias="OUTBOUND_HTTP_MAX_KEEPALIVE")
+    outbound_http_keepalive_expiry_seconds: float = Field(default=30.0, validation_alias="OUTBOUND_HTTP_KEEPALIVE_EXPIRY_SECONDS")
+    # HTTP/2 needs the optional 'h2' package (pip install 'httpx[http2]')
+    outbound_http2: bool = Field(default=False, validation_alias="OUTBOUND_HTTP2")
+    # Verification results by token hash; entries live min(exp, TTL) (0 entries disables)
+    vc_verify_cache_ttl_seconds: int = Field(default=300, validation_alias="VC_VERIFY_CACHE_TTL_SECONDS")
+    vc_verify_cache_max_entries: int = Field(default=10_000, validation_alias="VC_VERIFY_CACHE_MAX_ENTRIES")
+    # POST /v1/credentials/verify:batch
+    verify_batch_max_items: int = Field(default=100, validation_alias="VERIFY_BATCH_MAX_ITEMS")
+    # Max concurrent issuer and status list lookups per batch
+    verify_batch_max_workers: int = Field(default=8, validation_alias="VERIFY_BATCH_MAX_WORKERS")
+    # Parsed public keys by JWK thumbprint (0 disables)
+    public_key_cache_max_size: int = Field(default=4096, validation_alias="PUBLIC_KEY_CACHE_MAX_SIZE")
+    # Verified delegation chain links by token hash (core.delegation_link_cache; 0 entries disables)
+    delegation_link_cache_ttl_seconds: int = Field(default=300, validation_alias="DELEGATION_LINK_CACHE_TTL_SECONDS")
+    delegation_link_cache_max_entries: int = Field(default=10_000, validation_alias="DELEGATION_LINK_CACHE_MAX_ENTRIES")
+    # Cross-worker cache invalidation via the cache_epochs table (core.invalidation_bus)
+    cache_invalidation_bus_enabled: bool = Field(default=True, validation_alias="CACHE_INVALIDATION_BUS_ENABLED")
+    cache_invalidation_poll_ms: int = Field(default=1000, validation_alias="CACHE_INVALIDATION_POLL_MS")
+    cache_invalidation_retention_seconds: int = Field(default=3600, validation_alias="CACHE_INVALIDATION_RETENTION_SECONDS")
 
     # JTI deduplication
     jti_dedup_enabled: bool = Field(default=True, validation_alias="JTI_DEDUP_ENABLED")
     jti_dedup_window_seconds: int = Field(default=3600, validation_alias="JTI_DEDUP_WINDOW_SECONDS")
+    # Hard cap on in-memory JTIs (0 = unbounded). Overflow policy: "evict" or "reject".
+    jti_dedup_max_entries: int = Field(default=1_000_000, validation_alias="JTI_DEDUP_MAX_ENTRIES")
+    jti_dedup_overflow_policy: str = Field(default="evict", validation_alias="JTI_DEDUP_OVERFLOW_POLICY")
+    # Rotating Bloom filter in front of seen_jtis (horizon = jti_dedup_window_seconds)
+    jti_bloom_partitions: int = Field(default=4, validation_alias="JTI_BLOOM_PARTITIONS")
+    jti_bloom_capacity: int = Field(default=250_000, validation_alias="JTI_BLOOM_CAPACITY")
+    jti_bloom_error_rate: float = Field(default=0.001, validation_alias="JTI_BLOOM_ERROR_RATE")
+    # Batched seen_jtis persistence and expired-row sweeper. Write-behind skips the
+    # per-JTI atomic claim and is only safe with a single worker process.
+    jti_persist_write_behind: bool = Field(default=False, validation_alias="JTI_PERSIST_WRITE_BEHIND")
+    jti_persist_batch_size: int = Field(default=256, validation_alias="JTI_PERSIST_BATCH_SIZE")
+    jti_persist_flush_interval_ms: int = Field(default=200, validation_alias="JTI_PERSIST_FLUSH_INTERVAL_MS")
+    jti_sweep_interval_seconds: int = Field(default=300, validation_alias="JTI_SWEEP_INTERVAL_SECONDS")
+    jti_sweep_chunk_size: int = Field(default=1000, validation_alias="JTI_SWEEP_CHUNK_SIZE")
+    # Startup warm-up of the in-memory store from seen_jtis
+    jti_warm_chunk_size: int = Field(default=5000, validation_alias="JTI_WARM_CHUNK_SIZE")
+    jti_warm_in_background: bool = Field(default=True, validation_alias="JTI_WARM_IN_BACKGROUND")
 
     def model_post_init(self, __context: object) -> None:
         if self.env == "production" and not self.database_url.startswith("postgresql"):
@@ -91,12 +91,24 @@ def init_db() -> None:
 
     # Warm JTI dedup cache from DB so replay protection survives restarts
     try:
-        from core.jti_dedup import warm_jti_cache
-        warm_jti_cache()
+        from core.jti_dedup import start_jti_cache_warmup, start_jti_persistence_worker, warm_jti_cache
+        if settings.jti_warm_in_background:
+            start_jti_cache_warmup()
+        else:
+            warm_jti_cache()
+        start_jti_persistence_worker()
     except Exception:
         import logging as _logging
         _logging.getLogger(__name__).debug("JTI cache warm skipped", exc_info=True)
 
+    # Listen for other workers' cache invalidations
+    try:
+        from core.invalidation_bus import start_invalidation_listener
+        start_invalidation_listener()
+    except Exception:
+        import logging as _logging
+        _logging.getLogger(__name__).debug("Cache invalidation listener not started", exc_info=True)
+
     if settings.demo_mode and settings.demo_auto_seed:
         try:
             from core.seed import seed_tenant
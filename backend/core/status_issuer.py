@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import uuid
 
+from core import invalidation_bus
 from core.crypto import encrypt_text
 from core.db import db_session
 from core.did import generate_ed25519_keypair
@@ -19,9 +20,11 @@ def status_issuer_did() -> str:
 def ensure_status_issuer() -> tuple[Agent, Key]:
     did = status_issuer_did()
 
+    created = False
     with db_session() as db:
         agent = db.query(Agent).filter(Agent.did == did).one_or_none()
         if agent is None:
+            created = True
             agent = Agent(id=uuid.uuid4(), name=STATUS_ISSUER_NAME, did=did)
             db.add(agent)
             db.flush()
@@ -43,9 +46,12 @@ def ensure_status_issuer() -> tuple[Agent, Key]:
                 private_key_enc=encrypt_text(private_pem),
             )
             db.add(key)
+            created = True
 
         db.commit()
         db.refresh(agent)
         db.refresh(key)
 
+    if created:
+        invalidation_bus.publish(invalidation_bus.AGENT_KEYS, did)
     return agent, key
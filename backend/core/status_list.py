@@ -6,6 +6,7 @@ from datetime import datetime
 
 from sqlalchemy import select, update
 
+from core import invalidation_bus
 from core.db import db_session
 from models import StatusList
 
@@ -87,18 +88,29 @@ def allocate_index(status_list_id) -> int:
 
 
 def set_revoked(status_list_id, index: int) -> None:
+    set_revoked_many(status_list_id, [index])
+
+
+def set_revoked_many(status_list_id, indices) -> None:
+    """Set several bits of one list with a single read-modify-write.
+
+    Raises ValueError (and changes nothing) if any index is out of bounds.
+    """
+    indices = list(indices)
+    if not indices:
+        return
     with db_session() as db:
         sl = db.query(StatusList).filter(StatusList.id == _normalize_id(status_list_id)).one()
-        if index < 0 or index >= sl.size:
+        if any(index < 0 or index >= sl.size for index in indices):
             raise ValueError("Index out of bounds")
         bits = bytearray(_b64url_decode(sl.bitstring))
-        byte_i = index // 8
-        bit_i = index % 8
-        bits[byte_i] |= 1 << bit_i
+        for index in indices:
+            bits[index // 8] |= 1 << (index % 8)
         sl.bitstring = _b64url(bytes(bits))
         sl.updated_at = datetime.utcnow()
         db.add(sl)
         db.commit()
+    invalidation_bus.publish(invalidation_bus.STATUS_LIST, str(_normalize_id(status_list_id)))
 
 
 def is_revoked(status_list_id, index: int) -> bool:
@@ -6,6 +6,8 @@ from datetime import datetime
 from typing import Any
 from urllib.parse import unquote, urlparse
 
+import anyio
+import httpx
 import jwt
 from cryptography.hazmat.primitives import serialization
 
@@ -13,7 +15,9 @@ from core.bitstring_encoding import b64url, b64url_decode, gzip_compress, gzip_d
 from core.crypto import decrypt_text
 from core.db import db_session
 from core.did import public_key_from_jwk
-from core.resolver import resolve_did
+from core.parsed_jwt import ParsedJWT
+from core.http_client import get_async_client
+from core.resolver import resolve_did, resolve_did_async
 from core.settings import settings
 from core.status_issuer import ensure_status_issuer
 from models import StatusList
@@ -71,17 +75,25 @@ def issue_status_list_vc_jwt(status_list_id: uuid.UUID) -> tuple[str, dict[str,
     return token, vc
 
 
+def _status_list_issuer(parsed: ParsedJWT) -> Any:
+    issuer = parsed.payload.get('iss')
+    if not issuer:
+        raise ValueError('status list missing iss')
+    return issuer
+
+
 def verify_and_extract_encoded_list(status_list_jwt: str) -> tuple[bytes, dict[str, Any]]:
-    header = jwt.get_unverified_header(status_list_jwt)
-    kid = header.get('kid')
+    parsed = ParsedJWT.parse(status_list_jwt)
+    return _extract_encoded_list(parsed, resolve_did(_status_list_issuer(parsed)))
 
-    payload = jwt.decode(status_list_jwt, options={'verify_signature': False})
 
-    issuer = payload.get('iss')
-    if not issuer:
-        raise ValueError('status list missing iss')
+async def verify_and_extract_encoded_list_async(status_list_jwt: str) -> tuple[bytes, dict[str, Any]]:
+    parsed = ParsedJWT.parse(status_list_jwt)
+    return _extract_encoded_list(parsed, await resolve_did_async(_status_list_issuer(parsed)))
+
 
-    did_doc = resolve_did(issuer)
+def _extract_encoded_list(parsed: ParsedJWT, did_doc: dict[str, Any]) -> tuple[bytes, dict[str, Any]]:
+    kid = parsed.kid
     vms = did_doc.get('verificationMethod') or []
 
     vm = None
@@ -98,7 +110,7 @@ def verify_and_extract_encoded_list(status_list_jwt: str) -> tuple[bytes, dict[s
     jwk = vm.get('publicKeyJwk')
     pub = public_key_from_jwk(jwk)
 
-    verified_payload = jwt.decode(status_list_jwt, key=pub, algorithms=['EdDSA'])
+    verified_payload = parsed.verify(pub, algorithms=['EdDSA'])
 
     vc = verified_payload.get('vc')
     if not isinstance(vc, dict):
@@ -130,3 +142,37 @@ def status_list_id_from_url(url: str) -> uuid.UUID:
     u = urlparse(url)
     parts = u.path.rstrip('/').split('/')
     return uuid.UUID(parts[-1])
+
+
+def _status_jwt_from_response(r: httpx.Response) -> str:
+    r.raise_for_status()
+    data = r.json()
+    status_jwt = data.get('jwt')
+    if not isinstance(status_jwt, str):
+        raise ValueError('status list response missing jwt')
+    return status_jwt
+
+
+async def fetch_status_list_jwt_async(status_list_cred_url: str) -> str:
+    """GET a remote status list credential through the shared pooled client."""
+    return _status_jwt_from_response(await get_async_client().get(status_list_cred_url))
+
+
+async def fetch_status_list_bits_async(status_list_cred_url: str) -> bytes:
+    """Fetch and verify a (local or remote) status list credential; return its raw bitstring.
+
+    Local lists are signed in the threadpool.
+    """
+    if is_local_status_list_url(status_list_cred_url):
+        sl_id = status_list_id_from_url(status_list_cred_url)
+        status_jwt, _ = await anyio.to_thread.run_sync(issue_status_list_vc_jwt, sl_id)
+    else:
+        status_jwt = await fetch_status_list_jwt_async(status_list_cred_url)
+    raw_bits, _ = await verify_and_extract_encoded_list_async(status_jwt)
+    return raw_bits
+
+
+def status_bit(raw_bits: bytes, index: int) -> bool:
+    if index < 0 or index >= (len(raw_bits) * 8):
+        return False
+    return (raw_bits[index // 8] & (1 << (index % 8))) != 0
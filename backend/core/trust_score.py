@@ -9,6 +9,7 @@ from typing import Any, Optional
 import jwt as pyjwt
 
 from core.db import db_session
+from core.parsed_jwt import ParsedJWT
 from core.resolver import resolve_did
 from core.status_list_vc import (
     is_local_status_list_url,
@@ -16,7 +17,7 @@ from core.status_list_vc import (
     status_list_id_from_url,
     verify_and_extract_encoded_list,
 )
-from core.vc import verify_vc_jwt
+from core.vc import verify_vc_jwt_cached
 from models import Agent, Credential, StatusList, TrustEvent
 
 import httpx
@@ -51,24 +52,24 @@ def _status_check(status_list_cred_url: str, index: int) -> bool:
     return (raw_bits[byte_i] & (1 << bit_i)) != 0
 
 
-def _factor_credential_validity(token: str) -> tuple[int, str]:
+def _factor_credential_validity(token: str | ParsedJWT) -> tuple[int, str]:
     """
     Factor 1: Credential Validity (0-25).
 
     Returns (score, explanation).
     """
-    # First decode without verification to get exp and check for expiry state.
+    # Decode once; exp is read from the unverified payload to grade expiry.
     try:
-        unverified = pyjwt.decode(token, options={"verify_signature": False})
+        parsed = ParsedJWT.parse(token)
     except Exception:
         return 0, "Invalid JWT — cannot decode"
 
-    exp = unverified.get("exp")
+    exp = parsed.payload.get("exp")
     now = int(time.time())
 
     # Try full signature + status verification.
     try:
-        result = verify_vc_jwt(token=token, resolve_did_document=resolve_did, status_check=_status_check)
+        result = verify_vc_jwt_cached(token=parsed, resolve_did_document=resolve_did, status_check=_status_check)
     except pyjwt.ExpiredSignatureError:
         if exp is not None:
             seconds_past = now - exp
@@ -203,6 +204,7 @@ def _factor_delegation_depth(payload: dict[str, Any]) -> tuple[int, str]:
         # Infer from presence of parent delegation fields
         has_parent = bool(
             cs.get("parentDelegation")
+            or cs.get("parentDelegationRef")
             or cs.get("parentIntentMandate")
             or cs.get("delegationChain")
         )
@@ -223,7 +225,7 @@ def _risk_level(total: int) -> str:
     return "critical"
 
 
-def compute_trust_score(token: str, tenant_id: str) -> TrustScore:
+def compute_trust_score(token: str | ParsedJWT, tenant_id: str) -> TrustScore:
     """
     Compute a composite 0-100 trust score for a VC-JWT.
 
@@ -231,7 +233,7 @@ def compute_trust_score(token: str, tenant_id: str) -> TrustScore:
     """
     # Decode to extract issuer/subject DIDs without raising on expiry.
     try:
-        payload = pyjwt.decode(token, options={"verify_signature": False})
+        parsed = ParsedJWT.parse(token)
     except Exception as exc:
         factors = {
             "credential_validity": 0,
@@ -247,10 +249,11 @@ def compute_trust_score(token: str, tenant_id: str) -> TrustScore:
             computed_at=datetime.utcnow().isoformat() + "Z",
         )
 
+    payload = parsed.payload
     issuer_did = payload.get("iss", "")
     subject_did = payload.get("sub", "")
 
-    f1_score, f1_note = _factor_credential_validity(token)
+    f1_score, f1_note = _factor_credential_validity(parsed)
     f2_score, f2_note = _factor_issuer_reputation(issuer_did, tenant_id)
     f3_score, f3_note = _factor_agent_history(subject_did, tenant_id)
     f4_score, f4_note = _factor_delegation_depth(payload)
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import asyncio
 import time
 import uuid
 from typing import Any, Optional
 
+import anyio
 import jwt
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric.ec import EllipticCurvePublicKey
@@ -13,6 +15,10 @@ from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
 from core.crypto import decrypt_text
 from core.did import public_key_from_jwk
 from core.db import db_session
+from core.key_cache import public_key_cache
+from core.parsed_jwt import ParsedJWT
+from core.status_list_vc import status_bit, status_list_id_from_url
+from core import verify_cache
 from models import Agent, Key
 
 # Algorithms accepted for VC/SVID verification.
@@ -25,12 +31,18 @@ def _now() -> int:
 
 
 def _public_key_from_jwk_multi(jwk: dict[str, Any]):
-    """Load a public key from a JWK. Supports OKP (Ed25519), EC (P-256/P-384/P-521), and RSA."""
-    kty = jwk.get("kty")
+    """Load a public key from a JWK. Supports OKP (Ed25519), EC (P-256/P-384/P-521), and RSA.
 
-    if kty == "OKP":
-        # Ed25519 — existing implementation
+    Loaded keys are cached by JWK thumbprint.
+    """
+    if jwk.get("kty") == "OKP":
+        # Ed25519 — existing implementation (cached in core.did)
         return public_key_from_jwk(jwk)
+    return public_key_cache.get_or_load(jwk, _load_ec_or_rsa_public_key)
+
+
+def _load_ec_or_rsa_public_key(jwk: dict[str, Any]):
+    kty = jwk.get("kty")
 
     if kty == "EC":
         from cryptography.hazmat.primitives.asymmetric.ec import (
@@ -130,27 +142,21 @@ def issue_vc_jwt(
     return token, jti, iat, exp
 
 
-def verify_vc_jwt(*, token: str, resolve_did_document: Any, status_check: Any) -> dict[str, Any]:
-    """Verify a VC-JWT or SPIFFE SVID JWT.
-
-    Supports EdDSA (Ed25519), RS256/PS256 (RSA), ES256/ES384/ES512 (ECDSA).
-    The algorithm is read from the JWT header; no algorithm is assumed.
-    """
-    # decode header to find kid and algorithm
-    header = jwt.get_unverified_header(token)
-    kid = header.get("kid")
-    alg = header.get("alg", "EdDSA")
+def _prepare_verification(token: str | ParsedJWT) -> tuple[ParsedJWT, str, str]:
+    parsed = ParsedJWT.parse(token)
+    alg = parsed.header.get("alg", "EdDSA")
 
     if alg not in _SUPPORTED_ALGORITHMS:
         raise ValueError(f"Unsupported JWT algorithm: {alg!r}. Supported: {_SUPPORTED_ALGORITHMS}")
 
-    decoded = jwt.decode(token, options={"verify_signature": False})
-
-    issuer = decoded.get("iss")
+    issuer = parsed.payload.get("iss")
     if not issuer or not isinstance(issuer, str):
         raise ValueError("Missing iss")
+    return parsed, alg, issuer
 
-    did_doc = resolve_did_document(issuer)
+
+def _verify_against_did_document(parsed: ParsedJWT, alg: str, did_doc: dict[str, Any]) -> dict[str, Any]:
+    kid = parsed.kid
 
     # find verification method with matching kid (fallback to first)
     vms = did_doc.get("verificationMethod") or []
@@ -176,22 +182,203 @@ def verify_vc_jwt(*, token: str, resolve_did_document: Any, status_check: Any) -
         # SPIFFE SVIDs require iss, sub, exp, aud — be permissive on jti/iat
         required_claims = ["iss", "sub"]
 
-    payload = jwt.decode(
-        token,
-        key=pub,
-        algorithms=[alg],
-        options={"require": required_claims},
-    )
+    return parsed.verify(pub, algorithms=[alg], require=required_claims)
+
 
+def _status_reference(payload: dict[str, Any]) -> Optional[tuple[str, int]]:
     # status check (may not be present in SVIDs)
     vc = payload.get("vc") or {}
     cs = vc.get("credentialStatus") or {}
     status_list_cred = cs.get("statusListCredential")
     status_list_index = cs.get("statusListIndex")
-
-    status = {"present": False}
     if status_list_cred and status_list_index is not None:
+        return status_list_cred, int(status_list_index)
+    return None
+
+
+def verify_vc_jwt(*, token: str | ParsedJWT, resolve_did_document: Any, status_check: Any) -> dict[str, Any]:
+    """Verify a VC-JWT or SPIFFE SVID JWT.
+
+    Supports EdDSA (Ed25519), RS256/PS256 (RSA), ES256/ES384/ES512 (ECDSA).
+    The algorithm is read from the JWT header; no algorithm is assumed.
+    `token` may be a compact JWT or an already parsed `ParsedJWT`; either way
+    it is decoded only once.
+    """
+    parsed, alg, issuer = _prepare_verification(token)
+    payload = _verify_against_did_document(parsed, alg, resolve_did_document(issuer))
+
+    status: dict[str, Any] = {"present": False}
+    ref = _status_reference(payload)
+    if ref is not None:
         status["present"] = True
-        status["revoked"] = bool(status_check(status_list_cred, int(status_list_index)))
+        status["revoked"] = bool(status_check(*ref))
 
     return {"payload": payload, "status": status}
+
+
+async def verify_vc_jwt_async(*, token: str | ParsedJWT, resolve_did_document: Any, status_check: Any) -> dict[str, Any]:
+    """`verify_vc_jwt` with awaitable `resolve_did_document` and `status_check`
+    (e.g. `core.resolver.resolve_did_async`)."""
+    parsed, alg, issuer = _prepare_verification(token)
+    payload = _verify_against_did_document(parsed, alg, await resolve_did_document(issuer))
+
+    status: dict[str, Any] = {"present": False}
+    ref = _status_reference(payload)
+    if ref is not None:
+        status["present"] = True
+        status["revoked"] = bool(await status_check(*ref))
+
+    return {"payload": payload, "status": status}
+
+
+def _status_key(payload: dict[str, Any]) -> Optional[str]:
+    vc = payload.get("vc") or {}
+    url = (vc.get("credentialStatus") or {}).get("statusListCredential")
+    if not url:
+        return None
+    try:
+        # Local lists are revoked via core.status_list.set_revoked, which invalidates by id
+        return str(status_list_id_from_url(url))
+    except Exception:
+        return str(url)
+
+
+def _cache_context(parsed: ParsedJWT) -> tuple[Optional[str], str, tuple[int, int]]:
+    status_key = _status_key(parsed.payload)
+    issuer = str(parsed.payload.get("iss") or "")
+    # Snapshot before any lookup so a concurrent revocation is never cached as valid
+    return status_key, issuer, verify_cache.current_versions(status_key, issuer)
+
+
+def verify_vc_jwt_cached(*, token: str | ParsedJWT, resolve_did_document: Any, status_check: Any) -> dict[str, Any]:
+    """`verify_vc_jwt` behind the verification result cache (core.verify_cache).
+
+    Only successful verifications are cached; failures always re-run.
+    """
+    raw = token.token if isinstance(token, ParsedJWT) else token
+    cached = verify_cache.get(raw)
+    if cached is not None:
+        return cached
+
+    parsed = ParsedJWT.parse(token)
+    status_key, issuer, versions = _cache_context(parsed)
+    result = verify_vc_jwt(token=parsed, resolve_did_document=resolve_did_document, status_check=status_check)
+    verify_cache.put(raw, result, status_key=status_key, issuer=issuer, versions=versions)
+    return result
+
+
+async def verify_vc_jwt_cached_async(*, token: str | ParsedJWT, resolve_did_document: Any, status_check: Any) -> dict[str, Any]:
+    """`verify_vc_jwt_async` behind the verification result cache."""
+    raw = token.token if isinstance(token, ParsedJWT) else token
+    cached = verify_cache.get(raw)
+    if cached is not None:
+        return cached
+
+    parsed = ParsedJWT.parse(token)
+    status_key, issuer, versions = _cache_context(parsed)
+    result = await verify_vc_jwt_async(token=parsed, resolve_did_document=resolve_did_document, status_check=status_check)
+    verify_cache.put(raw, result, status_key=status_key, issuer=issuer, versions=versions)
+    return result
+
+
+_Pending = dict[str, tuple[ParsedJWT, Optional[str], str, tuple[int, int]]]
+
+
+def _batch_prepare(tokens: list[str]) -> tuple[dict[str, dict[str, Any]], _Pending]:
+    """Serve cache hits and parse the rest; identical tokens are handled once."""
+    outcomes: dict[str, dict[str, Any]] = {}
+    pending: _Pending = {}
+    for raw in dict.fromkeys(tokens):
+        cached = verify_cache.get(raw)
+        if cached is not None:
+            outcomes[raw] = {"ok": True, "result": cached}
+            continue
+        try:
+            parsed = ParsedJWT.parse(raw)
+        except Exception as exc:
+            outcomes[raw] = {"ok": False, "error": str(exc)}
+            continue
+        pending[raw] = (parsed, *_cache_context(parsed))
+    return outcomes, pending
+
+
+def _batch_lookups(pending: _Pending) -> tuple[list[str], list[str]]:
+    """The distinct issuer DIDs and status list URLs a batch depends on."""
+    issuers = {p.payload.get("iss") for p, _, _, _ in pending.values() if isinstance(p.payload.get("iss"), str)}
+    status_urls = set()
+    for p, _, _, _ in pending.values():
+        cs = (p.payload.get("vc") or {}).get("credentialStatus") or {}
+        if cs.get("statusListCredential") and cs.get("statusListIndex") is not None:
+            status_urls.add(cs["statusListCredential"])
+    return list(issuers), list(status_urls)
+
+
+def _batch_verifier(pending: _Pending, docs: dict[str, tuple[bool, Any]], bitmaps: dict[str, tuple[bool, Any]]) -> Any:
+    """A function verifying one pending token against pre-fetched ``(ok, value)`` lookups."""
+
+    def _lookup(results: dict[str, tuple[bool, Any]], key: str) -> Any:
+        ok, value = results.get(key, (False, ValueError(f"{key!r} was not looked up")))
+        if not ok:
+            raise value
+        return value
+
+    def _verify_one(raw: str) -> dict[str, Any]:
+        parsed, status_key, issuer, versions = pending[raw]
+        try:
+            result = verify_vc_jwt(
+                token=parsed,
+                resolve_did_document=lambda did: _lookup(docs, did),
+                status_check=lambda url, index: status_bit(_lookup(bitmaps, url), index),
+            )
+        except Exception as exc:
+            return {"ok": False, "error": str(exc)}
+        verify_cache.put(raw, result, status_key=status_key, issuer=issuer, versions=versions)
+        return {"ok": True, "result": result}
+
+    return _verify_one
+
+
+async def verify_vc_jwt_batch_async(
+    tokens: list[str],
+    *,
+    resolve_did_document: Any,
+    fetch_status_bits: Any,
+    max_concurrency: int = 8,
+) -> list[dict[str, Any]]:
+    """Verify many VC-JWTs, sharing the expensive lookups across the batch.
+
+    Identical tokens are verified once, each issuer DID is resolved once and
+    each status list is fetched once. The lookups are awaitables and run
+    concurrently on the event loop; signature checks then run in parallel in
+    the threadpool, one call per token. Both stages run at most
+    `max_concurrency` at a time. Cache hits skip all of it.
+
+    Returns one item per input token, in order: ``{"ok": True, "result": ...}``
+    or ``{"ok": False, "error": "..."}``.
+    """
+    outcomes, pending = _batch_prepare(tokens)
+    if pending:
+        issuers, status_urls = _batch_lookups(pending)
+        limit = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def _settle_async(fn: Any, arg: Any) -> tuple[bool, Any]:
+            async with limit:
+                try:
+                    return True, await fn(arg)
+                except Exception as exc:
+                    return False, exc
+
+        doc_results, bitmap_results = await asyncio.gather(
+            asyncio.gather(*(_settle_async(resolve_did_document, d) for d in issuers)),
+            asyncio.gather(*(_settle_async(fetch_status_bits, u) for u in status_urls)),
+        )
+        verify_one = _batch_verifier(pending, dict(zip(issuers, doc_results)), dict(zip(status_urls, bitmap_results)))
+
+        async def _verify_async(raw: str) -> dict[str, Any]:
+            async with limit:
+                return await anyio.to_thread.run_sync(verify_one, raw)
+
+        results = await asyncio.gather(*(_verify_async(raw) for raw in pending))
+        outcomes.update(zip(pending, results))
+
+    return [outcomes[raw] for raw in tokens]
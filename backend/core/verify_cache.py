@@ -0,0 +1,151 @@
+"""Cache of credential verification results, keyed by token hash.
+
+Agents present the same VC-JWT many times during its lifetime; a cache hit
+skips DID resolution, signature verification and the status-list fetch.
+
+An entry lives until the token's ``exp`` or `VC_VERIFY_CACHE_TTL_SECONDS`,
+whichever is sooner, and is tied to two version counters captured when it was
+stored:
+
+- the status list it references, bumped by `core.status_list.set_revoked`, so
+  a revocation invalidates every cached result for that list immediately;
+- the issuer DID, bumped when the issuer's keys rotate.
+
+Both arrive through `core.invalidation_bus`, so other workers follow within
+one poll interval.
+
+Remote status lists cannot notify us of changes; for those the TTL is the
+bound on how stale a cached "not revoked" answer can be.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from core import invalidation_bus
+from core.demo_metrics import inc
+from core.settings import settings
+
+
+@dataclass(frozen=True)
+class _Entry:
+    result: dict[str, Any]
+    expires_at: float
+    status_key: Optional[str]
+    status_version: int
+    issuer: str
+    issuer_version: int
+
+
+_lock = threading.Lock()
+_entries: OrderedDict[str, _Entry] = OrderedDict()
+_status_versions: dict[str, int] = {}
+_issuer_versions: dict[str, int] = {}
+
+
+def token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _copy(result: dict[str, Any]) -> dict[str, Any]:
+    # Callers spread and annotate results; keep the cached status dict pristine.
+    return {**result, "status": dict(result.get("status") or {})}
+
+
+def get(token: str) -> Optional[dict[str, Any]]:
+    if settings.vc_verify_cache_max_entries <= 0:
+        return None
+    key = token_hash(token)
+    now = time.time()
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None:
+            fresh = (
+                entry.expires_at > now
+                and _status_versions.get(entry.status_key or "", 0) == entry.status_version
+                and _issuer_versions.get(entry.issuer, 0) == entry.issuer_version
+            )
+            if fresh:
+                _entries.move_to_end(key)
+                inc("vc_verify_cache_hit_total")
+                return _copy(entry.result)
+            del _entries[key]
+    inc("vc_verify_cache_miss_total")
+    return None
+
+
+def current_versions(status_key: Optional[str], issuer: str) -> tuple[int, int]:
+    """Snapshot the invalidation counters. Take it *before* verifying, so a
+    revocation that lands mid-verification invalidates the result being stored."""
+    with _lock:
+        return _status_versions.get(status_key or "", 0), _issuer_versions.get(issuer, 0)
+
+
+def put(
+    token: str,
+    result: dict[str, Any],
+    *,
+    status_key: Optional[str],
+    issuer: str,
+    versions: tuple[int, int],
+) -> None:
+    """Cache a successful verification result.
+
+    `status_key` identifies the referenced status list (its id for local
+    lists, the URL otherwise); `issuer` is the issuer DID; `versions` comes
+    from `current_versions`.
+    """
+    max_entries = settings.vc_verify_cache_max_entries
+    if max_entries <= 0:
+        return
+    now = time.time()
+    expires_at = now + settings.vc_verify_cache_ttl_seconds
+    exp = (result.get("payload") or {}).get("exp")
+    if isinstance(exp, (int, float)):
+        expires_at = min(expires_at, float(exp))
+    if expires_at <= now:
+        return
+
+    key = token_hash(token)
+    with _lock:
+        _entries[key] = _Entry(
+            result=_copy(result),
+            expires_at=expires_at,
+            status_key=status_key,
+            status_version=versions[0],
+            issuer=issuer,
+            issuer_version=versions[1],
+        )
+        _entries.move_to_end(key)
+        while len(_entries) > max_entries:
+            _entries.popitem(last=False)
+
+
+def invalidate_status_list(status_key: str) -> None:
+    """Invalidate every cached result that references this status list."""
+    with _lock:
+        _status_versions[str(status_key)] = _status_versions.get(str(status_key), 0) + 1
+
+
+def invalidate_issuer(issuer_did: str) -> None:
+    """Invalidate every cached result issued by this DID (e.g. after key rotation)."""
+    with _lock:
+        _issuer_versions[issuer_did] = _issuer_versions.get(issuer_did, 0) + 1
+
+
+invalidation_bus.subscribe(invalidation_bus.STATUS_LIST, invalidate_status_list)
+invalidation_bus.subscribe(invalidation_bus.AGENT_KEYS, invalidate_issuer)
+
+
+def clear() -> None:
+    with _lock:
+        _entries.clear()
+
+
+def size() -> int:
+    with _lock:
+        return len(_entries)
@@ -2,7 +2,8 @@ from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, RedirectResponse
 from api.middleware.limits import MaxBodySizeMiddleware
-from api.middleware.rate_limit import SimpleRateLimitMiddleware
+from api.middleware.request_context import ErrorEnvelopeMiddleware, RequestIdMiddleware, request_id_from_scope
+from api.middleware.rate_limit import RateLimitMiddleware, build_limiter
 
 from api.routes.agents import router as agents_router
 from api.routes.admin import router as admin_router
@@ -34,41 +35,9 @@ app = FastAPI(
     version="0.1.0",
 )
 
-def _get_request_id(request: Request) -> str:
-    rid = request.headers.get("x-request-id") or request.headers.get("X-Request-ID")
-    if isinstance(rid, str) and rid.strip():
-        return rid.strip()
-    import uuid
-
-    return uuid.uuid4().hex[:12]
-
-
-@app.middleware("http")
-async def _request_id_middleware(request: Request, call_next):
-    rid = _get_request_id(request)
-    request.state.request_id = rid
-    try:
-        response = await call_next(request)
-    except HTTPException as e:
-        # Let the exception handler format this.
-        raise e
-    except Exception as e:
-        # Always return structured error with request id (no tracebacks).
-        body = {"error": "internal_error", "request_id": rid}
-        # In demo mode, include a short message + exception type for faster iteration.
-        if settings.demo_mode:
-            body["type"] = e.__class__.__name__
-            msg = str(e)
-            body["message"] = msg[:300] if isinstance(msg, str) else "error"
-        return JSONResponse(status_code=500, content=body, headers={"x-request-id": rid})
-
-    response.headers["x-request-id"] = rid
-    return response
-
-
 @app.exception_handler(HTTPException)
 async def _http_exception_handler(request: Request, exc: HTTPException):
-    rid = getattr(request.state, "request_id", None) or _get_request_id(request)
+    rid = request_id_from_scope(request.scope)
     detail = exc.detail
     if isinstance(detail, dict):
         body = {**detail, "request_id": rid}
@@ -116,6 +85,12 @@ def _add_demo_mode_ui_overrides(app: FastAPI) -> None:
     app.add_api_route("/auth/callback", _to_demo, methods=["GET", "HEAD"], include_in_schema=False)
     app.add_api_route("/auth/callback/", _to_demo, methods=["GET", "HEAD"], include_in_schema=False)
 
+# Middleware is pure ASGI (no BaseHTTPMiddleware / @app.middleware) to avoid
+# per-request task-group overhead and keep streaming responses intact.
+# add_middleware() wraps outward, so the order below is innermost first:
+# ErrorEnvelope -> CORS -> MaxBodySize -> RateLimit -> RequestId.
+app.add_middleware(ErrorEnvelopeMiddleware, include_details=settings.demo_mode)
+
 if settings.cors_enabled:
     app.add_middleware(
         CORSMiddleware,
@@ -126,8 +101,25 @@ if settings.cors_enabled:
     )
 
 app.add_middleware(MaxBodySizeMiddleware, max_bytes=settings.max_body_bytes)
+# Kept so shutdown can stop a shared limiter's sync thread and flush its counts
+_rate_limiter = None
 if settings.rate_limit_enabled:
-    app.add_middleware(SimpleRateLimitMiddleware, max_requests=settings.rate_limit_per_minute, window_seconds=60)
+    _rate_limiter = build_limiter(
+        settings.rate_limit_backend,
+        settings.rate_limit_backend_url,
+        sync_interval_ms=settings.rate_limit_sync_interval_ms,
+        max_keys=settings.rate_limit_max_keys,
+    )
+    app.add_middleware(
+        RateLimitMiddleware,
+        max_requests=settings.rate_limit_per_minute,
+        window_seconds=60,
+        quotas=settings.rate_limit_quotas,
+        max_keys=settings.rate_limit_max_keys,
+        trust_forwarded=settings.rate_limit_trust_forwarded,
+        limiter=_rate_limiter,
+    )
+app.add_middleware(RequestIdMiddleware)
 
 app.include_router(agents_router)
 app.include_router(admin_router)
@@ -156,6 +148,23 @@ async def _startup():
     init_db()
 
 
+@app.on_event("shutdown")
+async def _shutdown():
+    from core.auth.oidc import stop_jwks_refresh
+    from core.did_store import stop_did_store_writer
+    from core.http_client import aclose_async_client
+    from core.invalidation_bus import stop_invalidation_listener
+    from core.jti_dedup import stop_jti_persistence_worker
+
+    stop_jti_persistence_worker()
+    stop_jwks_refresh()
+    stop_did_store_writer()
+    stop_invalidation_listener()
+    if _rate_limiter is not None:
+        _rate_limiter.close()
+    await aclose_async_client()
+
+
 @app.get("/health")
 async def health():
     return {"status": "healthy"}
@@ -163,6 +172,8 @@ async def health():
 
 @app.get("/ready")
 async def ready():
+    from core.jti_dedup import jti_warm_status
+
     try:
         from core.db import engine
         from sqlalchemy import text as _text
@@ -185,7 +196,9 @@ async def ready():
             except Exception as e:
                 return {"ready": False, "error": f"db not writable: {e}"}
 
-        return {"ready": True}
+        # JTI cache warm-up runs in the background; replay checks fall back to
+        # the DB until it finishes, so it is reported but does not gate readiness.
+        return {"ready": True, "jti_cache": jti_warm_status()}
     except Exception as e:
         return {"ready": False, "error": str(e)}
 
@@ -0,0 +1,30 @@
+"""Add did_document_cache table for the persistent DID resolver cache
+
+Revision ID: 0010_did_document_cache
+Revises: 0009_rate_limit_counters
+Create Date: 2026-10-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0010_did_document_cache"
+down_revision = "0009_rate_limit_counters"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "did_document_cache",
+        sa.Column("did", sa.String(500), primary_key=True),
+        sa.Column("document", sa.JSON(), nullable=False),
+        sa.Column("etag", sa.String(500), nullable=True),
+        sa.Column("last_modified", sa.String(100), nullable=True),
+        sa.Column("fetched_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("did_document_cache")
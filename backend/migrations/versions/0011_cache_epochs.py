@@ -0,0 +1,32 @@
+"""Add cache_epochs table for the cross-worker cache invalidation bus
+
+Revision ID: 0011_cache_epochs
+Revises: 0010_did_document_cache
+Create Date: 2026-10-19
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0011_cache_epochs"
+down_revision = "0010_did_document_cache"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "cache_epochs",
+        sa.Column("epoch", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("topic", sa.String(50), nullable=False),
+        sa.Column("key", sa.String(500), nullable=False),
+        sa.Column("origin", sa.String(32), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_cache_epochs_created_at", "cache_epochs", ["created_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_cache_epochs_created_at", table_name="cache_epochs")
+    op.drop_table("cache_epochs")
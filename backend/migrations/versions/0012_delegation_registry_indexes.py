@@ -0,0 +1,26 @@
+"""Add composite indexes to delegation_registry for child and per-tenant JTI lookups
+
+Revision ID: 0012_delegation_registry_indexes
+Revises: 0011_cache_epochs
+Create Date: 2026-10-19
+
+"""
+
+from alembic import op
+
+revision = "0012_delegation_registry_indexes"
+down_revision = "0011_cache_epochs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_delegation_registry_tenant_parent", "delegation_registry", ["tenant_id", "parent_jti"], unique=False
+    )
+    op.create_index("ix_delegation_registry_tenant_jti", "delegation_registry", ["tenant_id", "jti"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_delegation_registry_tenant_jti", table_name="delegation_registry")
+    op.drop_index("ix_delegation_registry_tenant_parent", table_name="delegation_registry")
@@ -0,0 +1,23 @@
+"""Store delegation JWTs in delegation_registry for compact parent references
+
+Revision ID: 0013_delegation_registry_token
+Revises: 0012_delegation_registry_indexes
+Create Date: 2026-10-19
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0013_delegation_registry_token"
+down_revision = "0012_delegation_registry_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("delegation_registry", sa.Column("token", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("delegation_registry", "token")
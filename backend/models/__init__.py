@@ -9,5 +9,9 @@ from .requirement_intent import RequirementIntent
 from .trust_event import TrustEvent
 from .webhook import Webhook
 from .mandate_spend import MandateSpend
+from .rate_limit_counter import RateLimitCounter
+from .did_document_cache import DIDDocumentCache
+from .cache_epoch import CacheEpoch
+from .delegation_registry import DelegationRegistry
 
-__all__ = ["Base", "Tenant", "Agent", "Key", "Credential", "StatusList", "AuditEvent", "RequirementIntent", "TrustEvent", "Webhook", "MandateSpend"]
+__all__ = ["Base", "Tenant", "Agent", "Key", "Credential", "StatusList", "AuditEvent", "RequirementIntent", "TrustEvent", "Webhook", "MandateSpend", "RateLimitCounter", "DIDDocumentCache", "CacheEpoch", "DelegationRegistry"]
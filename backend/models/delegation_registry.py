@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Index, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class DelegationRegistry(Base):
+    """A registered delegation JWT, linked to its parent for cascade revocation."""
+    __tablename__ = "delegation_registry"
+    __table_args__ = (
+        # Children of a delegation (cascade walks) and per-tenant lookups by JTI
+        Index("ix_delegation_registry_tenant_parent", "tenant_id", "parent_jti"),
+        Index("ix_delegation_registry_tenant_jti", "tenant_id", "jti"),
+    )
+
+    jti: Mapped[str] = mapped_column(String(255), primary_key=True)
+    tenant_id: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
+    issuer_did: Mapped[str] = mapped_column(String(500), nullable=False)
+    subject_did: Mapped[str] = mapped_column(String(500), nullable=False)
+    parent_jti: Mapped[Optional[str]] = mapped_column(String(255), nullable=True, index=True)
+    status_list_id: Mapped[Optional[str]] = mapped_column(String(36), nullable=True)
+    status_list_index: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    revoked_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    # The delegation JWT itself, when registered, so compact children can fetch it by JTI
+    token: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import JSON, DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class DIDDocumentCache(Base):
+    """Persistent (second-tier) cache of fetched did:web documents."""
+    __tablename__ = "did_document_cache"
+
+    did: Mapped[str] = mapped_column(String(500), primary_key=True)
+    document: Mapped[dict] = mapped_column(JSON, nullable=False)
+    etag: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    last_modified: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    fetched_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
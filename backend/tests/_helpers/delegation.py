@@ -0,0 +1,33 @@
+"""Shared data and helpers for the delegation registry and chain verification tests."""
+from __future__ import annotations
+
+import base64
+import json
+import uuid
+
+SCOPE = {
+    "actions": ["negotiate", "purchase"],
+    "max_amount": 10000,
+    "currency": "USD",
+    "merchants": ["*"],
+    "categories": ["electronics"],
+    "constraints": {},
+}
+
+DELEGATION_SCOPES = ["credentials:issue", "credentials:revoke", "credentials:verify"]
+
+
+def delegation_headers(tenant_id: str | None = None) -> dict[str, str]:
+    """Bearer headers for the /v1/delegations endpoints, in a fresh tenant unless one is given."""
+    import core.auth.jwt_auth as jwt_auth
+
+    token = jwt_auth.issue_admin_token(
+        scopes=DELEGATION_SCOPES, tenant_id=tenant_id or f"deleg-{uuid.uuid4().hex[:8]}"
+    )
+    return {"Authorization": f"Bearer {token}"}
+
+
+def jwt_payload(token: str) -> dict:
+    """Decode a JWT payload without verifying it."""
+    part = token.split(".")[1]
+    return json.loads(base64.urlsafe_b64decode(part + "=" * (-len(part) % 4)))
@@ -103,3 +103,17 @@ def authz_headers_issue(authz_headers):
 @pytest.fixture()
 def authz_headers_revoke(authz_headers):
     return authz_headers
+
+@pytest.fixture()
+def delegation_headers():
+    from tests._helpers.delegation import delegation_headers as _headers
+
+    return _headers()
+
+@pytest.fixture()
+def link_cache(client):
+    """core.delegation_link_cache, emptied (import after `client`: the app fixture reloads core)."""
+    import core.delegation_link_cache as link_cache
+
+    link_cache.clear()
+    return link_cache
@@ -137,3 +137,40 @@ def test_audit_cursor_pagination(client):
     ids1 = {e["id"] for e in data1["events"]}
     ids2 = {e["id"] for e in data2["events"]}
     assert ids1.isdisjoint(ids2)
+
+
+def test_write_audit_many_extends_chain_in_order(client):
+    """Batched events continue the chain in order even when the clock is behind its last event."""
+    import uuid
+    from datetime import datetime, timedelta
+
+    from sqlalchemy import select
+
+    from core.audit import (
+        GENESIS_HASH, AuditEvent, _compute_event_hash, db_session, verify_chain, write_audit, write_audit_many,
+    )
+
+    tenant = f"audit-batch-{uuid.uuid4().hex[:8]}"
+    first = write_audit(tenant_id=tenant, event_type="single", actor="t", resource_type="x", resource_id="0", payload={})
+    ahead = datetime.utcnow() + timedelta(hours=1)
+    with db_session() as db:
+        evt = db.get(AuditEvent, first.id)
+        evt.created_at = ahead
+        evt.event_hash = _compute_event_hash(evt, GENESIS_HASH)
+        db.commit()
+
+    events = [
+        {"event_type": "batched", "actor": "t", "resource_type": "x", "resource_id": str(i), "payload": {"i": i}}
+        for i in range(1, 6)
+    ]
+    assert write_audit_many(tenant_id=tenant, events=events) == 5
+
+    with db_session() as db:
+        rows = db.execute(
+            select(AuditEvent.resource_id, AuditEvent.created_at)
+            .where(AuditEvent.tenant_id == tenant)
+            .order_by(AuditEvent.created_at.asc())
+        ).all()
+    assert [r[0] for r in rows] == ["0", "1", "2", "3", "4", "5"]
+    assert [r[1].replace(tzinfo=None) - ahead for r in rows] == [timedelta(microseconds=i) for i in range(6)]
+    assert verify_chain(tenant)["valid"] is True
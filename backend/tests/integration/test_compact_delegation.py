@@ -0,0 +1,93 @@
+"""Tests for compact delegation chains (parentDelegationRef) in /v1/delegations/verify."""
+from __future__ import annotations
+
+import pytest
+
+import core.auth.jwt_auth as jwt_auth
+from tests._helpers.delegation import SCOPE, jwt_payload
+
+
+@pytest.fixture()
+def chain():
+    """root -> a -> b -> c, children referencing parents compactly. Returns (d_root, d_mid, leaf)."""
+    from pramana.delegation import delegate_further, issue_delegation
+    from pramana.identity import AgentIdentity
+
+    root, a, b, c = (AgentIdentity.create(n, method="key") for n in ("root", "a", "b", "c"))
+    d_root = issue_delegation(root, a.did, SCOPE, max_depth=3)
+    d_mid = delegate_further(a, d_root, b.did, SCOPE, compact=True)
+    leaf = delegate_further(b, d_mid, c.did, {**SCOPE, "actions": ["purchase"]}, compact=True)
+    return d_root, d_mid, leaf
+
+
+def _register(client, headers, token: str, parent: str | None = None):
+    p = jwt_payload(token)
+    return client.post("/v1/delegations/register", json={
+        "jti": p["jti"],
+        "issuer_did": p["iss"],
+        "subject_did": p["sub"],
+        "parent_jti": jwt_payload(parent)["jti"] if parent else None,
+        "delegation_jwt": token,
+    }, headers=headers)
+
+
+def test_verify_with_parents_alongside(client, delegation_headers, chain):
+    d_root, d_mid, leaf = chain
+    r = client.post("/v1/delegations/verify", json={
+        "delegation_jwt": leaf,
+        "required_action": "purchase",
+        "parent_delegations": [d_mid, d_root],
+    }, headers=delegation_headers)
+    assert r.status_code == 200
+    body = r.json()
+    assert body["verified"] is True, body["reason"]
+    assert [link["jti"] for link in body["chain"]] == [jwt_payload(t)["jti"] for t in (d_root, d_mid, leaf)]
+
+
+def test_verify_fetches_parents_from_registry(client, delegation_headers, chain):
+    d_root, d_mid, leaf = chain
+    assert client.post("/v1/delegations/verify", json={"delegation_jwt": leaf}, headers=delegation_headers).json()["verified"] is False
+
+    assert _register(client, delegation_headers, d_root).json()["registered"] is True
+    assert _register(client, delegation_headers, d_mid, d_root).json()["registered"] is True
+    body = client.post("/v1/delegations/verify", json={"delegation_jwt": leaf}, headers=delegation_headers).json()
+    assert body["verified"] is True, body["reason"]
+    assert body["depth"] == 3
+
+
+def test_registry_lookup_is_tenant_scoped(client, delegation_headers, chain):
+    d_root, d_mid, leaf = chain
+    _register(client, delegation_headers, d_root)
+    _register(client, delegation_headers, d_mid, d_root)
+    other = jwt_auth.issue_admin_token(scopes=["credentials:verify"], tenant_id="other-tenant")
+    body = client.post("/v1/delegations/verify", json={"delegation_jwt": leaf},
+                       headers={"Authorization": f"Bearer {other}"}).json()
+    assert body["verified"] is False
+    assert "not provided" in body["reason"]
+
+
+def test_fetched_parent_must_match_digest(link_cache, chain):
+    from api.routes.delegations import _verify_delegation_chain_backend as verify
+    from pramana.delegation import issue_delegation
+    from pramana.identity import AgentIdentity
+
+    _, d_mid, leaf = chain
+    x, y = AgentIdentity.create("x", method="key"), AgentIdentity.create("y", method="key")
+    forged = issue_delegation(x, y.did, SCOPE, max_depth=3)
+    mid_jti = jwt_payload(d_mid)["jti"]
+
+    result = verify(leaf, fetch_parent={mid_jti: forged}.get)
+    assert result["verified"] is False
+    assert "does not match its digest" in result["reason"]
+    assert verify(leaf, fetch_parent={mid_jti: d_mid}.get)["verified"] is False  # root still missing
+
+
+def test_register_rejects_mismatched_jwt(client, delegation_headers, chain):
+    d_root, d_mid, _ = chain
+    r = client.post("/v1/delegations/register", json={
+        "jti": jwt_payload(d_root)["jti"],
+        "issuer_did": "did:example:x",
+        "subject_did": "did:example:y",
+        "delegation_jwt": d_mid,
+    }, headers=delegation_headers)
+    assert r.status_code == 400
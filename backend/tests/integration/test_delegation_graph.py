@@ -0,0 +1,94 @@
+"""Tests for the in-memory delegation graph endpoints."""
+from __future__ import annotations
+
+import pytest
+
+
+@pytest.fixture()
+def graph(client):
+    import core.delegation_graph as graph
+
+    graph.forget()
+    return graph
+
+
+def _graph_loads() -> int:
+    from core.demo_metrics import snapshot
+
+    return snapshot()["counters"].get("delegation_graph_load_total", 0)
+
+
+def _register(client, headers, jti, parent=None, subject="did:key:zS"):
+    r = client.post(
+        "/v1/delegations/register",
+        json={"jti": jti, "issuer_did": "did:key:zI", "subject_did": subject, "parent_jti": parent},
+        headers=headers,
+    )
+    assert r.json()["registered"] is True
+
+
+def test_subtree_ancestors_and_stats(client, graph, delegation_headers):
+    #   root ─┬─ a ── a1
+    #         └─ b
+    _register(client, delegation_headers, "root")
+    assert client.get("/v1/delegations/stats", headers=delegation_headers).json()["delegations"] == 1
+    # Registered after the tenant's graph was loaded: applied incrementally
+    _register(client, delegation_headers, "a", "root", subject="did:key:zA")
+    _register(client, delegation_headers, "b", "root", subject="did:key:zB")
+    _register(client, delegation_headers, "a1", "a", subject="did:key:zA1")
+
+    sub = client.get("/v1/delegations/root/subtree", headers=delegation_headers).json()
+    assert sub["count"] == 4
+    assert [(n["jti"], n["depth"]) for n in sub["nodes"]] == [("root", 0), ("a", 1), ("b", 1), ("a1", 2)]
+
+    chain = client.get("/v1/delegations/a1/ancestors", headers=delegation_headers).json()
+    assert chain["depth"] == 2
+    assert [n["jti"] for n in chain["chain"]] == ["root", "a", "a1"]
+
+    stats = client.get("/v1/delegations/stats", headers=delegation_headers).json()
+    assert stats["delegations"] == 4 and stats["roots"] == 1 and stats["max_depth"] == 2
+    assert stats["depth_histogram"] == {"0": 1, "1": 2, "2": 1}
+
+    assert client.get("/v1/delegations/missing/subtree", headers=delegation_headers).status_code == 404
+
+
+def test_revocation_updates_graph_and_impact(client, graph, delegation_headers):
+    for jti, parent in [("r", None), ("c1", "r"), ("c2", "r"), ("g1", "c1")]:
+        _register(client, delegation_headers, jti, parent, subject=f"did:key:z{jti}")
+
+    impact = client.get("/v1/delegations/r/impact", headers=delegation_headers).json()
+    assert impact["descendants"] == 3 and impact["active_affected"] == 4 and impact["max_depth_below"] == 2
+
+    assert client.post("/v1/delegations/revoke", json={"jti": "c1", "cascade": True}, headers=delegation_headers).status_code == 200
+
+    loads = _graph_loads()
+    impact = client.get("/v1/delegations/r/impact", headers=delegation_headers).json()
+    assert impact["active_affected"] == 2
+    assert impact["subjects_affected"] == ["did:key:zc2", "did:key:zr"]
+    active = client.get("/v1/delegations/r/subtree?include_revoked=false", headers=delegation_headers).json()
+    assert [n["jti"] for n in active["nodes"]] == ["r", "c2"]
+    # Served from the incrementally updated graph, not reloaded
+    assert _graph_loads() == loads
+
+
+def test_other_workers_registrations_arrive_over_the_bus(client, graph, delegation_headers):
+    _register(client, delegation_headers, "w-root")
+    tenant = client.get("/v1/delegations/stats", headers=delegation_headers).json()
+    assert tenant["delegations"] == 1
+
+    # Another worker inserts a row and publishes; this worker only sees the event
+    from datetime import datetime, timezone
+
+    from core.db import db_session
+    from models import DelegationRegistry
+
+    tenant_id = graph._tenant_of["w-root"]
+    with db_session() as db:
+        db.add(DelegationRegistry(
+            jti="w-child", tenant_id=tenant_id, issuer_did="did:key:zI", subject_did="did:key:zW",
+            parent_jti="w-root", created_at=datetime.now(timezone.utc),
+        ))
+        db.commit()
+    graph._on_registered("w-child")
+
+    assert client.get("/v1/delegations/w-root/subtree", headers=delegation_headers).json()["count"] == 2
@@ -184,3 +184,93 @@ def test_cascade_revocation_creates_audit_event(client, authz_headers):
     events = audit_r.json()["events"]
     revoke_events = [e for e in events if e["event_type"] == "delegation.revoked"]
     assert len(revoke_events) >= 1
+
+
+def test_delegation_registry_has_composite_indexes(client):
+    """Cascade walks look children up by (tenant_id, parent_jti); JTI lookups are tenant-scoped."""
+    indexes = {ix["name"]: ix["column_names"] for ix in sa.inspect(engine).get_indexes("delegation_registry")}
+    assert indexes["ix_delegation_registry_tenant_parent"] == ["tenant_id", "parent_jti"]
+    assert indexes["ix_delegation_registry_tenant_jti"] == ["tenant_id", "jti"]
+
+
+def _register_chain(client, headers, jtis, **extra_by_jti):
+    parent = None
+    for jti in jtis:
+        body = {"jti": jti, "issuer_did": "did:key:zI", "subject_did": f"did:key:z{jti[-6:]}", "parent_jti": parent}
+        body.update(extra_by_jti.get(jti, {}))
+        assert client.post("/v1/delegations/register", json=body, headers=headers).json()["registered"] is True
+        parent = jti
+
+
+def test_cascade_revocation_is_set_based_and_unbounded_in_depth(client, authz_headers):
+    """A deep chain plus a wide fan-out is revoked with one descendant query and one UPDATE."""
+    import uuid as _uuid
+    suffix = _uuid.uuid4().hex[:8]
+    chain = [f"urn:uuid:deep-{i}-{suffix}" for i in range(20)]
+    _register_chain(client, authz_headers, chain)
+    fan = [f"urn:uuid:fan-{i}-{suffix}" for i in range(30)]
+    for jti in fan:
+        client.post(
+            "/v1/delegations/register",
+            json={"jti": jti, "issuer_did": "did:key:zI", "subject_did": "did:key:zF", "parent_jti": chain[0]},
+            headers=authz_headers,
+        )
+
+    from core.db import engine as bound_engine
+
+    statements = []
+
+    def _count(conn, cursor, statement, *args):
+        if "delegation_registry" in statement:
+            statements.append(statement.split()[0].upper())
+
+    sa.event.listen(bound_engine, "before_cursor_execute", _count)
+    try:
+        r = client.post("/v1/delegations/revoke", json={"jti": chain[0], "cascade": True}, headers=authz_headers)
+    finally:
+        sa.event.remove(bound_engine, "before_cursor_execute", _count)
+
+    assert r.status_code == 200, r.text
+    data = r.json()
+    # Depth 19 was silently cut off by the old depth-15 guard
+    assert set(data["all_revoked"]) == set(chain) | set(fan)
+    assert data["all_revoked"][0] == chain[0]
+    assert data["all_revoked"].index(chain[1]) < data["all_revoked"].index(chain[2])
+    assert statements.count("UPDATE") == 1
+    assert len(statements) == 2
+
+
+def test_cascade_dry_run_reports_blast_radius_without_revoking(client, authz_headers):
+    import uuid as _uuid
+    from core import status_list
+
+    sl = status_list.get_or_create_default_list(tenant_id="default")
+    indices = [status_list.allocate_index(sl.id) for _ in range(3)]
+
+    suffix = _uuid.uuid4().hex[:8]
+    chain = [f"urn:uuid:dry-{i}-{suffix}" for i in range(3)]
+    _register_chain(
+        client, authz_headers, chain,
+        **{jti: {"status_list_id": str(sl.id), "status_list_index": idx} for jti, idx in zip(chain, indices)},
+    )
+
+    r = client.post(
+        "/v1/delegations/revoke", json={"jti": chain[0], "cascade": True, "dry_run": True}, headers=authz_headers
+    )
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert data["dry_run"] is True and data["revoked"] is False
+    assert data["all_revoked"] == chain
+    assert data["impact"]["max_depth"] == 2
+    assert data["impact"]["already_revoked"] == 0
+    assert data["impact"]["status_list_bits"] == {str(sl.id): 3}
+    assert not any(status_list.is_revoked(sl.id, i) for i in indices)
+
+    r = client.post("/v1/delegations/revoke", json={"jti": chain[0], "cascade": True}, headers=authz_headers)
+    assert r.json()["revoked"] is True
+    assert all(status_list.is_revoked(sl.id, i) for i in indices)
+
+    again = client.post(
+        "/v1/delegations/revoke", json={"jti": chain[0], "cascade": True, "dry_run": True}, headers=authz_headers
+    )
+    assert again.json()["impact"]["already_revoked"] == 3
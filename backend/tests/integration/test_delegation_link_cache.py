@@ -0,0 +1,81 @@
+"""Tests for memoised delegation chain verification (core.delegation_link_cache)."""
+from __future__ import annotations
+
+import pytest
+
+from tests._helpers.delegation import SCOPE
+
+
+@pytest.fixture()
+def chain():
+    """root -> a -> b, plus a second leaf under a. Returns (root, mid, leaf1, leaf2)."""
+    from pramana.delegation import delegate_further, issue_delegation
+    from pramana.identity import AgentIdentity
+
+    root, a, b, c = (AgentIdentity.create(n, method="key") for n in ("root", "a", "b", "c"))
+    d_root = issue_delegation(root, a.did, SCOPE, max_depth=3)
+    d_mid = delegate_further(a, d_root, b.did, SCOPE)
+    leaf1 = delegate_further(b, d_mid, c.did, {**SCOPE, "actions": ["purchase"]})
+    leaf2 = delegate_further(b, d_mid, c.did, {**SCOPE, "actions": ["negotiate"]})
+    return d_root, d_mid, leaf1, leaf2
+
+
+def _count_signature_checks(monkeypatch) -> list[str]:
+    import api.routes.delegations as delegations
+
+    calls: list[str] = []
+    real = delegations.verify_vc_jwt
+
+    def counting(**kwargs):
+        calls.append(kwargs["token"].token)
+        return real(**kwargs)
+
+    monkeypatch.setattr(delegations, "verify_vc_jwt", counting)
+    return calls
+
+
+def test_warm_ancestors_cost_one_signature_check(client, link_cache, delegation_headers, chain, monkeypatch):
+    _, _, leaf1, leaf2 = chain
+    calls = _count_signature_checks(monkeypatch)
+
+    r1 = client.post("/v1/delegations/verify", json={"delegation_jwt": leaf1, "required_action": "purchase"}, headers=delegation_headers)
+    assert r1.json()["verified"] is True and r1.json()["depth"] == 3
+    assert len(calls) == 3
+
+    r2 = client.post("/v1/delegations/verify", json={"delegation_jwt": leaf2}, headers=delegation_headers)
+    body = r2.json()
+    assert body["verified"] is True and body["effective_scope"]["actions"] == ["negotiate"]
+    assert len(calls) == 4
+
+    # Same leaf again: the required action is still checked against the cached scope
+    r3 = client.post("/v1/delegations/verify", json={"delegation_jwt": leaf1, "required_action": "negotiate"}, headers=delegation_headers)
+    assert r3.json()["verified"] is False and "not in effective scope" in r3.json()["reason"]
+    assert len(calls) == 4
+
+
+def test_revoking_an_ancestor_invalidates_descendant_links(client, link_cache, delegation_headers, chain, monkeypatch):
+    _, d_mid, leaf1, _ = chain
+    calls = _count_signature_checks(monkeypatch)
+    body = client.post("/v1/delegations/verify", json={"delegation_jwt": leaf1}, headers=delegation_headers).json()
+    mid_jti = body["chain"][1]["jti"]
+
+    client.post(
+        "/v1/delegations/register",
+        json={"jti": mid_jti, "issuer_did": body["chain"][1]["delegator"], "subject_did": body["chain"][1]["delegate"]},
+        headers=delegation_headers,
+    )
+    assert client.post("/v1/delegations/revoke", json={"jti": mid_jti}, headers=delegation_headers).status_code == 200
+
+    calls.clear()
+    client.post("/v1/delegations/verify", json={"delegation_jwt": leaf1}, headers=delegation_headers)
+    # The leaf and the revoked link are re-verified; the root above it is untouched
+    assert calls == [leaf1, d_mid]
+
+
+def test_chain_depth_limit_applies_to_cached_links(client, link_cache, delegation_headers, chain):
+    _, _, leaf1, _ = chain
+    from api.routes.delegations import _verify_delegation_chain_backend as verify
+
+    assert verify(leaf1)["verified"] is True
+    result = verify(leaf1, _max_depth=1)
+    assert result["verified"] is False and "Recursion limit" in result["reason"]
@@ -12,8 +12,10 @@ def clear_cache():
     """Ensure the DID cache is empty before and after each test."""
     import core.resolver as resolver_mod
     resolver_mod.flush_cache()
+    resolver_mod.did_failures.reset()
     yield
     resolver_mod.flush_cache()
+    resolver_mod.did_failures.reset()
 
 
 def _make_did_doc(did: str) -> dict:
@@ -56,9 +58,12 @@ def test_cache_ttl_expiry():
         import core.settings as settings_mod
 
         original_ttl = settings_mod.settings.did_cache_ttl_seconds
+        original_grace = settings_mod.settings.did_cache_stale_grace_seconds
         try:
             # Set a very short TTL so we can expire it without sleeping
+            # (and no stale-while-revalidate window, so expiry means refetch)
             settings_mod.settings.did_cache_ttl_seconds = 0
+            settings_mod.settings.did_cache_stale_grace_seconds = 0
 
             # First resolve — populates cache
             resolver_mod.resolve_did(did)
@@ -67,6 +72,7 @@ def test_cache_ttl_expiry():
             resolver_mod.resolve_did(did)
         finally:
             settings_mod.settings.did_cache_ttl_seconds = original_ttl
+            settings_mod.settings.did_cache_stale_grace_seconds = original_grace
 
     assert mock_get.call_count == 2, "Expired cache entry must trigger a fresh HTTP fetch"
 
@@ -126,3 +132,276 @@ def test_postgres_enforcement():
         for mod in list(sys.modules):
             if mod in ("core.settings", "core") or mod.startswith("core."):
                 del sys.modules[mod]
+
+
+# ── Stale-while-revalidate and single-flight ──────────────────────────────────
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+def test_stale_entry_served_while_one_background_refresh_runs(monkeypatch):
+    import core.resolver as resolver_mod
+
+    did = "did:web:example.com:swr"
+    monkeypatch.setattr(resolver_mod.settings, "did_cache_ttl_seconds", 0)
+    monkeypatch.setattr(resolver_mod.settings, "did_cache_stale_grace_seconds", 60)
+    old_doc, new_doc = _make_did_doc(did), {**_make_did_doc(did), "alsoKnownAs": ["refreshed"]}
+    responses = [MagicMock(json=MagicMock(return_value=old_doc)), MagicMock(json=MagicMock(return_value=new_doc))]
+
+    with patch("core.resolver.httpx.get", side_effect=responses) as mock_get:
+        assert resolver_mod.resolve_did(did) == old_doc
+        # Expired but within the grace window: served stale, refreshed in the background
+        assert resolver_mod.resolve_did(did) == old_doc
+        _wait_for(lambda: resolver_mod._cache_lookup(did)[0] == new_doc)
+
+    assert mock_get.call_count == 2
+
+
+def test_concurrent_misses_share_one_fetch():
+    from concurrent.futures import ThreadPoolExecutor
+
+    import core.resolver as resolver_mod
+
+    did = "did:web:example.com:herd"
+
+    def slow_get(*args, **kwargs):
+        time.sleep(0.2)
+        return _mock_response(did)
+
+    with patch("core.resolver.httpx.get", side_effect=slow_get) as mock_get:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            docs = list(pool.map(resolver_mod.resolve_did, [did] * 8))
+
+    assert all(d == _make_did_doc(did) for d in docs)
+    assert mock_get.call_count == 1
+
+
+def test_stale_document_served_on_fetch_error_until_max_stale(monkeypatch):
+    import httpx
+
+    import core.resolver as resolver_mod
+
+    did = "did:web:example.com:stale-if-error"
+    monkeypatch.setattr(resolver_mod.settings, "did_cache_ttl_seconds", 0)
+    monkeypatch.setattr(resolver_mod.settings, "did_cache_stale_grace_seconds", 0)
+    monkeypatch.setattr(resolver_mod.settings, "did_cache_max_stale_seconds", 60)
+
+    with patch("core.resolver.httpx.get", return_value=_mock_response(did)):
+        doc = resolver_mod.resolve_did(did)
+
+    with patch("core.resolver.httpx.get", side_effect=httpx.ConnectError("down")):
+        assert resolver_mod.resolve_did(did) == doc
+        monkeypatch.setattr(resolver_mod.settings, "did_cache_max_stale_seconds", 0)
+        # The failure is negative-cached, so this fails without another fetch
+        with pytest.raises(resolver_mod.did_failures.DIDResolutionError):
+            resolver_mod.resolve_did(did)
+
+
+# ── Failure handling: negative cache, backoff, circuit breaker ───────────────
+
+def _status_error(code: int):
+    import httpx
+
+    request = httpx.Request("GET", "https://example.com/did.json")
+    resp = MagicMock()
+    resp.raise_for_status.side_effect = httpx.HTTPStatusError(
+        "boom", request=request, response=httpx.Response(code, request=request)
+    )
+    return resp
+
+
+def test_not_found_is_negative_cached():
+    import httpx
+
+    import core.resolver as resolver_mod
+
+    did = "did:web:example.com:missing"
+    with patch("core.resolver.httpx.get", return_value=_status_error(404)) as mock_get:
+        with pytest.raises(httpx.HTTPStatusError):
+            resolver_mod.resolve_did(did)
+        with pytest.raises(resolver_mod.did_failures.DIDResolutionError):
+            resolver_mod.resolve_did(did)
+    assert mock_get.call_count == 1
+    # A 404 says nothing about the host's health
+    assert resolver_mod.did_failures.host_status()["hosts"] == {}
+
+
+def test_host_failures_back_off_exponentially(monkeypatch):
+    import httpx
+
+    from core import did_failures
+
+    monkeypatch.setattr(did_failures.settings, "did_negative_cache_ttl_seconds", 10)
+    monkeypatch.setattr(did_failures.settings, "did_backoff_max_seconds", 30)
+    ttls = []
+    for i in range(4):
+        did = f"did:web:slow.example:{i}"
+        did_failures.record_failure(did, "slow.example", httpx.ReadTimeout("timeout"))
+        ttls.append(round(did_failures._negative[did][1] - time.monotonic()))
+    assert ttls == [10, 20, 30, 30]
+
+
+def test_breaker_opens_fails_fast_and_closes_after_trial(monkeypatch):
+    import httpx
+
+    import core.resolver as resolver_mod
+
+    failures = resolver_mod.did_failures
+    monkeypatch.setattr(failures.settings, "did_breaker_failure_threshold", 3)
+    monkeypatch.setattr(failures.settings, "did_breaker_open_seconds", 60)
+
+    with patch("core.resolver.httpx.get", side_effect=httpx.ConnectTimeout("timeout")) as mock_get:
+        for i in range(3):
+            with pytest.raises(httpx.ConnectTimeout):
+                resolver_mod.resolve_did(f"did:web:down.example:{i}")
+        # Open: a DID on the same host never reaches the network
+        with pytest.raises(failures.HostUnavailableError):
+            resolver_mod.resolve_did("did:web:down.example:other")
+    assert mock_get.call_count == 3
+    assert failures.host_status()["hosts"]["down.example"]["state"] == "open"
+
+    # After the open period one trial goes through; success closes the breaker
+    failures._hosts["down.example"].open_until = time.monotonic() - 1
+    did = "did:web:down.example:recovered"
+    with patch("core.resolver.httpx.get", return_value=_mock_response(did)):
+        assert resolver_mod.resolve_did(did)["id"] == did
+    assert "down.example" not in failures.host_status()["hosts"]
+
+
+def test_unknown_local_did_fails_without_fetch():
+    import uuid
+
+    import core.resolver as resolver_mod
+
+    did = f"did:web:{resolver_mod.settings.pramana_domain}:agents:{uuid.uuid4()}"
+    with patch("core.resolver.httpx.get") as mock_get:
+        with pytest.raises(ValueError, match="DID not found"):
+            resolver_mod.resolve_did(did)
+        with pytest.raises(resolver_mod.did_failures.DIDResolutionError):
+            resolver_mod.resolve_did(did)
+    assert mock_get.call_count == 0
+
+
+# ── Persistent second tier ───────────────────────────────────────────────────
+
+def test_persistent_cache_survives_l1_loss_and_revalidates_with_etag(monkeypatch):
+    import httpx
+
+    import core.resolver as resolver_mod
+
+    did = "did:web:example.com:persistent"
+    url = resolver_mod.did_web_to_url(did)
+    monkeypatch.setattr(resolver_mod.settings, "did_cache_persistent", True)
+    sent_headers = []
+
+    def responder(status):
+        def get(u, timeout=None, headers=None):
+            assert u == url
+            sent_headers.append(dict(headers or {}))
+            body = {"json": _make_did_doc(did)} if status == 200 else {}
+            return httpx.Response(status, headers={"etag": '"v1"'}, request=httpx.Request("GET", u), **body)
+        return get
+
+    with patch("core.resolver.httpx.get", side_effect=responder(200)):
+        doc = resolver_mod.resolve_did(did)
+    resolver_mod.did_store.flush()
+
+    # A restart empties L1; a fresh L2 row is served without any request
+    with resolver_mod._cache_lock:
+        resolver_mod._cache.clear()
+    with patch("core.resolver.httpx.get") as mock_get:
+        assert resolver_mod.resolve_did(did) == doc
+    assert mock_get.call_count == 0
+
+    # Once stale, the refetch is conditional and a 304 reuses the stored document
+    monkeypatch.setattr(resolver_mod.settings, "did_cache_ttl_seconds", 0)
+    monkeypatch.setattr(resolver_mod.settings, "did_cache_stale_grace_seconds", 0)
+    with resolver_mod._cache_lock:
+        resolver_mod._cache.clear()
+    with patch("core.resolver.httpx.get", side_effect=responder(304)):
+        assert resolver_mod.resolve_did(did) == doc
+    assert sent_headers[-1]["if-none-match"] == '"v1"'
+    assert "if-none-match" not in sent_headers[0]
+    resolver_mod.did_store.clear()
+
+
+# ── Async resolution ──────────────────────────────────────────────────────────
+
+def test_async_resolve_fetches_through_shared_client_and_populates_cache(monkeypatch):
+    import asyncio
+
+    import httpx
+
+    import core.resolver as resolver_mod
+
+    did = "did:web:example.com:async"
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(str(request.url))
+        return httpx.Response(200, json=_make_did_doc(did))
+
+    async def run():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(resolver_mod, "get_async_client", lambda: client)
+        try:
+            return await resolver_mod.resolve_did_async(did), await resolver_mod.resolve_did_async(did)
+        finally:
+            await client.aclose()
+
+    doc1, doc2 = asyncio.run(run())
+    assert doc1 == doc2 == _make_did_doc(did)
+    assert requests == [resolver_mod.did_web_to_url(did)]
+    # The sync resolver shares the cache
+    with patch("core.resolver.httpx.get") as mock_get:
+        assert resolver_mod.resolve_did(did) == doc1
+    assert mock_get.call_count == 0
+
+
+def test_shared_async_client_is_reused_until_closed():
+    import asyncio
+
+    from core import http_client
+
+    async def run():
+        first = http_client.get_async_client()
+        assert http_client.get_async_client() is first
+        await http_client.aclose_async_client()
+        assert first.is_closed
+        second = http_client.get_async_client()
+        assert second is not first
+        await http_client.aclose_async_client()
+
+    asyncio.run(run())
+
+
+def test_async_concurrent_misses_share_one_fetch(monkeypatch):
+    import asyncio
+
+    import httpx
+
+    import core.resolver as resolver_mod
+
+    did = "did:web:example.com:async-herd"
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(str(request.url))
+        await asyncio.sleep(0.1)
+        return httpx.Response(200, json=_make_did_doc(did))
+
+    async def run():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(resolver_mod, "get_async_client", lambda: client)
+        try:
+            return await asyncio.gather(*(resolver_mod.resolve_did_async(did) for _ in range(5)))
+        finally:
+            await client.aclose()
+
+    docs = asyncio.run(run())
+    assert docs == [_make_did_doc(did)] * 5
+    assert len(requests) == 1
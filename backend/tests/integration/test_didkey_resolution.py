@@ -91,3 +91,40 @@ def test_didkey_resolver_rejects_invalid_did():
 
     with pytest.raises(ValueError, match="Invalid did:key"):
         _resolve_did_key("did:key:notbase58")
+
+
+def test_didkey_resolution_is_memoised(client, monkeypatch):
+    """Repeat resolutions of a did:key reuse the document without re-decoding."""
+    from pramana.identity import AgentIdentity
+
+    route = next(r for r in client.app.routes if getattr(r, "path", "") == "/v1/credentials/verify")
+    resolver = route.endpoint.__globals__["resolve_did_async"].__globals__
+    builds = []
+    real_build = resolver["_build_did_key_document"]
+    monkeypatch.setitem(resolver, "_build_did_key_document", lambda did: builds.append(did) or real_build(did))
+
+    a = AgentIdentity.create("memo-test", method="key")
+    doc = resolver["resolve_did"](a.did)
+    assert resolver["resolve_did"](a.did) is doc
+    assert builds == [a.did]
+
+    resolver["flush_cache"]()
+    resolver["resolve_did"](a.did)
+    assert builds == [a.did, a.did]
+
+
+def test_b58_decode_matches_reference_encoder():
+    """Table-driven decoder round-trips the SDK encoder, leading zero bytes included."""
+    import os
+
+    import pytest
+    from pramana.identity import _b58_encode
+    from core.resolver import _b58_decode
+
+    for data in [b"", b"\x00", b"\x00\x00\x01", b"\xed\x01" + bytes(32), os.urandom(34), os.urandom(97)]:
+        assert _b58_decode(_b58_encode(data)) == data
+
+    with pytest.raises(ValueError, match="Invalid base58 character: '0'"):
+        _b58_decode("z0x")
+    with pytest.raises(ValueError, match="Invalid base58 character"):
+        _b58_decode("abcé")
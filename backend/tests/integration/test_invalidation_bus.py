@@ -0,0 +1,120 @@
+"""Tests for cross-worker cache invalidation via the cache_epochs table."""
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import core.auth.jwt_auth as jwt_auth
+
+
+@pytest.fixture()
+def bus(client, monkeypatch):
+    route = next(r for r in client.app.routes if getattr(r, "path", "") == "/v1/agents/{agent_id}/keys/rotate")
+    mod = route.endpoint.__globals__["invalidation_bus"]
+    # Drive polling by hand; the background listener would race the assertions
+    mod.stop_invalidation_listener()
+    monkeypatch.setattr(mod, "_last_epoch", None)
+    monkeypatch.setattr(mod, "_floor_epoch", 0)
+    monkeypatch.setattr(mod, "_applied", deque(maxlen=4 * mod._REREAD_WINDOW))
+    mod.poll_once()
+    return mod
+
+
+def _insert_remote(topic: str, key: str, *, origin: str = "other-worker", age_seconds: float = 0.0) -> None:
+    from core.db import db_session
+    from models import CacheEpoch
+
+    with db_session() as db:
+        created_at = datetime.now(timezone.utc) - timedelta(seconds=age_seconds)
+        db.add(CacheEpoch(topic=topic, key=key, origin=origin, created_at=created_at))
+        db.commit()
+
+
+def test_remote_events_applied_once_and_own_events_skipped(bus, monkeypatch):
+    snapshot = bus.observe_ms.__globals__["snapshot"]
+
+    seen: list[str] = []
+    monkeypatch.setitem(bus._subscribers, "test_topic", [seen.append])
+
+    bus.publish("test_topic", "local")
+    assert seen == ["local"]
+
+    _insert_remote("test_topic", "remote", age_seconds=0.25)
+    assert bus.poll_once() == 1
+    assert seen == ["local", "remote"]
+
+    # Re-read window overlaps the rows already applied
+    assert bus.poll_once() == 0
+    assert seen == ["local", "remote"]
+
+    propagation = snapshot()["latency"]["cache_invalidation_propagation_ms"]
+    assert propagation["count"] >= 1 and propagation["max_ms"] >= 250
+
+
+def test_remote_key_rotation_drops_cached_local_did_document(client, bus, monkeypatch):
+    t_user = jwt_auth.issue_admin_token(scopes=["agents:create"], tenant_id="demo")
+    issuer = client.post("/v1/agents", json={"name": "issuer-bus"}, headers={"Authorization": f"Bearer {t_user}"}).json()
+
+    route = next(r for r in client.app.routes if getattr(r, "path", "") == "/v1/credentials/verify")
+    resolver = route.endpoint.__globals__["resolve_did_async"].__globals__
+    loads = []
+    real_load = resolver["_load_local_did"]
+    monkeypatch.setitem(resolver, "_load_local_did", lambda did: loads.append(did) or real_load(did))
+
+    resolver["resolve_did"](issuer["did"])
+    resolver["resolve_did"](issuer["did"])
+    assert len(loads) == 1
+
+    # Another worker rotated this agent's keys
+    _insert_remote(bus.AGENT_KEYS, issuer["did"])
+    assert bus.poll_once() == 1
+
+    resolver["resolve_did"](issuer["did"])
+    assert len(loads) == 2
+
+
+def test_prune_drops_events_past_retention(bus, monkeypatch):
+    monkeypatch.setattr(bus.settings, "cache_invalidation_retention_seconds", 60)
+    _insert_remote("test_topic", "old", age_seconds=120)
+    _insert_remote("test_topic", "new")
+    assert bus.prune() >= 1
+
+    from core.db import db_session
+    from models import CacheEpoch
+
+    with db_session() as db:
+        keys = {k for (k,) in db.query(CacheEpoch.key).filter(CacheEpoch.topic == "test_topic").all()}
+    assert "old" not in keys and "new" in keys
+
+
+@pytest.mark.parametrize("module", ["api.routes.commerce", "api.routes.workflows", "api.routes.requirement_intents", "core.seed"])
+def test_agent_creation_publishes_agent_keys(client, monkeypatch, module):
+    import importlib
+
+    mod = importlib.import_module(module)
+    seen: list[str] = []
+    monkeypatch.setitem(mod.invalidation_bus._subscribers, mod.invalidation_bus.AGENT_KEYS, [seen.append])
+    agent = mod._create_agent(tenant_id="demo", name=f"bus-{module}")[0]
+    assert seen == [agent.did]
+
+
+def test_status_issuer_publishes_only_when_created(client, monkeypatch):
+    from core.status_issuer import ensure_status_issuer, invalidation_bus, status_issuer_did
+
+    ensure_status_issuer()
+    seen: list[str] = []
+    monkeypatch.setitem(invalidation_bus._subscribers, invalidation_bus.AGENT_KEYS, [seen.append])
+    ensure_status_issuer()
+    assert seen == []
+
+    from core.db import db_session
+    from models import Agent, Key
+
+    with db_session() as db:
+        agent = db.query(Agent).filter(Agent.did == status_issuer_did()).one()
+        db.query(Key).filter(Key.agent_id == agent.id).delete()
+        db.commit()
+    ensure_status_issuer()
+    assert seen == [status_issuer_did()]
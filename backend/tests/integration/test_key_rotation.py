@@ -45,3 +45,27 @@ def test_key_rotation_keeps_old_vcs_verifiable(client):
 
     v2 = client.post('/v1/credentials/verify', json={'jwt': issued2['jwt']}).json()
     assert v2['verified'] is True
+
+
+def test_local_did_document_cached_until_key_rotation(client, monkeypatch):
+    t_user = jwt_auth.issue_admin_token(scopes=["agents:create"], tenant_id="demo")
+    t_admin = jwt_auth.issue_admin_token(scopes=["tenant:admin"], tenant_id="demo")
+    issuer = client.post('/v1/agents', json={'name': 'issuer-local-cache'}, headers=_hdr(t_user)).json()
+
+    # The resolver module the app is bound to
+    route = next(r for r in client.app.routes if getattr(r, "path", "") == "/v1/credentials/verify")
+    resolver = route.endpoint.__globals__["resolve_did_async"].__globals__
+    loads = []
+    real_load = resolver["_load_local_did"]
+    monkeypatch.setitem(resolver, "_load_local_did", lambda did: loads.append(did) or real_load(did))
+
+    doc1 = resolver["resolve_did"](issuer['did'])
+    assert resolver["resolve_did"](issuer['did']) is doc1
+    assert len(loads) == 1
+
+    rrot = client.post(f"/v1/agents/{issuer['id']}/keys/rotate", headers=_hdr(t_admin), json={})
+    assert rrot.status_code == 200
+
+    doc2 = resolver["resolve_did"](issuer['did'])
+    assert len(loads) == 2
+    assert rrot.json()['new_kid'] in [vm['id'] for vm in doc2['verificationMethod']]
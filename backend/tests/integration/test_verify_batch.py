@@ -0,0 +1,114 @@
+"""Tests for POST /v1/credentials/verify:batch."""
+from __future__ import annotations
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clear_verify_cache(client):
+    route = next(r for r in client.app.routes if getattr(r, "path", "") == "/v1/credentials/verify:batch")
+    route.endpoint.__globals__["verify_vc_jwt_batch_async"].__globals__["verify_cache"].clear()
+
+
+def _issue_many(client, headers, n: int) -> tuple[dict, list[dict]]:
+    issuer = client.post("/v1/agents", json={"name": "issuer-batch"}, headers=headers).json()
+    issued = [
+        client.post(
+            "/v1/credentials/issue",
+            headers=headers,
+            json={
+                "issuer_agent_id": issuer["id"],
+                "subject_did": f"did:web:example.com:subject:batch-{i}",
+                "credential_type": "AgentCredential",
+            },
+        ).json()
+        for i in range(n)
+    ]
+    return issuer, issued
+
+
+def test_batch_verify_preserves_order_and_reports_per_item(client, authz_headers):
+    _, issued = _issue_many(client, authz_headers, 3)
+    r = client.post(f"/v1/credentials/{issued[1]['credential_id']}/revoke", json={}, headers=authz_headers)
+    assert r.status_code == 200
+
+    jwts = [issued[0]["jwt"], "not.a.jwt", issued[1]["jwt"], issued[2]["jwt"], issued[0]["jwt"]]
+    resp = client.post("/v1/credentials/verify:batch", json={"jwts": jwts})
+    assert resp.status_code == 200
+    body = resp.json()
+
+    assert body["count"] == 5 and body["verified"] == 3
+    results = body["results"]
+    assert [r["index"] for r in results] == [0, 1, 2, 3, 4]
+    assert results[0]["verified"] is True
+    assert results[0]["payload"]["sub"] == "did:web:example.com:subject:batch-0"
+    assert results[1]["verified"] is False and results[1]["reason"]
+    assert results[2]["verified"] is False and results[2]["reason"] == "revoked"
+    assert results[3]["verified"] is True
+    assert results[4] == {**results[0], "index": 4}
+
+
+def test_batch_verify_resolves_each_issuer_and_status_list_once(client, authz_headers, monkeypatch):
+    _, issued = _issue_many(client, authz_headers, 4)
+
+    route = next(r for r in client.app.routes if getattr(r, "path", "") == "/v1/credentials/verify:batch")
+    route_globals = route.endpoint.__globals__
+    resolves, fetches = [], []
+    real_resolve, real_fetch = route_globals["resolve_did_async"], route_globals["fetch_status_list_bits_async"]
+
+    async def counting_resolve(did):
+        resolves.append(did)
+        return await real_resolve(did)
+
+    async def counting_fetch(url):
+        fetches.append(url)
+        return await real_fetch(url)
+
+    monkeypatch.setitem(route_globals, "resolve_did_async", counting_resolve)
+    monkeypatch.setitem(route_globals, "fetch_status_list_bits_async", counting_fetch)
+
+    resp = client.post("/v1/credentials/verify:batch", json={"jwts": [c["jwt"] for c in issued]})
+    assert resp.json()["verified"] == 4
+    assert len(resolves) == 1
+    assert len(fetches) == 1
+
+
+def test_batch_verify_checks_signatures_in_parallel(client, authz_headers, monkeypatch):
+    import asyncio
+    import threading
+
+    import core.vc as vc
+
+    _, issued = _issue_many(client, authz_headers, 4)
+    # Every check blocks until all four are in flight; run one at a time, the barrier times out
+    barrier = threading.Barrier(4, timeout=5)
+
+    def blocking_verify(*, token, resolve_did_document, status_check):
+        barrier.wait()
+        return {"payload": token.payload, "status": {"present": False}}
+
+    async def no_lookup(_):
+        return None
+
+    monkeypatch.setattr(vc, "verify_vc_jwt", blocking_verify)
+    outcomes = asyncio.run(vc.verify_vc_jwt_batch_async(
+        [c["jwt"] for c in issued], resolve_did_document=no_lookup, fetch_status_bits=no_lookup, max_concurrency=4,
+    ))
+    assert [o["ok"] for o in outcomes] == [True] * 4, outcomes
+    vc.verify_cache.clear()
+
+
+def test_batch_verify_writes_valid_audit_chain(client, authz_headers):
+    from core.audit import verify_chain
+
+    _, issued = _issue_many(client, authz_headers, 3)
+    resp = client.post("/v1/credentials/verify:batch", json={"jwts": [c["jwt"] for c in issued]})
+    assert resp.status_code == 200
+    assert verify_chain("public")["valid"] is True
+
+
+def test_batch_verify_rejects_oversized_batch(client, monkeypatch):
+    route = next(r for r in client.app.routes if getattr(r, "path", "") == "/v1/credentials/verify:batch")
+    monkeypatch.setattr(route.endpoint.__globals__["settings"], "verify_batch_max_items", 2)
+    resp = client.post("/v1/credentials/verify:batch", json={"jwts": ["a.b.c"] * 3})
+    assert resp.status_code == 413
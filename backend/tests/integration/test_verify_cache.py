@@ -0,0 +1,113 @@
+"""Tests for the verification result cache (core.verify_cache)."""
+from __future__ import annotations
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import core.auth.jwt_auth as jwt_auth
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from core import verify_cache
+
+    verify_cache.clear()
+    yield
+    verify_cache.clear()
+
+
+@pytest.fixture()
+def count_verifications(client, monkeypatch):
+    # Patch the core.vc namespace the app's verify route was bound to (other
+    # tests may have re-imported core.* since the app was built).
+    route = next(r for r in client.app.routes if getattr(r, "path", "") == "/v1/credentials/verify")
+    vc_globals = route.endpoint.__globals__["verify_vc_jwt_cached_async"].__globals__
+    vc_globals["verify_cache"].clear()
+
+    calls = []
+    real = vc_globals["verify_vc_jwt_async"]
+
+    async def counting(**kwargs):
+        calls.append(1)
+        return await real(**kwargs)
+
+    monkeypatch.setitem(vc_globals, "verify_vc_jwt_async", counting)
+    return calls
+
+
+def _issue(client, headers):
+    issuer = client.post("/v1/agents", json={"name": "issuer-vcache"}, headers=headers).json()
+    issued = client.post(
+        "/v1/credentials/issue",
+        headers=headers,
+        json={
+            "issuer_agent_id": issuer["id"],
+            "subject_did": "did:web:example.com:subject:vcache",
+            "credential_type": "AgentCredential",
+        },
+    ).json()
+    return issuer, issued
+
+
+def test_repeat_verification_served_from_cache(client, authz_headers, count_verifications):
+    _, issued = _issue(client, authz_headers)
+
+    for _ in range(3):
+        r = client.post("/v1/credentials/verify", json={"jwt": issued["jwt"]})
+        assert r.status_code == 200 and r.json()["verified"] is True
+    assert len(count_verifications) == 1
+
+
+def test_revocation_invalidates_cached_result(client, authz_headers, count_verifications):
+    _, issued = _issue(client, authz_headers)
+    assert client.post("/v1/credentials/verify", json={"jwt": issued["jwt"]}).json()["verified"] is True
+
+    r = client.post(f"/v1/credentials/{issued['credential_id']}/revoke", json={}, headers=authz_headers)
+    assert r.status_code == 200
+
+    v = client.post("/v1/credentials/verify", json={"jwt": issued["jwt"]}).json()
+    assert v["verified"] is False and v["reason"] == "revoked"
+    assert len(count_verifications) == 2
+
+
+def test_issuer_key_rotation_invalidates_cached_result(client, count_verifications):
+    t_user = jwt_auth.issue_admin_token(scopes=["agents:create", "credentials:issue"], tenant_id="vcache")
+    t_admin = jwt_auth.issue_admin_token(scopes=["tenant:admin"], tenant_id="vcache")
+    issuer, issued = _issue(client, {"Authorization": f"Bearer {t_user}"})
+
+    client.post("/v1/credentials/verify", json={"jwt": issued["jwt"]})
+    client.post("/v1/credentials/verify", json={"jwt": issued["jwt"]})
+    assert len(count_verifications) == 1
+
+    r = client.post(f"/v1/agents/{issuer['id']}/keys/rotate", headers={"Authorization": f"Bearer {t_admin}"}, json={})
+    assert r.status_code == 200
+    client.post("/v1/credentials/verify", json={"jwt": issued["jwt"]})
+    assert len(count_verifications) == 2
+
+
+def test_cache_entry_bounded_by_token_exp(monkeypatch):
+    from core import verify_cache
+    from core.settings import settings
+
+    monkeypatch.setattr(settings, "vc_verify_cache_ttl_seconds", 3600)
+    now = time.time()
+    result = {"payload": {"iss": "did:example:a", "exp": now + 1}, "status": {"present": False}}
+    versions = verify_cache.current_versions(None, "did:example:a")
+    verify_cache.put("tok", result, status_key=None, issuer="did:example:a", versions=versions)
+    assert verify_cache.get("tok") is not None
+
+    monkeypatch.setattr(verify_cache, "time", SimpleNamespace(time=lambda: now + 2))
+    assert verify_cache.get("tok") is None
+
+
+def test_revocation_during_verification_is_not_cached_as_valid():
+    from core import verify_cache
+
+    versions = verify_cache.current_versions("list-1", "did:example:a")
+    # A revocation lands while the (slow) verification is still running
+    verify_cache.invalidate_status_list("list-1")
+    result = {"payload": {"iss": "did:example:a"}, "status": {"present": True, "revoked": False}}
+    verify_cache.put("tok", result, status_key="list-1", issuer="did:example:a", versions=versions)
+    assert verify_cache.get("tok") is None
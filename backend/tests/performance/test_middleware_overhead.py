@@ -0,0 +1,122 @@
+"""Microbenchmark: per-request middleware overhead, BaseHTTPMiddleware vs pure ASGI.
+
+Drives tiny apps directly through the ASGI interface (no HTTP client, no
+sockets) so the numbers isolate middleware cost. Run with ``-s`` to see them:
+
+    pytest -m slow -s tests/performance/test_middleware_overhead.py
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from api.middleware.rate_limit import GCRALimiter, RateLimitMiddleware
+from api.middleware.request_context import ErrorEnvelopeMiddleware, RequestIdMiddleware
+
+N_REQUESTS = 2000
+
+
+def _bare_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    return app
+
+
+def _legacy_app() -> FastAPI:
+    """The previous stack: @app.middleware request-id/error envelope + BaseHTTPMiddleware limiter."""
+    app = _bare_app()
+
+    class _LegacyRateLimit(BaseHTTPMiddleware):
+        async def dispatch(self, request: Request, call_next):
+            if request.method in {"POST", "PUT", "PATCH", "DELETE"} and request.url.path.startswith("/v1/"):
+                pass
+            return await call_next(request)
+
+    @app.middleware("http")
+    async def _request_id_middleware(request: Request, call_next):
+        rid = request.headers.get("x-request-id") or uuid.uuid4().hex[:12]
+        request.state.request_id = rid
+        try:
+            response = await call_next(request)
+        except Exception:
+            return JSONResponse(status_code=500, content={"error": "internal_error", "request_id": rid})
+        response.headers["x-request-id"] = rid
+        return response
+
+    app.add_middleware(_LegacyRateLimit)
+    return app
+
+
+def _asgi_app() -> FastAPI:
+    app = _bare_app()
+    app.add_middleware(ErrorEnvelopeMiddleware)
+    app.add_middleware(RateLimitMiddleware, max_requests=1000, limiter=GCRALimiter())
+    app.add_middleware(RequestIdMiddleware)
+    return app
+
+
+async def _drive(app, n: int) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/health",
+        "raw_path": b"/health",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+
+    async def send(message):
+        pass
+
+    async def one_request():
+        sent_body = False
+
+        async def receive():
+            # Like a real server: the (empty) body once, then wait for disconnect.
+            nonlocal sent_body
+            if not sent_body:
+                sent_body = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await asyncio.Event().wait()
+
+        await app(dict(scope), receive, send)
+
+    # Warm up routing/caches before timing
+    for _ in range(50):
+        await one_request()
+
+    start = time.perf_counter()
+    for _ in range(n):
+        await one_request()
+    return (time.perf_counter() - start) / n * 1e6
+
+
+@pytest.mark.slow
+def test_pure_asgi_middleware_overhead():
+    bare = asyncio.run(_drive(_bare_app(), N_REQUESTS))
+    legacy = asyncio.run(_drive(_legacy_app(), N_REQUESTS))
+    asgi = asyncio.run(_drive(_asgi_app(), N_REQUESTS))
+
+    print(
+        f"\n/health per-request cost: bare={bare:.1f}us "
+        f"legacy={legacy:.1f}us (+{legacy - bare:.1f}us) "
+        f"asgi={asgi:.1f}us (+{asgi - bare:.1f}us)"
+    )
+    # Pure ASGI middleware should add well under the BaseHTTPMiddleware overhead.
+    assert asgi - bare < legacy - bare
@@ -1,3 +1,5 @@
+import time
+
 import pytest
 
 
@@ -18,3 +20,61 @@ def test_revoke_requires_token(client):
 def test_verify_remains_public(client):
     r = client.post('/v1/credentials/verify', json={'jwt': 'not.a.jwt'})
     assert r.status_code in (400, 422)
+
+
+@pytest.mark.security
+def test_verified_token_is_cached_until_invalidated(monkeypatch):
+    from core.auth import verify as verify_mod
+    from core.auth.jwt_auth import issue_admin_token
+
+    calls = []
+    real_verify = verify_mod.verify_access_token
+
+    def counting_verify(token):
+        calls.append(token)
+        return real_verify(token)
+
+    monkeypatch.setattr(verify_mod, "verify_access_token", counting_verify)
+    verify_mod.invalidate_token_cache()
+
+    token = issue_admin_token(scopes=["agents:read"], tenant_id="acme")
+    for _ in range(5):
+        ctx = verify_mod.authenticate(token)
+        assert ctx["tenant_id"] == "acme" and "agents:read" in ctx["scopes"]
+    assert len(calls) == 1
+
+    verify_mod.invalidate_token_cache(token)
+    verify_mod.authenticate(token)
+    assert len(calls) == 2
+
+    # Failures are never cached, and a config change invalidates cached verdicts.
+    with pytest.raises(Exception):
+        verify_mod.authenticate("not.a.jwt")
+    monkeypatch.setattr(verify_mod.settings, "auth_jwt_secret", "rotated-secret")
+    with pytest.raises(Exception):
+        verify_mod.authenticate(token)
+    verify_mod.invalidate_token_cache()
+
+
+@pytest.mark.security
+def test_expired_token_not_served_from_cache(monkeypatch):
+    from types import SimpleNamespace
+
+    from core.auth import verify as verify_mod
+    from core.auth.jwt_auth import issue_admin_token
+
+    calls = []
+    real_verify = verify_mod.verify_access_token
+    monkeypatch.setattr(verify_mod, "verify_access_token", lambda t: calls.append(t) or real_verify(t))
+    verify_mod.invalidate_token_cache()
+
+    token = issue_admin_token(scopes=["agents:read"], ttl_seconds=60)
+    verify_mod.authenticate(token)
+    verify_mod.authenticate(token)
+    assert len(calls) == 1
+
+    # Past the token's exp the cached entry is dropped and the token re-verified.
+    monkeypatch.setattr(verify_mod, "time", SimpleNamespace(time=lambda: time.time() + 120))
+    verify_mod.authenticate(token)
+    assert len(calls) == 2
+    verify_mod.invalidate_token_cache()
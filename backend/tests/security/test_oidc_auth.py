@@ -104,3 +104,63 @@ def test_oidc_mode_enforces_token_and_scopes(tmp_path):
         sys.modules.clear()
         sys.modules.update(orig_modules)
         sys.path[:] = orig_sys_path
+
+
+def _counting_jwks_fetch(jwks_ref: dict, calls: list, delay: float = 0.0):
+    def fetch():
+        calls.append(time.monotonic())
+        if delay:
+            time.sleep(delay)
+        if isinstance(jwks_ref["value"], Exception):
+            raise jwks_ref["value"]
+        return jwks_ref["value"]
+
+    return fetch
+
+
+def test_jwks_manager_coalesces_unknown_kid_fetches():
+    import threading
+
+    from core.auth.jwks import JWKSManager
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    ref = {"value": {"keys": [_jwk_from_public_key(key.public_key(), kid="k1")]}}
+    calls: list = []
+    mgr = JWKSManager(_counting_jwks_fetch(ref, calls, delay=0.2), refresh_interval_seconds=0, min_fetch_interval_seconds=30)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(mgr.get_key("k1"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert len(results) == 8 and all(r.public_numbers() == key.public_key().public_numbers() for r in results)
+
+    # Unknown kids within the min fetch interval do not trigger more fetches
+    for _ in range(5):
+        try:
+            mgr.get_key("bogus")
+        except ValueError:
+            pass
+    assert len(calls) == 1
+
+
+def test_jwks_manager_serves_stale_keys_when_idp_unreachable():
+    from core.auth.jwks import JWKSManager
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    ref = {"value": {"keys": [_jwk_from_public_key(key.public_key(), kid="k1")]}}
+    calls: list = []
+    mgr = JWKSManager(_counting_jwks_fetch(ref, calls), refresh_interval_seconds=0, min_fetch_interval_seconds=0)
+    mgr.refresh()
+
+    ref["value"] = ConnectionError("idp down")
+    mgr.refresh()
+    assert mgr.last_error and "idp down" in mgr.last_error
+    assert mgr.get_key("k1") is not None
+
+    # Rotation: a new kid is picked up by the on-demand fetch
+    new_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    ref["value"] = {"keys": [_jwk_from_public_key(new_key.public_key(), kid="k2")]}
+    assert mgr.get_key("k2").public_numbers() == new_key.public_key().public_numbers()
@@ -11,3 +11,161 @@ def test_rate_limit_returns_429_when_enabled(client, authz_headers, monkeypatch)
     # Can't reload app easily here; this is a placeholder ensuring config exists.
     # Real validation is done in manual/e2e testing.
     assert True
+
+
+def _limited_app(**kwargs):
+    from fastapi import FastAPI
+    from api.middleware.rate_limit import RateLimitMiddleware
+
+    app = FastAPI()
+
+    @app.post("/v1/credentials/verify")
+    def _verify():
+        return {"ok": True}
+
+    @app.post("/v1/commerce/mandates/verify")
+    def _mandate():
+        return {"ok": True}
+
+    app.add_middleware(RateLimitMiddleware, **kwargs)
+    return app
+
+
+@pytest.mark.security
+def test_rate_limit_keys_by_tenant_not_ip():
+    from fastapi.testclient import TestClient
+    import core.auth.jwt_auth as jwt_auth
+
+    c = TestClient(_limited_app(max_requests=2, window_seconds=60))
+    tok_a = jwt_auth.issue_admin_token(scopes=[], tenant_id="rl-tenant-a")
+    tok_b = jwt_auth.issue_admin_token(scopes=[], tenant_id="rl-tenant-b")
+
+    for _ in range(2):
+        assert c.post("/v1/credentials/verify", headers={"Authorization": f"Bearer {tok_a}"}).status_code == 200
+    r = c.post("/v1/credentials/verify", headers={"Authorization": f"Bearer {tok_a}"})
+    assert r.status_code == 429
+    assert int(r.headers["Retry-After"]) >= 1
+    assert r.headers["RateLimit-Remaining"] == "0"
+
+    # Same client IP, different tenant: separate bucket
+    r = c.post("/v1/credentials/verify", headers={"Authorization": f"Bearer {tok_b}"})
+    assert r.status_code == 200
+    assert r.headers["RateLimit-Limit"] == "2"
+    assert r.headers["RateLimit-Remaining"] == "1"
+
+
+@pytest.mark.security
+def test_rate_limit_invalid_tokens_share_the_client_bucket():
+    from fastapi.testclient import TestClient
+    import core.auth.jwt_auth as jwt_auth
+
+    c = TestClient(_limited_app(max_requests=2, window_seconds=60))
+    codes = [
+        c.post("/v1/credentials/verify", headers={"Authorization": f"Bearer garbage-{i}"}).status_code
+        for i in range(3)
+    ]
+    assert codes == [200, 200, 429]
+    # Anonymous requests from the same address land in the same bucket
+    assert c.post("/v1/credentials/verify").status_code == 429
+    # A real tenant is unaffected
+    tok = jwt_auth.issue_admin_token(scopes=[], tenant_id="rl-tenant-c")
+    assert c.post("/v1/credentials/verify", headers={"Authorization": f"Bearer {tok}"}).status_code == 200
+
+
+@pytest.mark.security
+def test_rate_limit_route_group_and_tenant_quotas():
+    from fastapi.testclient import TestClient
+    import core.auth.jwt_auth as jwt_auth
+
+    c = TestClient(_limited_app(
+        max_requests=100,
+        window_seconds=60,
+        quotas="/v1/commerce=1,rl-vip@/v1/commerce=3",
+    ))
+    tok = jwt_auth.issue_admin_token(scopes=[], tenant_id="rl-regular")
+    vip = jwt_auth.issue_admin_token(scopes=[], tenant_id="rl-vip")
+
+    h = {"Authorization": f"Bearer {tok}"}
+    assert c.post("/v1/commerce/mandates/verify", headers=h).status_code == 200
+    assert c.post("/v1/commerce/mandates/verify", headers=h).status_code == 429
+    # Other route groups keep their own bucket and default quota
+    r = c.post("/v1/credentials/verify", headers=h)
+    assert r.status_code == 200
+    assert r.headers["RateLimit-Limit"] == "100"
+
+    hv = {"Authorization": f"Bearer {vip}"}
+    codes = [c.post("/v1/commerce/mandates/verify", headers=hv).status_code for _ in range(4)]
+    assert codes == [200, 200, 200, 429]
+
+
+@pytest.mark.security
+def test_gcra_limiter_refills_and_evicts_idle_keys():
+    from api.middleware.rate_limit import GCRALimiter
+
+    lim = GCRALimiter(max_keys=1000)
+    assert [lim.acquire("k", 2, 60, now=0.0)[0] for _ in range(3)] == [True, True, False]
+    allowed, _, _, retry_after = lim.acquire("k", 2, 60, now=0.0)
+    assert not allowed and retry_after == pytest.approx(30.0)
+    assert lim.acquire("k", 2, 60, now=30.0)[0] is True
+
+    for i in range(50):
+        lim.acquire(f"idle-{i}", 10, 60, now=100.0)
+    # Once their buckets have refilled, idle keys are dropped on the next update
+    lim.acquire("fresh", 10, 60, now=1000.0)
+    assert len(lim) == 1
+
+    capped = GCRALimiter(max_keys=10)
+    for i in range(100):
+        capped.acquire(f"k-{i}", 10, 60, now=0.0)
+    assert len(capped) == 10
+
+
+@pytest.mark.security
+@pytest.mark.parametrize("kind", ["redis", "sql"])
+def test_shared_limiter_enforces_quota_across_workers(kind, tmp_path):
+    """Two limiter instances (one per worker) share one quota through the backend."""
+    from core.rate_limit_store import SharedWindowLimiter, build_counter_backend
+
+    import time
+
+    url = "local://" if kind == "redis" else f"sqlite:///{tmp_path}/rl.db"
+    backend = build_counter_backend(kind, url)
+    w1 = SharedWindowLimiter(backend, autostart=False)
+    w2 = SharedWindowLimiter(backend, autostart=False)
+    now = (int(time.time()) // 60 + 10) * 60 + 20.0  # 20s into a future 60s window
+
+    assert [w1.acquire("tenant:a|*", 4, 60, now=now)[0] for _ in range(3)] == [True, True, True]
+    w1.sync(now=now)
+    # w2 has not synced this key yet, so it admits on local counts alone ...
+    assert w2.acquire("tenant:a|*", 4, 60, now=now)[0] is True
+    w2.sync(now=now)
+    # ... and after one sync both workers see the shared total of 4.
+    assert w2.acquire("tenant:a|*", 4, 60, now=now)[0] is False
+    w1.sync(now=now)
+    allowed, remaining, reset_after, retry_after = w1.acquire("tenant:a|*", 4, 60, now=now)
+    assert not allowed
+    assert remaining == 0
+    # The window resets 40s after `now`, and that is also when a retry can succeed
+    assert reset_after == pytest.approx(40.0)
+    assert retry_after == pytest.approx(40.0)
+
+    # Next window starts from zero and old windows are dropped locally
+    later = now + 60
+    assert w1.acquire("tenant:a|*", 4, 60, now=later)[0] is True
+    w1.sync(now=later)
+    assert len(w1) == 1
+
+
+@pytest.mark.security
+def test_shared_limiter_keeps_local_counts_when_backend_fails():
+    from core.rate_limit_store import SharedWindowLimiter
+
+    class Broken:
+        def incr_many(self, items):
+            raise ConnectionError("backend down")
+
+    lim = SharedWindowLimiter(Broken(), autostart=False)
+    now = 1_000_020.0
+    assert [lim.acquire("k", 2, 60, now=now)[0] for _ in range(2)] == [True, True]
+    lim.sync(now=now)
+    assert lim.acquire("k", 2, 60, now=now)[0] is False
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from core.bloom import BloomFilter, RotatingBloomFilter
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bf = BloomFilter(capacity=1000, error_rate=0.01)
+    items = [f"urn:uuid:item-{i}" for i in range(1000)]
+    for item in items:
+        bf.add(item)
+    assert all(item in bf for item in items)
+
+
+def test_bloom_filter_false_positive_rate_is_bounded():
+    bf = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bf.add(f"in-{i}")
+    false_positives = sum(1 for i in range(10000) if f"out-{i}" in bf)
+    assert false_positives < 300  # ~1% expected; generous bound
+
+
+def test_rotating_bloom_keeps_items_for_horizon_then_drops_them():
+    rbf = RotatingBloomFilter(horizon_seconds=100, partitions=4, capacity_per_partition=100)
+    rbf.add("a", now=0)
+    rbf.add("b", now=60)
+
+    assert rbf.might_contain("a", now=99)
+    assert rbf.might_contain("b", now=159)
+    # "a" lives in the partition started at 0, which is dropped once the next
+    # partition (started at 60) is older than the horizon.
+    assert not rbf.might_contain("a", now=161)
+    assert rbf.might_contain("b", now=159)
+    assert len(rbf._filters) <= rbf.partitions + 1
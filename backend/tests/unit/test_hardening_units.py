@@ -75,3 +75,315 @@ def test_jti_dedup_empty_jti_ignored():
     clear_dedup_store()
     assert check_and_record_jti("", endpoint="test") is None
     assert check_and_record_jti("", endpoint="test") is None  # still None
+
+
+def test_jti_dedup_eviction_only_pops_expired_entries():
+    """Expiry walks the heap; live entries are left untouched."""
+    import time
+    from core import jti_dedup
+
+    jti_dedup.clear_dedup_store()
+    now = int(time.time())
+    jti_dedup.check_and_record_jti("urn:uuid:heap-live", endpoint="test", exp=now + 600)
+    jti_dedup.check_and_record_jti("urn:uuid:heap-dead", endpoint="test", exp=now - 5)
+
+    assert jti_dedup.check_and_record_jti("urn:uuid:heap-other", endpoint="test") is None
+    assert "urn:uuid:heap-dead" not in jti_dedup._store
+    assert "urn:uuid:heap-live" in jti_dedup._store
+    assert len(jti_dedup._expiry_heap) == jti_dedup.dedup_store_size()
+
+
+def test_jti_dedup_cap_evicts_soonest_expiring(monkeypatch):
+    """With the evict policy, a full store drops the entry closest to expiry."""
+    import time
+    from core import jti_dedup
+    from core.settings import settings
+
+    monkeypatch.setattr(settings, "jti_dedup_max_entries", 2)
+    monkeypatch.setattr(settings, "jti_dedup_overflow_policy", "evict")
+    jti_dedup.clear_dedup_store()
+    now = int(time.time())
+    jti_dedup.check_and_record_jti("urn:uuid:cap-soon", endpoint="test", exp=now + 60)
+    jti_dedup.check_and_record_jti("urn:uuid:cap-late", endpoint="test", exp=now + 600)
+
+    assert jti_dedup.check_and_record_jti("urn:uuid:cap-new", endpoint="test", exp=now + 300) is None
+    assert jti_dedup.dedup_store_size() == 2
+    assert "urn:uuid:cap-soon" not in jti_dedup._store
+    assert jti_dedup.check_and_record_jti("urn:uuid:cap-late", endpoint="test") is not None
+    jti_dedup.clear_dedup_store()
+
+
+def test_jti_dedup_cap_reject_policy(monkeypatch):
+    """With the reject policy, a full store refuses new JTIs."""
+    from core import jti_dedup
+    from core.settings import settings
+
+    monkeypatch.setattr(settings, "jti_dedup_max_entries", 1)
+    monkeypatch.setattr(settings, "jti_dedup_overflow_policy", "reject")
+    jti_dedup.clear_dedup_store()
+    assert jti_dedup.check_and_record_jti("urn:uuid:rej-1", endpoint="test") is None
+
+    result = jti_dedup.check_and_record_jti("urn:uuid:rej-2", endpoint="test")
+    assert result is not None
+    assert "capacity" in result
+    assert jti_dedup.dedup_store_size() == 1
+    jti_dedup.clear_dedup_store()
+
+
+def test_jti_dedup_db_lookup_runs_outside_lock(monkeypatch):
+    """DB lookups for different JTIs overlap; the same JTI is accepted once."""
+    import threading
+    import time
+    from core import jti_dedup
+    from core.settings import settings
+
+    jti_dedup.clear_dedup_store()
+    monkeypatch.setattr(settings, "jti_persist_write_behind", True)
+
+    def slow_db_seen(jti):
+        time.sleep(0.2)
+        return False
+
+    monkeypatch.setattr(jti_dedup, "_db_seen_jti", slow_db_seen)
+    # exp beyond the Bloom horizon forces the DB lookup path
+    far_exp = int(time.time()) + 10 * 24 * 3600
+
+    results: dict[str, object] = {}
+
+    def check(name: str, jti: str) -> None:
+        results[name] = jti_dedup.check_and_record_jti(jti, endpoint="test", exp=far_exp)
+
+    threads = [threading.Thread(target=check, args=(f"t{i}", f"urn:uuid:conc-{i}")) for i in range(8)]
+    threads += [threading.Thread(target=check, args=(f"dup{i}", "urn:uuid:conc-dup")) for i in range(4)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    # Serialised DB lookups would take >= 9 * 0.2s.
+    assert elapsed < 1.0
+    assert all(results[f"t{i}"] is None for i in range(8))
+    dup_results = [results[f"dup{i}"] for i in range(4)]
+    assert dup_results.count(None) == 1
+    jti_dedup.clear_dedup_store()
+
+
+def _ensure_seen_jtis_table():
+    """Create the seen_jtis table if it doesn't exist (migration-only table)."""
+    import sqlalchemy as sa
+    from core.db import engine
+
+    meta = sa.MetaData()
+    meta.reflect(bind=engine)
+    if "seen_jtis" not in meta.tables:
+        sa.Table(
+            "seen_jtis", meta,
+            sa.Column("jti", sa.String(255), primary_key=True),
+            sa.Column("endpoint", sa.String(100), nullable=False),
+            sa.Column("first_seen_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False, index=True),
+        ).create(bind=engine)
+
+
+def test_jti_dedup_fresh_jti_skips_db_and_is_batched(monkeypatch):
+    """With write-behind, definitely-new JTIs skip the DB lookup and are persisted in one batch."""
+    from sqlalchemy import text
+    from core import jti_dedup
+    from core.db import db_session
+    from core.settings import settings
+
+    _ensure_seen_jtis_table()
+    jti_dedup.clear_dedup_store()
+    monkeypatch.setattr(settings, "jti_persist_write_behind", True)
+
+    def fail_lookup(jti):
+        raise AssertionError("fresh JTI should not hit the DB")
+
+    monkeypatch.setattr(jti_dedup, "_db_seen_jti", fail_lookup)
+    jtis = [f"urn:uuid:batch-{i}" for i in range(5)]
+    for jti in jtis:
+        assert jti_dedup.check_and_record_jti(jti, endpoint="test") is None
+
+    assert jti_dedup.flush_pending_jtis() == 5
+    with db_session() as db:
+        rows = db.execute(
+            text("SELECT COUNT(*) FROM seen_jtis WHERE jti LIKE 'urn:uuid:batch-%'")
+        ).scalar()
+    assert rows == 5
+    # Re-flushing the same rows is a no-op thanks to ON CONFLICT DO NOTHING
+    for jti in jtis:
+        jti_dedup._pending[jti] = ("test", 0.0, 4102444800.0)
+    jti_dedup.flush_pending_jtis()
+    jti_dedup.clear_dedup_store()
+
+
+def test_jti_dedup_evicted_jti_caught_via_db(monkeypatch):
+    """A JTI evicted from memory is still rejected through the seen_jtis lookup."""
+    from core import jti_dedup
+    from core.settings import settings
+
+    _ensure_seen_jtis_table()
+    jti_dedup.clear_dedup_store()
+    monkeypatch.setattr(settings, "jti_dedup_max_entries", 1)
+    monkeypatch.setattr(settings, "jti_dedup_overflow_policy", "evict")
+
+    assert jti_dedup.check_and_record_jti("urn:uuid:evicted-a", endpoint="test") is None
+    assert jti_dedup.check_and_record_jti("urn:uuid:evicted-b", endpoint="test") is None
+    jti_dedup.flush_pending_jtis()
+
+    result = jti_dedup.check_and_record_jti("urn:uuid:evicted-a", endpoint="test")
+    assert result is not None
+    assert "previously recorded" in result
+    jti_dedup.clear_dedup_store()
+
+
+def test_jti_dedup_replay_recorded_by_another_worker_rejected():
+    """A JTI another worker recorded in seen_jtis is rejected on first sight here."""
+    from datetime import datetime, timedelta, timezone
+    from sqlalchemy import text
+    from core import jti_dedup
+    from core.db import db_session
+
+    _ensure_seen_jtis_table()
+    jti_dedup.clear_dedup_store()
+    now = datetime.now(timezone.utc)
+    with db_session() as db:
+        db.execute(text("DELETE FROM seen_jtis WHERE jti LIKE 'urn:uuid:peer-%'"))
+        for jti, exp in (("urn:uuid:peer-live", now + timedelta(hours=1)), ("urn:uuid:peer-old", now - timedelta(hours=1))):
+            db.execute(
+                text(
+                    "INSERT INTO seen_jtis (jti, endpoint, first_seen_at, expires_at)"
+                    " VALUES (:jti, 'other-worker', :seen, :exp)"
+                ),
+                {"jti": jti, "seen": now - timedelta(hours=2), "exp": exp},
+            )
+        db.commit()
+
+    result = jti_dedup.check_and_record_jti("urn:uuid:peer-live", endpoint="test")
+    assert result is not None and "previously recorded" in result
+    # An expired row is taken over rather than treated as a replay
+    assert jti_dedup.check_and_record_jti("urn:uuid:peer-old", endpoint="test") is None
+    assert jti_dedup.check_and_record_jti("urn:uuid:peer-fresh", endpoint="test") is None
+    jti_dedup.clear_dedup_store()
+    assert jti_dedup.check_and_record_jti("urn:uuid:peer-fresh", endpoint="test") is not None
+    jti_dedup.clear_dedup_store()
+
+
+def test_sweep_expired_jtis_deletes_in_chunks(monkeypatch):
+    """The sweeper removes expired seen_jtis rows and keeps live ones."""
+    from datetime import datetime, timedelta, timezone
+    from sqlalchemy import text
+    from core import jti_dedup
+    from core.db import db_session
+    from core.settings import settings
+
+    _ensure_seen_jtis_table()
+    monkeypatch.setattr(settings, "jti_sweep_chunk_size", 3)
+    now = datetime.now(timezone.utc)
+    with db_session() as db:
+        db.execute(text("DELETE FROM seen_jtis WHERE jti LIKE 'urn:uuid:sweep-%'"))
+        for i in range(7):
+            db.execute(
+                text(
+                    "INSERT INTO seen_jtis (jti, endpoint, first_seen_at, expires_at)"
+                    " VALUES (:jti, 'test', :seen, :exp)"
+                ),
+                {"jti": f"urn:uuid:sweep-old-{i}", "seen": now - timedelta(hours=2), "exp": now - timedelta(hours=1)},
+            )
+        db.execute(
+            text(
+                "INSERT INTO seen_jtis (jti, endpoint, first_seen_at, expires_at)"
+                " VALUES ('urn:uuid:sweep-live', 'test', :seen, :exp)"
+            ),
+            {"seen": now, "exp": now + timedelta(hours=1)},
+        )
+        db.commit()
+
+    assert jti_dedup.sweep_expired_jtis() >= 7
+    with db_session() as db:
+        remaining = db.execute(
+            text("SELECT jti FROM seen_jtis WHERE jti LIKE 'urn:uuid:sweep-%'")
+        ).fetchall()
+    assert [r[0] for r in remaining] == ["urn:uuid:sweep-live"]
+
+
+def test_warm_jti_cache_streams_in_chunks(monkeypatch):
+    """Warm-up pages through seen_jtis in chunks and reports progress."""
+    from datetime import datetime, timedelta, timezone
+    from sqlalchemy import text
+    from core import jti_dedup
+    from core.db import db_session
+    from core.settings import settings
+
+    _ensure_seen_jtis_table()
+    monkeypatch.setattr(settings, "jti_warm_chunk_size", 2)
+    now = datetime.now(timezone.utc)
+    with db_session() as db:
+        db.execute(text("DELETE FROM seen_jtis"))
+        for i in range(5):
+            db.execute(
+                text(
+                    "INSERT INTO seen_jtis (jti, endpoint, first_seen_at, expires_at)"
+                    " VALUES (:jti, 'test', :seen, :exp)"
+                ),
+                # two rows share an expiry to exercise the keyset tie-breaker
+                {"jti": f"urn:uuid:warm-{i}", "seen": now, "exp": now + timedelta(minutes=10 + i // 2)},
+            )
+        db.commit()
+    jti_dedup.clear_dedup_store()
+
+    assert jti_dedup.warm_jti_cache() == 5
+    status = jti_dedup.jti_warm_status()
+    assert status["state"] == "done"
+    assert status["loaded"] == 5
+    assert status["chunks"] == 3
+    assert jti_dedup.check_and_record_jti("urn:uuid:warm-3", endpoint="test") is not None
+    jti_dedup.clear_dedup_store()
+
+
+def test_jti_check_falls_back_to_db_before_warm_completes(monkeypatch):
+    """With write-behind, memory misses are checked against the DB while warm-up is still running."""
+    from core import jti_dedup
+    from core.settings import settings
+
+    jti_dedup.clear_dedup_store()
+    monkeypatch.setattr(settings, "jti_persist_write_behind", True)
+    lookups: list[str] = []
+
+    def record_lookup(jti):
+        lookups.append(jti)
+        return jti == "urn:uuid:not-yet-warmed"
+
+    monkeypatch.setattr(jti_dedup, "_db_seen_jti", record_lookup)
+    jti_dedup._warm_done.clear()
+    try:
+        result = jti_dedup.check_and_record_jti("urn:uuid:not-yet-warmed", endpoint="test")
+    finally:
+        jti_dedup._warm_done.set()
+
+    assert lookups == ["urn:uuid:not-yet-warmed"]
+    assert result is not None and "previously recorded" in result
+    jti_dedup.clear_dedup_store()
+
+
+def test_error_envelope_middleware_returns_json_500_with_request_id():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from api.middleware.request_context import ErrorEnvelopeMiddleware, RequestIdMiddleware
+
+    app = FastAPI()
+
+    @app.get("/boom")
+    async def boom():
+        raise ValueError("kaboom")
+
+    app.add_middleware(ErrorEnvelopeMiddleware, include_details=True)
+    app.add_middleware(RequestIdMiddleware)
+
+    r = TestClient(app, raise_server_exceptions=False).get("/boom", headers={"x-request-id": "rid-123"})
+    assert r.status_code == 500
+    assert r.headers["x-request-id"] == "rid-123"
+    assert r.json() == {"error": "internal_error", "request_id": "rid-123", "type": "ValueError", "message": "kaboom"}
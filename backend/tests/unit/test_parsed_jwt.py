@@ -0,0 +1,51 @@
+import time
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric.ec import SECP256R1, generate_private_key
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+
+from core.parsed_jwt import ParsedJWT
+
+
+def _token(key, alg, **claims):
+    now = int(time.time())
+    payload = {"iss": "did:example:issuer", "sub": "did:example:subject", "iat": now, "exp": now + 60, **claims}
+    return jwt.encode(payload, key, algorithm=alg, headers={"kid": "k1"})
+
+
+@pytest.mark.parametrize("alg,make_key", [
+    ("EdDSA", Ed25519PrivateKey.generate),
+    ("ES256", lambda: generate_private_key(SECP256R1())),
+])
+def test_parsed_jwt_matches_pyjwt_decode(alg, make_key):
+    key = make_key()
+    token = _token(key, alg, nested={"parent": "x" * 100})
+
+    parsed = ParsedJWT.parse(token)
+    assert parsed.kid == "k1" and parsed.alg == alg
+    assert parsed.header == jwt.get_unverified_header(token)
+    assert parsed.verify(key.public_key(), algorithms=[alg], require=["iss", "sub"]) == jwt.decode(
+        token, key.public_key(), algorithms=[alg]
+    )
+    # Parsing an already parsed token is a no-op
+    assert ParsedJWT.parse(parsed) is parsed
+
+
+def test_parsed_jwt_rejects_like_pyjwt():
+    key = Ed25519PrivateKey.generate()
+
+    with pytest.raises(jwt.InvalidSignatureError):
+        ParsedJWT.parse(_token(key, "EdDSA")).verify(Ed25519PrivateKey.generate().public_key(), algorithms=["EdDSA"])
+    with pytest.raises(jwt.ExpiredSignatureError):
+        ParsedJWT.parse(_token(key, "EdDSA", exp=int(time.time()) - 5)).verify(key.public_key(), algorithms=["EdDSA"])
+    with pytest.raises(jwt.MissingRequiredClaimError):
+        ParsedJWT.parse(_token(key, "EdDSA")).verify(key.public_key(), algorithms=["EdDSA"], require=["jti"])
+    with pytest.raises(jwt.InvalidAlgorithmError):
+        ParsedJWT.parse(_token(key, "EdDSA")).verify(key.public_key(), algorithms=["RS256"])
+    with pytest.raises(jwt.InvalidAudienceError):
+        ParsedJWT.parse(_token(key, "EdDSA", aud="someone")).verify(key.public_key(), algorithms=["EdDSA"])
+    with pytest.raises(jwt.DecodeError):
+        ParsedJWT.parse("only.two")
+    with pytest.raises(jwt.DecodeError):
+        ParsedJWT.parse("!!.@@.##")
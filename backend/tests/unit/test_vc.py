@@ -30,3 +30,56 @@ def test_issue_vc_jwt_contains_required_claims(client, authz_headers):
     assert payload['jti'] == jti
     assert payload['iat'] == iat
     assert payload.get('exp') == exp
+
+
+_RFC7638_RSA_JWK = {
+    'kty': 'RSA',
+    'e': 'AQAB',
+    'alg': 'RS256',
+    'kid': '2011-04-29',
+    'n': (
+        '0vx7agoebGcQSuuPiLJXZptN9nndrQmbXEps2aiAFbWhM78LhWx4cbbfAAtVT86zwu1RK7aPFFxuhDR1L6tSoc_BJECPebWKRXjBZCiFV4n3oknjhMstn64tZ_2W-5JsGY4Hc5n9yBXArwl93lqt7_RN5w6Cf0h4QyQ5v-65YGjQR0_FDW2QvzqY368QQMicAtaSqzs8KJZgnYb9c7d0zgdAZHzu6qMQvRL5hajrn1n91CbOpbISD08qNLyrdkt-bFTWhAI4vMQFh6WeZu0fM4lFd2NcRwr3XPksINHaQ-G_xBniIqbw0Ls1jF44-csFCur-kEgU8awapJzKnqDKgw'
+    ),
+}
+
+
+def test_jwk_thumbprint_matches_rfc7638_example():
+    from core.key_cache import jwk_thumbprint
+
+    assert jwk_thumbprint(_RFC7638_RSA_JWK) == 'NzbLsXh8uDCcd-6MNwXF4W_7noWXFZAfHkxZsRGC9Xs'
+    # Non-key members (kid, alg, use) do not affect the thumbprint
+    assert jwk_thumbprint({**_RFC7638_RSA_JWK, 'kid': 'other', 'use': 'sig'}) == jwk_thumbprint(_RFC7638_RSA_JWK)
+
+
+def test_public_key_cache_reuses_parsed_keys():
+    from core.key_cache import PublicKeyCache
+
+    cache = PublicKeyCache(max_size=2)
+    loads = []
+
+    def loader(jwk):
+        loads.append(jwk['kid'])
+        return object()
+
+    k1 = cache.get_or_load(_RFC7638_RSA_JWK, loader)
+    assert cache.get_or_load({**_RFC7638_RSA_JWK, 'kid': 'rotated-label'}, loader) is k1
+    assert loads == ['2011-04-29']
+
+    ec_jwks = [
+        {'kty': 'EC', 'crv': 'P-256', 'x': f'x{i}', 'y': f'y{i}', 'kid': f'ec{i}'} for i in range(2)
+    ]
+    for jwk in ec_jwks:
+        cache.get_or_load(jwk, loader)
+    # Bounded: the RSA key was least recently used and got evicted
+    assert len(cache) == 2
+    cache.get_or_load(_RFC7638_RSA_JWK, loader)
+    assert loads.count('2011-04-29') == 2
+
+
+def test_public_key_from_jwk_multi_caches_rsa_key():
+    from core.vc import _public_key_from_jwk_multi
+
+    a = _public_key_from_jwk_multi(_RFC7638_RSA_JWK)
+    b = _public_key_from_jwk_multi(dict(_RFC7638_RSA_JWK))
+    assert a is b
+    assert a.public_numbers().e == 65537
@@ -12,6 +12,8 @@ from pramana.delegation import (
     issue_delegation,
     delegate_further,
     verify_delegation_chain,
+    DelegationLinkCache,
+    delegation_digest,
     ScopeEscalationError,
     DelegationResult,
 )
@@ -37,6 +39,8 @@ __all__ = [
     "issue_delegation",
     "delegate_further",
     "verify_delegation_chain",
+    "DelegationLinkCache",
+    "delegation_digest",
     "ScopeEscalationError",
     "DelegationResult",
     "issue_intent_mandate",
@@ -4,6 +4,7 @@ import base64
 import time
 import uuid
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Any, Callable, Optional
 
 import jwt as pyjwt
@@ -72,11 +73,31 @@ def _fail(reason: str, **kwargs: Any) -> VerificationResult:
     )
 
 
+class _MulticodecError(Exception):
+    pass
+
+
+@lru_cache(maxsize=1024)
+def _ed25519_from_bytes(pub_bytes: bytes) -> Ed25519PublicKey:
+    # Raw Ed25519 key bytes identify the key exactly (same as its RFC 7638 thumbprint).
+    return Ed25519PublicKey.from_public_bytes(pub_bytes)
+
+
+@lru_cache(maxsize=1024)
+def _multibase_key_bytes(multibase: str) -> bytes:
+    decoded_bytes = _b58_decode(multibase[1:])
+    if len(decoded_bytes) < 2 or decoded_bytes[0] != 0xED or decoded_bytes[1] != 0x01:
+        raise _MulticodecError("Invalid multicodec prefix in publicKeyMultibase")
+    return decoded_bytes[2:]
+
+
 def _resolve_pub_key(vm: dict[str, Any]) -> tuple[Optional[Ed25519PublicKey], Optional[str]]:
     """
     Extract an Ed25519 public key from a verification method dict.
     Returns (key, None) on success or (None, error_reason) on failure.
     Handles both publicKeyJwk (did:web) and publicKeyMultibase (did:key).
+    Parsed keys are cached, so repeat verifications against the same issuer
+    skip decoding and key construction.
     """
     if "publicKeyJwk" in vm:
         jwk = vm["publicKeyJwk"]
@@ -86,7 +107,7 @@ def _resolve_pub_key(vm: dict[str, Any]) -> tuple[Optional[Ed25519PublicKey], Op
         padded = x + "=" * ((4 - len(x) % 4) % 4)
         try:
             pub_bytes = base64.urlsafe_b64decode(padded.encode("ascii"))
-            return Ed25519PublicKey.from_public_bytes(pub_bytes), None
+            return _ed25519_from_bytes(pub_bytes), None
         except (ValueError, TypeError) as exc:
             return None, f"Failed to decode publicKeyJwk: {exc}"
 
@@ -95,14 +116,13 @@ def _resolve_pub_key(vm: dict[str, Any]) -> tuple[Optional[Ed25519PublicKey], Op
         if not multibase.startswith("z"):
             return None, "Unsupported multibase prefix"
         try:
-            decoded_bytes = _b58_decode(multibase[1:])
+            pub_bytes = _multibase_key_bytes(multibase)
+        except _MulticodecError as exc:
+            return None, str(exc)
         except (ValueError, IndexError) as exc:
             return None, f"Failed to base58 decode publicKeyMultibase: {exc}"
-        if len(decoded_bytes) < 2 or decoded_bytes[0] != 0xED or decoded_bytes[1] != 0x01:
-            return None, "Invalid multicodec prefix in publicKeyMultibase"
-        pub_bytes = decoded_bytes[2:]
         try:
-            return Ed25519PublicKey.from_public_bytes(pub_bytes), None
+            return _ed25519_from_bytes(pub_bytes), None
         except (ValueError, TypeError) as exc:
             return None, f"Failed to reconstruct public key from multibase: {exc}"
 
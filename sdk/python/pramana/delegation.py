@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+import base64
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Optional, Sequence
 
 from pramana.credentials import issue_vc, verify_vc
 from pramana.identity import AgentIdentity
@@ -38,6 +43,78 @@ class DelegationResult:
     reason: Optional[str]
 
 
+@dataclass(frozen=True)
+class _VerifiedLink:
+    chain: list[dict[str, Any]]
+    effective_scope: dict[str, Any]
+    expires_at: float
+    jtis: frozenset[str]
+
+
+class DelegationLinkCache:
+    """
+    Verified delegation links, keyed by link token hash.
+
+    Pass one to verify_delegation_chain(cache=...) to stop re-verifying
+    shared ancestors on every presentation. Each entry records the link's
+    chain and effective scope and lives until the earliest exp in its chain
+    or ttl_seconds, whichever is sooner. Call invalidate(jti) when a
+    delegation is revoked; every link below it is dropped.
+
+    Use one cache per resolver/status_checker configuration: entries record
+    what those callbacks answered at verification time.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._links: OrderedDict[str, _VerifiedLink] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[_VerifiedLink]:
+        key = self._key(token)
+        with self._lock:
+            link = self._links.get(key)
+            if link is None:
+                return None
+            if link.expires_at <= time.time():
+                del self._links[key]
+                return None
+            self._links.move_to_end(key)
+            return link
+
+    def put(self, token: str, link: _VerifiedLink) -> None:
+        if self.max_entries <= 0:
+            return
+        link = _VerifiedLink(
+            link.chain, link.effective_scope, min(link.expires_at, time.time() + self.ttl_seconds), link.jtis
+        )
+        key = self._key(token)
+        with self._lock:
+            self._links[key] = link
+            self._links.move_to_end(key)
+            while len(self._links) > self.max_entries:
+                self._links.popitem(last=False)
+
+    def invalidate(self, jti: str) -> None:
+        """Drop every cached link whose chain includes the delegation `jti`."""
+        with self._lock:
+            for key in [k for k, link in self._links.items() if jti in link.jtis]:
+                del self._links[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._links.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._links)
+
+
 # ---------------------------------------------------------------------------
 # Scope intersection
 # ---------------------------------------------------------------------------
@@ -169,6 +246,30 @@ def issue_delegation(
 # delegate_further
 # ---------------------------------------------------------------------------
 
+def delegation_digest(token: str) -> str:
+    """SHA-256 of a delegation JWT as ``sha-256:<base64url>``, as used in parentDelegationRef."""
+    digest = hashlib.sha256(token.encode("ascii")).digest()
+    return "sha-256:" + base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+
+
+def _resolve_parent_ref(
+    ref: Any,
+    parents: dict[str, str],
+    parent_fetcher: Optional[Callable[[str], Optional[str]]],
+) -> tuple[Optional[str], Optional[str]]:
+    """Find the parent JWT a parentDelegationRef points at: (token, None) or (None, reason)."""
+    if not isinstance(ref, dict) or not isinstance(ref.get("digest"), str):
+        return None, "Malformed parentDelegationRef"
+    token = parents.get(ref["digest"])
+    if token is None and parent_fetcher is not None and ref.get("jti"):
+        token = parent_fetcher(str(ref["jti"]))
+        if token is not None and delegation_digest(token) != ref["digest"]:
+            return None, f"Parent delegation {ref['jti']} does not match its digest"
+    if token is None:
+        return None, f"Parent delegation {ref.get('jti', '')} not provided"
+    return token, None
+
+
 def delegate_further(
     holder: AgentIdentity,
     parent_delegation_jwt: str,
@@ -178,10 +279,18 @@ def delegate_further(
     resolver: Optional[Callable[[str], dict[str, Any]]] = None,
     status_list_url: Optional[str] = None,
     status_list_index: Optional[int] = None,
+    compact: bool = False,
 ) -> str:
     """
     Create a sub-delegation. The new credential references the parent.
 
+    By default the parent JWT is embedded (``parentDelegation``), so every
+    level carries all of its ancestors. With compact=True the child carries
+    only ``parentDelegationRef`` (the parent's jti and SHA-256 digest) and
+    stays the same size at any depth; verifiers then need the ancestors
+    alongside (verify_delegation_chain(parent_delegations=...), e.g. from a
+    VP) or a way to fetch them by jti.
+
     Raises:
     - ScopeEscalationError if narrowed_scope exceeds parent's scope
     - ValueError if delegation depth would exceed maxDelegationDepth
@@ -231,17 +340,25 @@ def delegate_further(
         extra["status_list_url"] = status_list_url
         extra["status_list_index"] = status_list_index
 
+    claims: dict[str, Any] = {
+        "delegatedBy": holder.did,
+        "delegationScope": narrowed_scope,
+        "delegationDepth": new_depth,
+        "maxDelegationDepth": max_depth,
+    }
+    if compact:
+        claims["parentDelegationRef"] = {
+            "jti": parent_result.payload.get("jti", ""),
+            "digest": delegation_digest(parent_delegation_jwt),
+        }
+    else:
+        claims["parentDelegation"] = parent_delegation_jwt
+
     return issue_vc(
         issuer=holder,
         subject_did=sub_delegate_did,
         credential_type="DelegationCredential",
-        claims={
-            "delegatedBy": holder.did,
-            "delegationScope": narrowed_scope,
-            "delegationDepth": new_depth,
-            "maxDelegationDepth": max_depth,
-            "parentDelegation": parent_delegation_jwt,
-        },
+        claims=claims,
         ttl_seconds=effective_ttl,
         **extra,
     )
@@ -256,6 +373,9 @@ def verify_delegation_chain(
     required_action: Optional[str] = None,
     resolver: Optional[Callable[[str], dict[str, Any]]] = None,
     status_checker: Optional[Callable[[str, int], bool]] = None,
+    cache: Optional[DelegationLinkCache] = None,
+    parent_delegations: Optional[Sequence[str]] = None,
+    parent_fetcher: Optional[Callable[[str], Optional[str]]] = None,
     _depth: int = 0,
     _max_recursion: int = 10,
 ) -> DelegationResult:
@@ -263,8 +383,48 @@ def verify_delegation_chain(
     Recursively verify a delegation chain.
 
     If required_action is provided, checks that the action is in the effective scope.
+    With a DelegationLinkCache, links verified earlier (with their ancestors)
+    are reused, so a chain under warm ancestors costs one signature check.
+    Compact links (parentDelegationRef) are resolved from parent_delegations
+    (the ancestor JWTs, in any order) or, failing that, parent_fetcher(jti);
+    either way the parent must match the referenced digest.
     _depth and _max_recursion are internal — prevent infinite recursion on malicious chains.
     """
+    parents = {delegation_digest(t): t for t in parent_delegations or ()}
+    link = _verify_link(token, resolver, status_checker, cache, parents, parent_fetcher, _depth, _max_recursion)
+    if isinstance(link, DelegationResult):
+        return link
+    chain, effective_scope = link.chain, link.effective_scope
+
+    if required_action and required_action not in effective_scope.get("actions", []):
+        return DelegationResult(
+            verified=False,
+            chain=list(chain),
+            effective_scope=dict(effective_scope),
+            depth=len(chain),
+            reason=f"Action '{required_action}' not in effective scope: {effective_scope.get('actions', [])}",
+        )
+
+    return DelegationResult(
+        verified=True,
+        chain=list(chain),
+        effective_scope=dict(effective_scope),
+        depth=len(chain),
+        reason=None,
+    )
+
+
+def _verify_link(
+    token: str,
+    resolver: Optional[Callable[[str], dict[str, Any]]],
+    status_checker: Optional[Callable[[str, int], bool]],
+    cache: Optional[DelegationLinkCache],
+    parents: dict[str, str],
+    parent_fetcher: Optional[Callable[[str], Optional[str]]],
+    _depth: int,
+    _max_recursion: int,
+) -> "_VerifiedLink | DelegationResult":
+    """Verify `token` and its ancestors; a failed DelegationResult otherwise."""
     if _depth > _max_recursion:
         return DelegationResult(
             verified=False,
@@ -274,6 +434,19 @@ def verify_delegation_chain(
             reason=f"Recursion limit {_max_recursion} exceeded",
         )
 
+    if cache is not None:
+        cached = cache.get(token)
+        if cached is not None:
+            if _depth + len(cached.chain) - 1 > _max_recursion:
+                return DelegationResult(
+                    verified=False,
+                    chain=[],
+                    effective_scope={},
+                    depth=_depth,
+                    reason=f"Recursion limit {_max_recursion} exceeded",
+                )
+            return cached
+
     vc_result = verify_vc(token, resolver=resolver, status_checker=status_checker)
     if not vc_result.verified:
         return DelegationResult(
@@ -292,55 +465,54 @@ def verify_delegation_chain(
         "scope": this_scope,
         "depth": int(claims.get("delegationDepth", 0)),
     }
+    exp = vc_result.payload.get("exp")
+    expires_at = float(exp) if isinstance(exp, (int, float)) else float("inf")
+    jtis = frozenset([str(vc_result.payload.get("jti", ""))])
 
     parent_jwt = claims.get("parentDelegation")
+    if not parent_jwt and claims.get("parentDelegationRef") is not None:
+        parent_jwt, ref_error = _resolve_parent_ref(claims["parentDelegationRef"], parents, parent_fetcher)
+        if ref_error:
+            return DelegationResult(
+                verified=False,
+                chain=[],
+                effective_scope={},
+                depth=_depth,
+                reason=ref_error,
+            )
 
     if parent_jwt:
-        parent_result = verify_delegation_chain(
-            parent_jwt,
-            resolver=resolver,
-            status_checker=status_checker,
-            _depth=_depth + 1,
-            _max_recursion=_max_recursion,
+        parent = _verify_link(
+            parent_jwt, resolver, status_checker, cache, parents, parent_fetcher, _depth + 1, _max_recursion
         )
-        if not parent_result.verified:
+        if isinstance(parent, DelegationResult):
             return DelegationResult(
                 verified=False,
-                chain=parent_result.chain,
+                chain=parent.chain,
                 effective_scope={},
                 depth=_depth,
-                reason=f"Parent delegation invalid: {parent_result.reason}",
+                reason=f"Parent delegation invalid: {parent.reason}",
             )
 
         try:
-            effective_scope = intersect_scopes(parent_result.effective_scope, this_scope)
+            effective_scope = intersect_scopes(parent.effective_scope, this_scope)
         except ScopeEscalationError as exc:
             return DelegationResult(
                 verified=False,
-                chain=parent_result.chain + [this_link],
+                chain=parent.chain + [this_link],
                 effective_scope={},
-                depth=len(parent_result.chain) + 1,
+                depth=len(parent.chain) + 1,
                 reason=str(exc),
             )
 
-        chain = parent_result.chain + [this_link]
+        chain = parent.chain + [this_link]
+        expires_at = min(expires_at, parent.expires_at)
+        jtis = jtis | parent.jtis
     else:
         effective_scope = this_scope
         chain = [this_link]
 
-    if required_action and required_action not in effective_scope.get("actions", []):
-        return DelegationResult(
-            verified=False,
-            chain=chain,
-            effective_scope=effective_scope,
-            depth=len(chain),
-            reason=f"Action '{required_action}' not in effective scope: {effective_scope.get('actions', [])}",
-        )
-
-    return DelegationResult(
-        verified=True,
-        chain=chain,
-        effective_scope=effective_scope,
-        depth=len(chain),
-        reason=None,
-    )
+    link = _VerifiedLink(chain, effective_scope, expires_at, jtis)
+    if cache is not None:
+        cache.put(token, link)
+    return link
@@ -3,6 +3,7 @@ from __future__ import annotations
 import base64
 import uuid
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Any, Optional
 
 from cryptography.exceptions import InvalidSignature
@@ -14,6 +15,13 @@ from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey,
 # ---------------------------------------------------------------------------
 
 _B58_ALPHABET = b"123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+# Reverse lookup: byte value -> digit, -1 for bytes outside the alphabet
+_B58_INDEX = [-1] * 256
+for _digit, _char in enumerate(_B58_ALPHABET):
+    _B58_INDEX[_char] = _digit
+# Digits handled per big-int step; 58**10 < 2**64 keeps the inner loops on small ints
+_B58_CHUNK = 10
+_B58_CHUNK_POW = [58 ** i for i in range(_B58_CHUNK + 1)]
 
 
 def _b58_encode(data: bytes) -> str:
@@ -21,26 +29,39 @@ def _b58_encode(data: bytes) -> str:
     if not data:
         return ""
     n = int.from_bytes(data, "big")
-    result = []
+    big = _B58_CHUNK_POW[_B58_CHUNK]
+    out = bytearray()
     while n > 0:
-        n, r = divmod(n, 58)
-        result.append(_B58_ALPHABET[r : r + 1])
-    for byte in data:
-        if byte == 0:
-            result.append(b"1")
-        else:
-            break
-    return b"".join(reversed(result)).decode("ascii")
+        n, chunk = divmod(n, big)
+        # Full chunks are zero-padded; the most significant one is trimmed below
+        for _ in range(_B58_CHUNK):
+            chunk, r = divmod(chunk, 58)
+            out.append(_B58_ALPHABET[r])
+    while out and out[-1] == _B58_ALPHABET[0]:
+        out.pop()
+    leading_zeros = len(data) - len(data.lstrip(b"\x00"))
+    out.extend(b"1" * leading_zeros)
+    out.reverse()
+    return out.decode("ascii")
 
 
 def _b58_decode(s: str) -> bytes:
     """Base58btc decode."""
     if not s:
         return b""
+    raw = s.encode("ascii", "replace")
+    index = _B58_INDEX
     n = 0
-    for c in s.encode("ascii"):
-        n = n * 58 + _B58_ALPHABET.index(c)
-    leading_zeros = len(s) - len(s.lstrip("1"))
+    for start in range(0, len(raw), _B58_CHUNK):
+        chunk = raw[start : start + _B58_CHUNK]
+        v = 0
+        for c in chunk:
+            d = index[c]
+            if d < 0:
+                raise ValueError(f"Invalid base58 character: {s[start + chunk.index(c)]!r}")
+            v = v * 58 + d
+        n = n * _B58_CHUNK_POW[len(chunk)] + v
+    leading_zeros = len(raw) - len(raw.lstrip(b"1"))
     result = n.to_bytes((n.bit_length() + 7) // 8, "big") if n else b""
     return b"\x00" * leading_zeros + result
 
@@ -91,9 +112,12 @@ def _pub_key_to_multibase(pub: Ed25519PublicKey) -> str:
 # DID document builders
 # ---------------------------------------------------------------------------
 
-def _build_did_key_document(did: str, pub: Ed25519PublicKey) -> dict[str, Any]:
+def _build_did_key_document(
+    did: str, pub: Ed25519PublicKey, multibase: Optional[str] = None
+) -> dict[str, Any]:
     """Build a did:key DID document per the W3C did:key specification."""
-    multibase = _pub_key_to_multibase(pub)
+    if multibase is None:
+        multibase = _pub_key_to_multibase(pub)
     kid = f"{did}#{did}"
     return {
         "@context": [_DID_CONTEXT_V1, _ED25519_2020_CONTEXT],
@@ -341,7 +365,17 @@ class AgentIdentity:
 # ---------------------------------------------------------------------------
 
 def resolve_did_key(did: str) -> dict[str, Any]:
-    """Resolve a did:key locally — no network call. Extracts public key from DID string."""
+    """Resolve a did:key locally — no network call. Extracts public key from DID string.
+
+    The decoded key is memoised per DID; each call returns a fresh document.
+    """
+    pub = _did_key_public_key(did)
+    # The DID's own multibase value is the canonical encoding of the key
+    return _build_did_key_document(did, pub, did[len("did:key:"):])
+
+
+@lru_cache(maxsize=1024)
+def _did_key_public_key(did: str) -> Ed25519PublicKey:
     if not did.startswith("did:key:z"):
         raise ValueError(
             f"Invalid did:key format: must start with 'did:key:z', got '{did[:25]}...'"
@@ -373,8 +407,6 @@ def resolve_did_key(did: str) -> dict[str, Any]:
         )
 
     try:
-        pub = Ed25519PublicKey.from_public_bytes(pub_bytes)
+        return Ed25519PublicKey.from_public_bytes(pub_bytes)
     except (ValueError, TypeError) as exc:
         raise ValueError(f"Failed to reconstruct Ed25519 public key: {exc}") from exc
-
-    return _build_did_key_document(did, pub)
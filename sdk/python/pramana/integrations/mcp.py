@@ -182,14 +182,17 @@ class PramanaMCPAuth:
         delegation_result: Optional[DelegationResult] = None
         if self.config.require_delegation:
             delegation_jwt: Optional[str] = None
-            for cr in credential_results:
-                if cr.credential_type == "DelegationCredential":
-                    # Reconstruct the raw JWT from the VP's embedded list.
-                    # verify_presentation already verified each VC; here we
-                    # re-verify as a delegation chain (which recurses into
-                    # parentDelegation claims).
-                    delegation_jwt = _find_delegation_jwt(vp_jwt, cr)
-                    break
+            delegations = [cr for cr in credential_results if cr.credential_type == "DelegationCredential"]
+            # A compact chain travels as several DelegationCredentials; the
+            # leaf is the one delegated to the presenting agent.
+            delegations.sort(key=lambda cr: cr.subject_did != agent_did)
+            if delegations:
+                # Reconstruct the raw JWT from the VP's embedded list.
+                # verify_presentation already verified each VC; here we
+                # re-verify as a delegation chain (which recurses into
+                # parentDelegation claims, or resolves parentDelegationRef
+                # against the VP's other credentials).
+                delegation_jwt = _find_delegation_jwt(vp_jwt, delegations[0])
 
             if delegation_jwt is None:
                 return MCPAuthResult(
@@ -199,10 +202,12 @@ class PramanaMCPAuth:
                     reason="Delegation required but no DelegationCredential found",
                 )
 
+            parent_delegations = _vp_credential_jwts(vp_jwt)
             for action in self.config.required_actions:
                 del_result = verify_delegation_chain(
                     delegation_jwt,
                     required_action=action,
+                    parent_delegations=parent_delegations,
                 )
                 if not del_result.verified:
                     return MCPAuthResult(
@@ -214,7 +219,7 @@ class PramanaMCPAuth:
                 delegation_result = del_result
 
             if delegation_result is None:
-                delegation_result = verify_delegation_chain(delegation_jwt)
+                delegation_result = verify_delegation_chain(delegation_jwt, parent_delegations=parent_delegations)
                 if not delegation_result.verified:
                     return MCPAuthResult(
                         authenticated=False,
@@ -280,6 +285,16 @@ def mcp_auth_middleware(auth: PramanaMCPAuth) -> Callable:
 # Internal helpers
 # ---------------------------------------------------------------------------
 
+def _vp_credential_jwts(vp_jwt: str) -> list[str]:
+    """The VC-JWTs embedded in a VP (payload decoded without signature check)."""
+    try:
+        import jwt as _pyjwt
+        vp_payload = _pyjwt.decode(vp_jwt, options={"verify_signature": False})
+        return [t for t in (vp_payload.get("vp") or {}).get("verifiableCredential") or [] if isinstance(t, str)]
+    except Exception:
+        return []
+
+
 def _find_delegation_jwt(vp_jwt: str, matching_cr: VerificationResult) -> Optional[str]:
     """
     Extract the raw VC-JWT for a DelegationCredential from the VP.
@@ -279,6 +279,17 @@ class TestVerifyVC:
         assert result.verified is False
         assert "3 segments" in result.reason or "format" in result.reason.lower()
 
+    def test_repeat_verification_reuses_parsed_key(self, sample_vc):
+        """The issuer key is decoded and constructed once, then served from cache."""
+        from pramana.credentials import _ed25519_from_bytes, _multibase_key_bytes
+
+        assert verify_vc(sample_vc).verified is True
+        hits_before = _multibase_key_bytes.cache_info().hits
+        key_hits_before = _ed25519_from_bytes.cache_info().hits
+        assert verify_vc(sample_vc).verified is True
+        assert _multibase_key_bytes.cache_info().hits > hits_before
+        assert _ed25519_from_bytes.cache_info().hits > key_hits_before
+
 
 # ─── TestPresentation ──────────────────────────────────────
 
@@ -1,6 +1,8 @@
 """Tests for delegation chains: scope narrowing, depth limits, chain verification."""
 from __future__ import annotations
 
+import base64
+import json
 import time
 
 import pytest
@@ -14,6 +16,8 @@ from pramana.delegation import (
     issue_delegation,
     delegate_further,
     verify_delegation_chain,
+    DelegationLinkCache,
+    delegation_digest,
 )
 
 
@@ -343,3 +347,136 @@ class TestDelegation:
 
         result_ok = verify_delegation_chain(token, required_action="purchase")
         assert result_ok.verified is True
+
+
+# ─── TestDelegationLinkCache ──────────────────────────────
+
+
+class TestDelegationLinkCache:
+    @pytest.fixture
+    def chain(self, agent_a, agent_b, agent_c, agent_d, full_scope):
+        """A -> B -> C, plus two leaves C -> D. Returns (ab, bc, leaf1, leaf2)."""
+        ab = issue_delegation(agent_a, agent_b.did, full_scope, max_depth=3)
+        bc = delegate_further(agent_b, ab, agent_c.did, full_scope)
+        leaf1 = delegate_further(agent_c, bc, agent_d.did, {**full_scope, "actions": ["purchase"]})
+        leaf2 = delegate_further(agent_c, bc, agent_d.did, {**full_scope, "actions": ["negotiate"]})
+        return ab, bc, leaf1, leaf2
+
+    @staticmethod
+    def _counting_verify_vc(monkeypatch) -> list[str]:
+        import pramana.delegation as delegation_mod
+
+        calls: list[str] = []
+        real = delegation_mod.verify_vc
+
+        def counting(token, **kwargs):
+            calls.append(token)
+            return real(token, **kwargs)
+
+        monkeypatch.setattr(delegation_mod, "verify_vc", counting)
+        return calls
+
+    def test_warm_ancestors_cost_one_signature_check(self, chain, monkeypatch):
+        _, _, leaf1, leaf2 = chain
+        cache = DelegationLinkCache()
+        calls = self._counting_verify_vc(monkeypatch)
+
+        first = verify_delegation_chain(leaf1, required_action="purchase", cache=cache)
+        assert first.verified is True and first.depth == 3
+        assert len(calls) == 3
+
+        second = verify_delegation_chain(leaf2, cache=cache)
+        assert second.verified is True
+        assert second.effective_scope["actions"] == ["negotiate"]
+        assert len(calls) == 4
+
+        # Cached leaf: the action check still runs against its effective scope
+        again = verify_delegation_chain(leaf1, required_action="negotiate", cache=cache)
+        assert again.verified is False
+        assert len(calls) == 4
+
+    def test_invalidating_an_ancestor_drops_descendants(self, chain, monkeypatch):
+        ab, bc, leaf1, leaf2 = chain
+        cache = DelegationLinkCache()
+        verify_delegation_chain(leaf1, cache=cache)
+        verify_delegation_chain(leaf2, cache=cache)
+        assert len(cache) == 4
+
+        # SDK chain links carry no jti; read it from the token
+        payload = bc.split(".")[1]
+        bc_jti = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))["jti"]
+
+        cache.invalidate(bc_jti)
+        assert len(cache) == 1  # only the root link survives
+        assert cache.get(ab) is not None
+        assert cache.get(bc) is None
+
+        calls = self._counting_verify_vc(monkeypatch)
+        verify_delegation_chain(leaf1, cache=cache)
+        assert calls == [leaf1, bc]
+
+    def test_result_mutation_does_not_leak_into_cache(self, chain):
+        _, _, leaf1, _ = chain
+        cache = DelegationLinkCache()
+        result = verify_delegation_chain(leaf1, cache=cache)
+        result.effective_scope["max_amount"] = 1
+        assert verify_delegation_chain(leaf1, cache=cache).effective_scope["max_amount"] == 10000
+
+
+# ─── Compact parent references ─────────────────────────────
+
+
+def _decode_jwt_payload(token: str) -> dict:
+    part = token.split(".")[1]
+    return json.loads(base64.urlsafe_b64decode(part + "=" * (-len(part) % 4)))
+
+
+class TestCompactDelegation:
+    @pytest.fixture
+    def chain(self, agent_a, agent_b, agent_c, agent_d, full_scope):
+        """A -> B -> C -> D, each child referencing its parent compactly."""
+        ab = issue_delegation(agent_a, agent_b.did, full_scope, max_depth=3)
+        bc = delegate_further(agent_b, ab, agent_c.did, full_scope, compact=True)
+        cd = delegate_further(agent_c, bc, agent_d.did, {**full_scope, "actions": ["purchase"]}, compact=True)
+        return ab, bc, cd
+
+    def test_compact_child_does_not_grow_with_depth(self, chain, agent_a, agent_b, agent_c, agent_d, full_scope):
+        ab, bc, cd = chain
+        claims = _decode_jwt_payload(cd)["vc"]["credentialSubject"]
+        assert "parentDelegation" not in claims
+        assert claims["parentDelegationRef"] == {
+            "jti": _decode_jwt_payload(bc)["jti"],
+            "digest": delegation_digest(bc),
+        }
+        nested_bc = delegate_further(agent_b, ab, agent_c.did, full_scope)
+        nested_cd = delegate_further(agent_c, nested_bc, agent_d.did, full_scope)
+        assert len(cd) < len(nested_cd)
+        assert abs(len(cd) - len(bc)) < 100
+
+    def test_parents_travelling_alongside(self, chain):
+        ab, bc, cd = chain
+        result = verify_delegation_chain(cd, required_action="purchase", parent_delegations=[ab, bc])
+        assert result.verified is True, result.reason
+        assert result.depth == 3
+        assert result.effective_scope["actions"] == ["purchase"]
+
+    def test_parents_fetched_by_jti(self, chain):
+        ab, bc, cd = chain
+        registry = {_decode_jwt_payload(t)["jti"]: t for t in (ab, bc)}
+        result = verify_delegation_chain(cd, parent_fetcher=registry.get)
+        assert result.verified is True, result.reason
+        assert [link["delegate"] for link in result.chain] == [_decode_jwt_payload(t)["sub"] for t in (ab, bc, cd)]
+
+    def test_missing_parent_fails(self, chain):
+        ab, _, cd = chain
+        result = verify_delegation_chain(cd, parent_delegations=[ab])
+        assert result.verified is False
+        assert "not provided" in result.reason
+
+    def test_fetched_parent_must_match_digest(self, chain, agent_b, agent_c, full_scope):
+        ab, bc, cd = chain
+        bc_jti = _decode_jwt_payload(bc)["jti"]
+        forged = delegate_further(agent_b, ab, agent_c.did, full_scope)
+        result = verify_delegation_chain(cd, parent_fetcher={bc_jti: forged}.get)
+        assert result.verified is False
+        assert "does not match its digest" in result.reason
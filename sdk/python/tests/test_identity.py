@@ -23,7 +23,7 @@ def _b64url_decode(s: str) -> bytes:
 
 
 # ---------------------------------------------------------------------------
-# TestBase58 (4 tests)
+# TestBase58 (5 tests)
 # ---------------------------------------------------------------------------
 
 class TestBase58:
@@ -49,6 +49,11 @@ class TestBase58:
         # Two leading zero bytes → two '1' characters
         assert encoded[:2] == "11"
 
+    def test_decode_rejects_invalid_character(self):
+        # '0', 'O', 'I' and 'l' are not in the base58btc alphabet
+        with pytest.raises(ValueError, match="Invalid base58 character: '0'"):
+            _b58_decode("z0x")
+
 
 # ---------------------------------------------------------------------------
 # TestAgentIdentityCreate (6 tests)
@@ -125,7 +130,7 @@ class TestDIDDocument:
 
 
 # ---------------------------------------------------------------------------
-# TestResolveDIDKey (4 tests)
+# TestResolveDIDKey (5 tests)
 # ---------------------------------------------------------------------------
 
 class TestResolveDIDKey:
@@ -155,6 +160,18 @@ class TestResolveDIDKey:
         with pytest.raises(ValueError, match="public key length"):
             resolve_did_key(short_did)
 
+    def test_resolve_memoises_key_but_returns_fresh_documents(self):
+        from pramana.identity import _did_key_public_key
+
+        identity = AgentIdentity.create("memo-agent")
+        doc1 = resolve_did_key(identity.did)
+        hits = _did_key_public_key.cache_info().hits
+        doc1["verificationMethod"].clear()
+
+        doc2 = resolve_did_key(identity.did)
+        assert _did_key_public_key.cache_info().hits == hits + 1
+        assert doc2 == identity.did_document
+
 
 # ---------------------------------------------------------------------------
 # TestExportImport (6 tests)